@@ -15,24 +15,38 @@ from app.core import models  # noqa: F401 - ensure models are imported
 # access to the values within the .ini file in use.
 config = context.config
 
-# Interpret the config file for Python logging.
+# Interpret the config file for Python logging. Keep existing loggers: migrations also run
+# in-process (python -m app.serve --migrate).
 if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
 
 
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    # The search index (FTS5 tables, Postgres tsvector column) is managed by app/core/search.py.
+    if type_ == "table" and name.startswith("tasks_fts"):
+        return False
+    return not (type_ == "column" and name == "search_vector")
+
+
 def run_migrations_offline() -> None:
     settings = get_settings()
     url = settings.database_url
-    context.configure(url=url, target_metadata=target_metadata, literal_binds=True, dialect_opts={"paramstyle": "named"})
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
     with context.begin_transaction():
         context.run_migrations()
 
 
 def do_run_migrations(connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
     with context.begin_transaction():
         context.run_migrations()
 
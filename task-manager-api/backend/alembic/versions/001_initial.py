@@ -0,0 +1,308 @@
+"""Tasks, their rollup tables and the dialect-specific search index and triggers.
+
+Revision ID: 001
+Revises:
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.core.search import POSTGRES_SEARCH_DDL, SQLITE_SEARCH_DDL
+
+
+revision = "001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# The counter and rollup triggers as of this revision (app/core/counters.py and
+# app/core/rollups.py have since moved on; see 003).
+_COUNTER_SEED = (
+    "INSERT INTO task_counters (id, total, completed) "
+    "SELECT 1, count(*), coalesce(sum(CASE WHEN is_completed THEN 1 ELSE 0 END), 0) FROM tasks WHERE true "
+    "ON CONFLICT (id) DO NOTHING"
+)
+
+_SQLITE_COUNTER_DDL = (
+    _COUNTER_SEED,
+    "CREATE TRIGGER IF NOT EXISTS task_counters_ai AFTER INSERT ON tasks BEGIN "
+    "UPDATE task_counters SET total = total + 1, completed = completed + coalesce(new.is_completed, 0) WHERE id = 1; END",
+    "CREATE TRIGGER IF NOT EXISTS task_counters_ad AFTER DELETE ON tasks BEGIN "
+    "UPDATE task_counters SET total = total - 1, completed = completed - coalesce(old.is_completed, 0) WHERE id = 1; END",
+    "CREATE TRIGGER IF NOT EXISTS task_counters_au AFTER UPDATE OF is_completed ON tasks BEGIN "
+    "UPDATE task_counters SET completed = completed + coalesce(new.is_completed, 0) - coalesce(old.is_completed, 0) "
+    "WHERE id = 1; END",
+)
+
+_POSTGRES_COUNTER_DDL = (
+    _COUNTER_SEED,
+    """
+    CREATE OR REPLACE FUNCTION task_counters_on_insert() RETURNS trigger AS $$
+    BEGIN
+        UPDATE task_counters SET total = total + d.n, completed = completed + d.c
+        FROM (SELECT count(*) AS n, count(*) FILTER (WHERE is_completed) AS c FROM inserted) AS d
+        WHERE task_counters.id = 1;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION task_counters_on_delete() RETURNS trigger AS $$
+    BEGIN
+        UPDATE task_counters SET total = total - d.n, completed = completed - d.c
+        FROM (SELECT count(*) AS n, count(*) FILTER (WHERE is_completed) AS c FROM deleted) AS d
+        WHERE task_counters.id = 1;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION task_counters_on_update() RETURNS trigger AS $$
+    BEGIN
+        UPDATE task_counters SET completed = completed
+            + (SELECT count(*) FILTER (WHERE is_completed) FROM new_rows)
+            - (SELECT count(*) FILTER (WHERE is_completed) FROM old_rows)
+        WHERE task_counters.id = 1;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS task_counters_ai ON tasks",
+    "CREATE TRIGGER task_counters_ai AFTER INSERT ON tasks REFERENCING NEW TABLE AS inserted "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_counters_on_insert()",
+    "DROP TRIGGER IF EXISTS task_counters_ad ON tasks",
+    "CREATE TRIGGER task_counters_ad AFTER DELETE ON tasks REFERENCING OLD TABLE AS deleted "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_counters_on_delete()",
+    "DROP TRIGGER IF EXISTS task_counters_au ON tasks",
+    "CREATE TRIGGER task_counters_au AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_counters_on_update()",
+)
+
+_SQLITE_ROLLUP_DDL = (
+    "INSERT INTO task_daily_stats (day, created, completed, completion_seconds) "
+    "SELECT date(created_at), count(*), 0, 0 FROM tasks GROUP BY date(created_at) "
+    "ON CONFLICT (day) DO NOTHING",
+    "INSERT INTO task_priority_stats (priority, open) "
+    "SELECT coalesce(priority, 0), count(*) FROM tasks WHERE NOT coalesce(is_completed, 0) "
+    "GROUP BY coalesce(priority, 0) ON CONFLICT (priority) DO NOTHING",
+    "INSERT INTO task_due_stats (day, open) "
+    "SELECT date(due_date), count(*) FROM tasks WHERE NOT coalesce(is_completed, 0) AND due_date IS NOT NULL "
+    "GROUP BY date(due_date) ON CONFLICT (day) DO NOTHING",
+    "CREATE TRIGGER IF NOT EXISTS task_rollups_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO task_daily_stats (day, created, completed, completion_seconds) "
+    "VALUES (date(new.created_at), 1, coalesce(new.is_completed, 0), 0) "
+    "ON CONFLICT (day) DO UPDATE SET created = created + 1, completed = completed + excluded.completed; "
+    "UPDATE tasks SET completed_at = new.created_at WHERE id = new.id AND coalesce(new.is_completed, 0); "
+    "INSERT INTO task_priority_stats (priority, open) SELECT coalesce(new.priority, 0), 1 "
+    "WHERE NOT coalesce(new.is_completed, 0) ON CONFLICT (priority) DO UPDATE SET open = open + 1; "
+    "INSERT INTO task_due_stats (day, open) SELECT date(new.due_date), 1 "
+    "WHERE NOT coalesce(new.is_completed, 0) AND new.due_date IS NOT NULL "
+    "ON CONFLICT (day) DO UPDATE SET open = open + 1; END",
+    "CREATE TRIGGER IF NOT EXISTS task_rollups_ad AFTER DELETE ON tasks BEGIN "
+    "UPDATE task_priority_stats SET open = open - 1 "
+    "WHERE NOT coalesce(old.is_completed, 0) AND priority = coalesce(old.priority, 0); "
+    "UPDATE task_due_stats SET open = open - 1 "
+    "WHERE NOT coalesce(old.is_completed, 0) AND old.due_date IS NOT NULL AND day = date(old.due_date); END",
+    "CREATE TRIGGER IF NOT EXISTS task_rollups_au_open AFTER UPDATE OF is_completed, priority, due_date ON tasks BEGIN "
+    "UPDATE task_priority_stats SET open = open - 1 "
+    "WHERE NOT coalesce(old.is_completed, 0) AND priority = coalesce(old.priority, 0); "
+    "INSERT INTO task_priority_stats (priority, open) SELECT coalesce(new.priority, 0), 1 "
+    "WHERE NOT coalesce(new.is_completed, 0) ON CONFLICT (priority) DO UPDATE SET open = open + 1; "
+    "UPDATE task_due_stats SET open = open - 1 "
+    "WHERE NOT coalesce(old.is_completed, 0) AND old.due_date IS NOT NULL AND day = date(old.due_date); "
+    "INSERT INTO task_due_stats (day, open) SELECT date(new.due_date), 1 "
+    "WHERE NOT coalesce(new.is_completed, 0) AND new.due_date IS NOT NULL "
+    "ON CONFLICT (day) DO UPDATE SET open = open + 1; END",
+    "CREATE TRIGGER IF NOT EXISTS task_rollups_au_completed AFTER UPDATE OF is_completed ON tasks "
+    "WHEN coalesce(old.is_completed, 0) != coalesce(new.is_completed, 0) BEGIN "
+    "UPDATE tasks SET completed_at = CASE WHEN new.is_completed THEN strftime('%%Y-%%m-%%d %%H:%%M:%%f', 'now') END "
+    "WHERE id = new.id; "
+    # Seconds are computed from the exact text stored in completed_at so reopening subtracts the same amount.
+    "INSERT INTO task_daily_stats (day, created, completed, completion_seconds) "
+    "SELECT date('now'), 0, 1, (julianday(strftime('%%Y-%%m-%%d %%H:%%M:%%f', 'now')) - julianday(new.created_at)) * 86400.0 "
+    "WHERE new.is_completed "
+    "ON CONFLICT (day) DO UPDATE SET completed = completed + 1, "
+    "completion_seconds = completion_seconds + excluded.completion_seconds; "
+    "UPDATE task_daily_stats SET completed = completed - 1, "
+    "completion_seconds = completion_seconds - (julianday(old.completed_at) - julianday(old.created_at)) * 86400.0 "
+    "WHERE NOT coalesce(new.is_completed, 0) AND old.completed_at IS NOT NULL AND day = date(old.completed_at); END",
+)
+
+_POSTGRES_ROLLUP_DDL = (
+    "INSERT INTO task_daily_stats (day, created, completed, completion_seconds) "
+    "SELECT created_at::date, count(*), 0, 0 FROM tasks GROUP BY 1 ON CONFLICT (day) DO NOTHING",
+    "INSERT INTO task_priority_stats (priority, open) "
+    "SELECT coalesce(priority, 0), count(*) FROM tasks WHERE NOT is_completed GROUP BY 1 "
+    "ON CONFLICT (priority) DO NOTHING",
+    "INSERT INTO task_due_stats (day, open) "
+    "SELECT due_date::date, count(*) FROM tasks WHERE NOT is_completed AND due_date IS NOT NULL GROUP BY 1 "
+    "ON CONFLICT (day) DO NOTHING",
+    """
+    CREATE OR REPLACE FUNCTION task_rollups_stamp_completed_at() RETURNS trigger AS $$
+    BEGIN
+        IF NOT coalesce(NEW.is_completed, false) THEN
+            NEW.completed_at := NULL;
+        ELSIF TG_OP = 'INSERT' THEN
+            NEW.completed_at := NEW.created_at;
+        ELSIF NOT coalesce(OLD.is_completed, false) THEN
+            NEW.completed_at := now() AT TIME ZONE 'utc';
+        END IF;
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION task_rollups_on_insert() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO task_daily_stats (day, created, completed, completion_seconds)
+        SELECT created_at::date, count(*), count(*) FILTER (WHERE is_completed), 0 FROM inserted GROUP BY 1
+        ON CONFLICT (day) DO UPDATE SET created = task_daily_stats.created + excluded.created,
+            completed = task_daily_stats.completed + excluded.completed;
+        INSERT INTO task_priority_stats (priority, open)
+        SELECT coalesce(priority, 0), count(*) FROM inserted WHERE NOT is_completed GROUP BY 1
+        ON CONFLICT (priority) DO UPDATE SET open = task_priority_stats.open + excluded.open;
+        INSERT INTO task_due_stats (day, open)
+        SELECT due_date::date, count(*) FROM inserted WHERE NOT is_completed AND due_date IS NOT NULL GROUP BY 1
+        ON CONFLICT (day) DO UPDATE SET open = task_due_stats.open + excluded.open;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION task_rollups_on_delete() RETURNS trigger AS $$
+    BEGIN
+        UPDATE task_priority_stats AS s SET open = s.open - d.n
+        FROM (SELECT coalesce(priority, 0) AS priority, count(*) AS n FROM deleted WHERE NOT is_completed GROUP BY 1) AS d
+        WHERE s.priority = d.priority;
+        UPDATE task_due_stats AS s SET open = s.open - d.n
+        FROM (
+            SELECT due_date::date AS day, count(*) AS n FROM deleted
+            WHERE NOT is_completed AND due_date IS NOT NULL GROUP BY 1
+        ) AS d
+        WHERE s.day = d.day;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION task_rollups_on_update() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO task_priority_stats (priority, open)
+        SELECT priority, sum(delta) FROM (
+            SELECT coalesce(priority, 0) AS priority, -1 AS delta FROM old_rows WHERE NOT is_completed
+            UNION ALL
+            SELECT coalesce(priority, 0), 1 FROM new_rows WHERE NOT is_completed
+        ) AS d GROUP BY priority HAVING sum(delta) <> 0
+        ON CONFLICT (priority) DO UPDATE SET open = task_priority_stats.open + excluded.open;
+        INSERT INTO task_due_stats (day, open)
+        SELECT day, sum(delta) FROM (
+            SELECT due_date::date AS day, -1 AS delta FROM old_rows WHERE NOT is_completed AND due_date IS NOT NULL
+            UNION ALL
+            SELECT due_date::date, 1 FROM new_rows WHERE NOT is_completed AND due_date IS NOT NULL
+        ) AS d GROUP BY day HAVING sum(delta) <> 0
+        ON CONFLICT (day) DO UPDATE SET open = task_due_stats.open + excluded.open;
+        INSERT INTO task_daily_stats (day, created, completed, completion_seconds)
+        SELECT day, 0, sum(n), sum(seconds) FROM (
+            SELECT n.completed_at::date AS day, 1 AS n, extract(epoch FROM n.completed_at - n.created_at) AS seconds
+            FROM new_rows AS n JOIN old_rows AS o USING (id)
+            WHERE n.is_completed AND NOT o.is_completed
+            UNION ALL
+            SELECT o.completed_at::date, -1, -extract(epoch FROM o.completed_at - o.created_at)
+            FROM new_rows AS n JOIN old_rows AS o USING (id)
+            WHERE o.is_completed AND NOT n.is_completed AND o.completed_at IS NOT NULL
+        ) AS d GROUP BY day
+        ON CONFLICT (day) DO UPDATE SET completed = task_daily_stats.completed + excluded.completed,
+            completion_seconds = task_daily_stats.completion_seconds + excluded.completion_seconds;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS task_rollups_completed_at ON tasks",
+    "CREATE TRIGGER task_rollups_completed_at BEFORE INSERT OR UPDATE OF is_completed ON tasks "
+    "FOR EACH ROW EXECUTE FUNCTION task_rollups_stamp_completed_at()",
+    "DROP TRIGGER IF EXISTS task_rollups_ai ON tasks",
+    "CREATE TRIGGER task_rollups_ai AFTER INSERT ON tasks REFERENCING NEW TABLE AS inserted "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_rollups_on_insert()",
+    "DROP TRIGGER IF EXISTS task_rollups_ad ON tasks",
+    "CREATE TRIGGER task_rollups_ad AFTER DELETE ON tasks REFERENCING OLD TABLE AS deleted "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_rollups_on_delete()",
+    "DROP TRIGGER IF EXISTS task_rollups_au ON tasks",
+    "CREATE TRIGGER task_rollups_au AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_rollups_on_update()",
+)
+
+
+def _execute_dialect_ddl(sqlite: tuple[str, ...], postgresql: tuple[str, ...]) -> None:
+    # The same statements create_all installs; DDL() applies the same %-escaping.
+    statements = {"sqlite": sqlite, "postgresql": postgresql}.get(op.get_context().dialect.name, ())
+    for statement in statements:
+        op.execute(sa.DDL(statement))
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tasks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("is_completed", sa.Boolean(), nullable=False),
+        sa.Column("priority", sa.Integer(), nullable=False),
+        sa.Column("due_date", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+        sa.Column("reminder_lease_until", sa.DateTime(), nullable=True),
+        sa.Column("reminded_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_tasks_id", "tasks", ["id"])
+    op.create_index("ix_tasks_priority_due_date_id", "tasks", [sa.text("priority DESC"), "due_date", "id"])
+    op.create_index("ix_tasks_is_completed_due_date", "tasks", ["is_completed", "due_date"])
+
+    op.create_table(
+        "task_counters",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "task_daily_stats",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("created", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=False),
+        sa.Column("completion_seconds", sa.Float(), nullable=False),
+    )
+    op.create_table(
+        "task_priority_stats",
+        sa.Column("priority", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("open", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "task_due_stats",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("open", sa.Integer(), nullable=False),
+    )
+
+    _execute_dialect_ddl(SQLITE_SEARCH_DDL, POSTGRES_SEARCH_DDL)
+    _execute_dialect_ddl(_SQLITE_COUNTER_DDL, _POSTGRES_COUNTER_DDL)
+    _execute_dialect_ddl(_SQLITE_ROLLUP_DDL, _POSTGRES_ROLLUP_DDL)
+
+
+_POSTGRES_FUNCTIONS = (
+    "task_counters_on_insert",
+    "task_counters_on_delete",
+    "task_counters_on_update",
+    "task_rollups_stamp_completed_at",
+    "task_rollups_on_insert",
+    "task_rollups_on_delete",
+    "task_rollups_on_update",
+)
+
+
+def downgrade() -> None:
+    # Dropping the tables drops their triggers; the FTS table and trigger functions go separately.
+    dialect = op.get_context().dialect.name
+    if dialect == "sqlite":
+        op.execute("DROP TABLE IF EXISTS tasks_fts")
+    op.drop_table("task_due_stats")
+    op.drop_table("task_priority_stats")
+    op.drop_table("task_daily_stats")
+    op.drop_table("task_counters")
+    op.drop_table("tasks")
+    if dialect == "postgresql":
+        for name in _POSTGRES_FUNCTIONS:
+            op.execute(f"DROP FUNCTION IF EXISTS {name}()")
@@ -0,0 +1,409 @@
+"""Task ownership: tasks.owner_id, owner-leading indexes and per-owner counters and rollups.
+
+Existing tasks keep a NULL owner and are counted under owner 0. Daily history is carried
+over to owner 0; the counters and open-task rollups are re-seeded from the tasks table.
+
+Revision ID: 003
+Revises: 002
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import context, op
+
+from app.core.search import SQLITE_SEARCH_DDL
+
+
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+# The per-owner counter and rollup triggers as of this revision, copied rather than imported
+# so later edits to app/core/counters.py and app/core/rollups.py cannot change this migration.
+
+# Seeds the counter rows from the current table contents; a no-op for owners that already have one.
+_COUNTER_SEED = (
+    "INSERT INTO task_counters (owner_id, total, completed) "
+    "SELECT coalesce(owner_id, 0), count(*), coalesce(sum(CASE WHEN is_completed THEN 1 ELSE 0 END), 0) "
+    "FROM tasks GROUP BY coalesce(owner_id, 0) "
+    "ON CONFLICT (owner_id) DO NOTHING"
+)
+
+# SQLite: row-level triggers run inside the writing statement's transaction.
+_SQLITE_COUNTER_DDL = (
+    _COUNTER_SEED,
+    "CREATE TRIGGER IF NOT EXISTS task_counters_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO task_counters (owner_id, total, completed) "
+    "VALUES (coalesce(new.owner_id, 0), 1, coalesce(new.is_completed, 0)) "
+    "ON CONFLICT (owner_id) DO UPDATE SET total = total + 1, completed = completed + excluded.completed; END",
+    "CREATE TRIGGER IF NOT EXISTS task_counters_ad AFTER DELETE ON tasks BEGIN "
+    "UPDATE task_counters SET total = total - 1, completed = completed - coalesce(old.is_completed, 0) "
+    "WHERE owner_id = coalesce(old.owner_id, 0); END",
+    "CREATE TRIGGER IF NOT EXISTS task_counters_au AFTER UPDATE OF is_completed ON tasks BEGIN "
+    "UPDATE task_counters SET completed = completed + coalesce(new.is_completed, 0) - coalesce(old.is_completed, 0) "
+    "WHERE owner_id = coalesce(new.owner_id, 0); END",
+)
+
+# PostgreSQL: statement-level triggers with transition tables, so a bulk write touches
+# each owner's counter row once per statement instead of once per task.
+_POSTGRES_COUNTER_DDL = (
+    _COUNTER_SEED,
+    """
+    CREATE OR REPLACE FUNCTION task_counters_on_insert() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO task_counters (owner_id, total, completed)
+        SELECT coalesce(owner_id, 0), count(*), count(*) FILTER (WHERE is_completed) FROM inserted GROUP BY 1
+        ON CONFLICT (owner_id) DO UPDATE SET total = task_counters.total + excluded.total,
+            completed = task_counters.completed + excluded.completed;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION task_counters_on_delete() RETURNS trigger AS $$
+    BEGIN
+        UPDATE task_counters SET total = total - d.n, completed = completed - d.c
+        FROM (
+            SELECT coalesce(owner_id, 0) AS owner_id, count(*) AS n, count(*) FILTER (WHERE is_completed) AS c
+            FROM deleted GROUP BY 1
+        ) AS d
+        WHERE task_counters.owner_id = d.owner_id;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION task_counters_on_update() RETURNS trigger AS $$
+    BEGIN
+        UPDATE task_counters SET completed = completed + d.delta
+        FROM (
+            SELECT owner_id, sum(delta) AS delta FROM (
+                SELECT coalesce(owner_id, 0) AS owner_id, -1 AS delta FROM old_rows WHERE is_completed
+                UNION ALL
+                SELECT coalesce(owner_id, 0), 1 FROM new_rows WHERE is_completed
+            ) AS changes GROUP BY owner_id HAVING sum(delta) <> 0
+        ) AS d
+        WHERE task_counters.owner_id = d.owner_id;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS task_counters_ai ON tasks",
+    "CREATE TRIGGER task_counters_ai AFTER INSERT ON tasks REFERENCING NEW TABLE AS inserted "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_counters_on_insert()",
+    "DROP TRIGGER IF EXISTS task_counters_ad ON tasks",
+    "CREATE TRIGGER task_counters_ad AFTER DELETE ON tasks REFERENCING OLD TABLE AS deleted "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_counters_on_delete()",
+    "DROP TRIGGER IF EXISTS task_counters_au ON tasks",
+    "CREATE TRIGGER task_counters_au AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_counters_on_update()",
+)
+
+
+# SQLite: row-level triggers. Each seed statement is a no-op once its rows exist.
+_SQLITE_ROLLUP_DDL = (
+    "INSERT INTO task_daily_stats (owner_id, day, created, completed, completion_seconds) "
+    "SELECT coalesce(owner_id, 0), date(created_at), count(*), 0, 0 FROM tasks GROUP BY 1, 2 "
+    "ON CONFLICT (owner_id, day) DO NOTHING",
+    "INSERT INTO task_priority_stats (owner_id, priority, open) "
+    "SELECT coalesce(owner_id, 0), coalesce(priority, 0), count(*) FROM tasks "
+    "WHERE NOT coalesce(is_completed, 0) GROUP BY 1, 2 ON CONFLICT (owner_id, priority) DO NOTHING",
+    "INSERT INTO task_due_stats (owner_id, day, open) "
+    "SELECT coalesce(owner_id, 0), date(due_date), count(*) FROM tasks "
+    "WHERE NOT coalesce(is_completed, 0) AND due_date IS NOT NULL GROUP BY 1, 2 "
+    "ON CONFLICT (owner_id, day) DO NOTHING",
+    "CREATE TRIGGER IF NOT EXISTS task_rollups_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO task_daily_stats (owner_id, day, created, completed, completion_seconds) "
+    "VALUES (coalesce(new.owner_id, 0), date(new.created_at), 1, coalesce(new.is_completed, 0), 0) "
+    "ON CONFLICT (owner_id, day) DO UPDATE SET created = created + 1, completed = completed + excluded.completed; "
+    "UPDATE tasks SET completed_at = new.created_at WHERE id = new.id AND coalesce(new.is_completed, 0); "
+    "INSERT INTO task_priority_stats (owner_id, priority, open) "
+    "SELECT coalesce(new.owner_id, 0), coalesce(new.priority, 0), 1 WHERE NOT coalesce(new.is_completed, 0) "
+    "ON CONFLICT (owner_id, priority) DO UPDATE SET open = open + 1; "
+    "INSERT INTO task_due_stats (owner_id, day, open) SELECT coalesce(new.owner_id, 0), date(new.due_date), 1 "
+    "WHERE NOT coalesce(new.is_completed, 0) AND new.due_date IS NOT NULL "
+    "ON CONFLICT (owner_id, day) DO UPDATE SET open = open + 1; END",
+    "CREATE TRIGGER IF NOT EXISTS task_rollups_ad AFTER DELETE ON tasks BEGIN "
+    "UPDATE task_priority_stats SET open = open - 1 WHERE NOT coalesce(old.is_completed, 0) "
+    "AND owner_id = coalesce(old.owner_id, 0) AND priority = coalesce(old.priority, 0); "
+    "UPDATE task_due_stats SET open = open - 1 WHERE NOT coalesce(old.is_completed, 0) AND old.due_date IS NOT NULL "
+    "AND owner_id = coalesce(old.owner_id, 0) AND day = date(old.due_date); END",
+    "CREATE TRIGGER IF NOT EXISTS task_rollups_au_open AFTER UPDATE OF is_completed, priority, due_date ON tasks BEGIN "
+    "UPDATE task_priority_stats SET open = open - 1 WHERE NOT coalesce(old.is_completed, 0) "
+    "AND owner_id = coalesce(old.owner_id, 0) AND priority = coalesce(old.priority, 0); "
+    "INSERT INTO task_priority_stats (owner_id, priority, open) "
+    "SELECT coalesce(new.owner_id, 0), coalesce(new.priority, 0), 1 WHERE NOT coalesce(new.is_completed, 0) "
+    "ON CONFLICT (owner_id, priority) DO UPDATE SET open = open + 1; "
+    "UPDATE task_due_stats SET open = open - 1 WHERE NOT coalesce(old.is_completed, 0) AND old.due_date IS NOT NULL "
+    "AND owner_id = coalesce(old.owner_id, 0) AND day = date(old.due_date); "
+    "INSERT INTO task_due_stats (owner_id, day, open) SELECT coalesce(new.owner_id, 0), date(new.due_date), 1 "
+    "WHERE NOT coalesce(new.is_completed, 0) AND new.due_date IS NOT NULL "
+    "ON CONFLICT (owner_id, day) DO UPDATE SET open = open + 1; END",
+    "CREATE TRIGGER IF NOT EXISTS task_rollups_au_completed AFTER UPDATE OF is_completed ON tasks "
+    "WHEN coalesce(old.is_completed, 0) != coalesce(new.is_completed, 0) BEGIN "
+    "UPDATE tasks SET completed_at = CASE WHEN new.is_completed THEN strftime('%%Y-%%m-%%d %%H:%%M:%%f', 'now') END "
+    "WHERE id = new.id; "
+    # Seconds are computed from the exact text stored in completed_at so reopening subtracts the same amount.
+    "INSERT INTO task_daily_stats (owner_id, day, created, completed, completion_seconds) "
+    "SELECT coalesce(new.owner_id, 0), date('now'), 0, 1, "
+    "(julianday(strftime('%%Y-%%m-%%d %%H:%%M:%%f', 'now')) - julianday(new.created_at)) * 86400.0 "
+    "WHERE new.is_completed "
+    "ON CONFLICT (owner_id, day) DO UPDATE SET completed = completed + 1, "
+    "completion_seconds = completion_seconds + excluded.completion_seconds; "
+    "UPDATE task_daily_stats SET completed = completed - 1, "
+    "completion_seconds = completion_seconds - (julianday(old.completed_at) - julianday(old.created_at)) * 86400.0 "
+    "WHERE NOT coalesce(new.is_completed, 0) AND old.completed_at IS NOT NULL "
+    "AND owner_id = coalesce(old.owner_id, 0) AND day = date(old.completed_at); END",
+)
+
+# PostgreSQL: a BEFORE row trigger stamps completed_at; statement-level triggers with
+# transition tables then apply one aggregated delta per owner and key per statement.
+_POSTGRES_ROLLUP_DDL = (
+    "INSERT INTO task_daily_stats (owner_id, day, created, completed, completion_seconds) "
+    "SELECT coalesce(owner_id, 0), created_at::date, count(*), 0, 0 FROM tasks GROUP BY 1, 2 "
+    "ON CONFLICT (owner_id, day) DO NOTHING",
+    "INSERT INTO task_priority_stats (owner_id, priority, open) "
+    "SELECT coalesce(owner_id, 0), coalesce(priority, 0), count(*) FROM tasks WHERE NOT is_completed GROUP BY 1, 2 "
+    "ON CONFLICT (owner_id, priority) DO NOTHING",
+    "INSERT INTO task_due_stats (owner_id, day, open) "
+    "SELECT coalesce(owner_id, 0), due_date::date, count(*) FROM tasks "
+    "WHERE NOT is_completed AND due_date IS NOT NULL GROUP BY 1, 2 "
+    "ON CONFLICT (owner_id, day) DO NOTHING",
+    """
+    CREATE OR REPLACE FUNCTION task_rollups_stamp_completed_at() RETURNS trigger AS $$
+    BEGIN
+        IF NOT coalesce(NEW.is_completed, false) THEN
+            NEW.completed_at := NULL;
+        ELSIF TG_OP = 'INSERT' THEN
+            NEW.completed_at := NEW.created_at;
+        ELSIF NOT coalesce(OLD.is_completed, false) THEN
+            NEW.completed_at := now() AT TIME ZONE 'utc';
+        END IF;
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION task_rollups_on_insert() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO task_daily_stats (owner_id, day, created, completed, completion_seconds)
+        SELECT coalesce(owner_id, 0), created_at::date, count(*), count(*) FILTER (WHERE is_completed), 0
+        FROM inserted GROUP BY 1, 2
+        ON CONFLICT (owner_id, day) DO UPDATE SET created = task_daily_stats.created + excluded.created,
+            completed = task_daily_stats.completed + excluded.completed;
+        INSERT INTO task_priority_stats (owner_id, priority, open)
+        SELECT coalesce(owner_id, 0), coalesce(priority, 0), count(*) FROM inserted WHERE NOT is_completed GROUP BY 1, 2
+        ON CONFLICT (owner_id, priority) DO UPDATE SET open = task_priority_stats.open + excluded.open;
+        INSERT INTO task_due_stats (owner_id, day, open)
+        SELECT coalesce(owner_id, 0), due_date::date, count(*) FROM inserted
+        WHERE NOT is_completed AND due_date IS NOT NULL GROUP BY 1, 2
+        ON CONFLICT (owner_id, day) DO UPDATE SET open = task_due_stats.open + excluded.open;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION task_rollups_on_delete() RETURNS trigger AS $$
+    BEGIN
+        UPDATE task_priority_stats AS s SET open = s.open - d.n
+        FROM (
+            SELECT coalesce(owner_id, 0) AS owner_id, coalesce(priority, 0) AS priority, count(*) AS n
+            FROM deleted WHERE NOT is_completed GROUP BY 1, 2
+        ) AS d
+        WHERE s.owner_id = d.owner_id AND s.priority = d.priority;
+        UPDATE task_due_stats AS s SET open = s.open - d.n
+        FROM (
+            SELECT coalesce(owner_id, 0) AS owner_id, due_date::date AS day, count(*) AS n FROM deleted
+            WHERE NOT is_completed AND due_date IS NOT NULL GROUP BY 1, 2
+        ) AS d
+        WHERE s.owner_id = d.owner_id AND s.day = d.day;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION task_rollups_on_update() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO task_priority_stats (owner_id, priority, open)
+        SELECT owner_id, priority, sum(delta) FROM (
+            SELECT coalesce(owner_id, 0) AS owner_id, coalesce(priority, 0) AS priority, -1 AS delta
+            FROM old_rows WHERE NOT is_completed
+            UNION ALL
+            SELECT coalesce(owner_id, 0), coalesce(priority, 0), 1 FROM new_rows WHERE NOT is_completed
+        ) AS d GROUP BY owner_id, priority HAVING sum(delta) <> 0
+        ON CONFLICT (owner_id, priority) DO UPDATE SET open = task_priority_stats.open + excluded.open;
+        INSERT INTO task_due_stats (owner_id, day, open)
+        SELECT owner_id, day, sum(delta) FROM (
+            SELECT coalesce(owner_id, 0) AS owner_id, due_date::date AS day, -1 AS delta
+            FROM old_rows WHERE NOT is_completed AND due_date IS NOT NULL
+            UNION ALL
+            SELECT coalesce(owner_id, 0), due_date::date, 1
+            FROM new_rows WHERE NOT is_completed AND due_date IS NOT NULL
+        ) AS d GROUP BY owner_id, day HAVING sum(delta) <> 0
+        ON CONFLICT (owner_id, day) DO UPDATE SET open = task_due_stats.open + excluded.open;
+        INSERT INTO task_daily_stats (owner_id, day, created, completed, completion_seconds)
+        SELECT owner_id, day, 0, sum(n), sum(seconds) FROM (
+            SELECT coalesce(n.owner_id, 0) AS owner_id, n.completed_at::date AS day, 1 AS n,
+                extract(epoch FROM n.completed_at - n.created_at) AS seconds
+            FROM new_rows AS n JOIN old_rows AS o USING (id)
+            WHERE n.is_completed AND NOT o.is_completed
+            UNION ALL
+            SELECT coalesce(o.owner_id, 0), o.completed_at::date, -1, -extract(epoch FROM o.completed_at - o.created_at)
+            FROM new_rows AS n JOIN old_rows AS o USING (id)
+            WHERE o.is_completed AND NOT n.is_completed AND o.completed_at IS NOT NULL
+        ) AS d GROUP BY owner_id, day
+        ON CONFLICT (owner_id, day) DO UPDATE SET completed = task_daily_stats.completed + excluded.completed,
+            completion_seconds = task_daily_stats.completion_seconds + excluded.completion_seconds;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS task_rollups_completed_at ON tasks",
+    "CREATE TRIGGER task_rollups_completed_at BEFORE INSERT OR UPDATE OF is_completed ON tasks "
+    "FOR EACH ROW EXECUTE FUNCTION task_rollups_stamp_completed_at()",
+    "DROP TRIGGER IF EXISTS task_rollups_ai ON tasks",
+    "CREATE TRIGGER task_rollups_ai AFTER INSERT ON tasks REFERENCING NEW TABLE AS inserted "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_rollups_on_insert()",
+    "DROP TRIGGER IF EXISTS task_rollups_ad ON tasks",
+    "CREATE TRIGGER task_rollups_ad AFTER DELETE ON tasks REFERENCING OLD TABLE AS deleted "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_rollups_on_delete()",
+    "DROP TRIGGER IF EXISTS task_rollups_au ON tasks",
+    "CREATE TRIGGER task_rollups_au AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_rollups_on_update()",
+)
+
+
+# SQLite creates these with IF NOT EXISTS, so the old ones must go before the new DDL runs.
+# The PostgreSQL DDL replaces its functions and triggers itself.
+_SQLITE_TRIGGERS = (
+    "task_counters_ai",
+    "task_counters_ad",
+    "task_counters_au",
+    "task_rollups_ai",
+    "task_rollups_ad",
+    "task_rollups_au_open",
+    "task_rollups_au_completed",
+)
+
+
+def _execute_dialect_ddl(sqlite: tuple[str, ...], postgresql: tuple[str, ...]) -> None:
+    statements = {"sqlite": sqlite, "postgresql": postgresql}.get(op.get_context().dialect.name, ())
+    for statement in statements:
+        op.execute(sa.DDL(statement))
+
+
+def _drop_sqlite_triggers() -> None:
+    if op.get_context().dialect.name == "sqlite":
+        for name in _SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def _drop_stats_tables() -> None:
+    for name in ("task_due_stats", "task_priority_stats", "task_daily_stats", "task_counters"):
+        op.drop_table(name)
+
+
+def upgrade() -> None:
+    # Named as PostgreSQL would name it; batch mode needs a name.
+    owner_fk = sa.ForeignKey("users.id", ondelete="CASCADE", name="tasks_owner_id_fkey")
+    owner_id = sa.Column("owner_id", sa.Integer(), owner_fk, nullable=True)
+    if op.get_context().dialect.name == "sqlite":
+        # SQLite cannot add a foreign key constraint in place. Rebuilding tasks drops all of its
+        # triggers, so the search triggers are reinstalled below with the others.
+        with op.batch_alter_table("tasks") as batch:
+            batch.add_column(owner_id)
+    else:
+        op.add_column("tasks", owner_id)
+    op.drop_index("ix_tasks_priority_due_date_id", "tasks")
+    op.create_index("ix_tasks_owner_completed_priority_id", "tasks", ["owner_id", "is_completed", "priority", "id"])
+    op.create_index(
+        "ix_tasks_owner_priority_due_date_id", "tasks", ["owner_id", sa.text("priority DESC"), "due_date", "id"]
+    )
+
+    _drop_sqlite_triggers()
+    op.execute("CREATE TABLE task_daily_stats_v1 AS SELECT * FROM task_daily_stats")
+    _drop_stats_tables()
+    op.create_table(
+        "task_counters",
+        sa.Column("owner_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "task_daily_stats",
+        sa.Column("owner_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("created", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=False),
+        sa.Column("completion_seconds", sa.Float(), nullable=False),
+    )
+    op.create_table(
+        "task_priority_stats",
+        sa.Column("owner_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("priority", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("open", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "task_due_stats",
+        sa.Column("owner_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("open", sa.Integer(), nullable=False),
+    )
+    op.execute(
+        "INSERT INTO task_daily_stats (owner_id, day, created, completed, completion_seconds) "
+        "SELECT 0, day, created, completed, completion_seconds FROM task_daily_stats_v1"
+    )
+    op.drop_table("task_daily_stats_v1")
+
+    _execute_dialect_ddl(SQLITE_SEARCH_DDL, ())
+    _execute_dialect_ddl(_SQLITE_COUNTER_DDL, _POSTGRES_COUNTER_DDL)
+    _execute_dialect_ddl(_SQLITE_ROLLUP_DDL, _POSTGRES_ROLLUP_DDL)
+
+
+def downgrade() -> None:
+    # The single-owner DDL is frozen in 001.
+    v1 = context.script.get_revision("001").module
+    dialect = op.get_context().dialect.name
+
+    _drop_sqlite_triggers()
+    op.execute(
+        "CREATE TABLE task_daily_stats_v2 AS SELECT day, sum(created) AS created, sum(completed) AS completed, "
+        "sum(completion_seconds) AS completion_seconds FROM task_daily_stats GROUP BY day"
+    )
+    _drop_stats_tables()
+    op.create_table(
+        "task_counters",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "task_daily_stats",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("created", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=False),
+        sa.Column("completion_seconds", sa.Float(), nullable=False),
+    )
+    op.create_table(
+        "task_priority_stats",
+        sa.Column("priority", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("open", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "task_due_stats",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("open", sa.Integer(), nullable=False),
+    )
+    op.execute(
+        "INSERT INTO task_daily_stats (day, created, completed, completion_seconds) "
+        "SELECT day, created, completed, completion_seconds FROM task_daily_stats_v2"
+    )
+    op.drop_table("task_daily_stats_v2")
+
+    op.drop_index("ix_tasks_owner_priority_due_date_id", "tasks")
+    op.drop_index("ix_tasks_owner_completed_priority_id", "tasks")
+    op.create_index("ix_tasks_priority_due_date_id", "tasks", [sa.text("priority DESC"), "due_date", "id"])
+    if dialect == "sqlite":
+        # As in upgrade(): the rebuild drops the search triggers too.
+        with op.batch_alter_table("tasks") as batch:
+            batch.drop_column("owner_id")
+    else:
+        op.drop_column("tasks", "owner_id")
+
+    _execute_dialect_ddl(SQLITE_SEARCH_DDL, ())
+    _execute_dialect_ddl(v1._SQLITE_COUNTER_DDL, v1._POSTGRES_COUNTER_DDL)
+    _execute_dialect_ddl(v1._SQLITE_ROLLUP_DDL, v1._POSTGRES_ROLLUP_DDL)
@@ -0,0 +1,42 @@
+"""Task indexes ordered with undated tasks last, for "next up" reads and sort=due_date.
+
+Revision ID: 004
+Revises: 003
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+# As declared in app/core/models.py; compiled per dialect like the model's index.
+_DUE_DATE_NULLS_LAST = (sa.column("due_date").is_(None), "due_date", "id")
+
+
+def upgrade() -> None:
+    op.drop_index("ix_tasks_owner_completed_priority_id", "tasks")
+    op.drop_index("ix_tasks_owner_priority_due_date_id", "tasks")
+    op.create_index(
+        "ix_tasks_owner_completed_priority_due_date_id",
+        "tasks",
+        ["owner_id", "is_completed", sa.text("priority DESC"), *_DUE_DATE_NULLS_LAST],
+    )
+    op.create_index(
+        "ix_tasks_owner_priority_due_date_id", "tasks", ["owner_id", sa.text("priority DESC"), *_DUE_DATE_NULLS_LAST]
+    )
+    op.create_index("ix_tasks_owner_due_date_id", "tasks", ["owner_id", *_DUE_DATE_NULLS_LAST])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_owner_due_date_id", "tasks")
+    op.drop_index("ix_tasks_owner_priority_due_date_id", "tasks")
+    op.drop_index("ix_tasks_owner_completed_priority_due_date_id", "tasks")
+    op.create_index("ix_tasks_owner_completed_priority_id", "tasks", ["owner_id", "is_completed", "priority", "id"])
+    op.create_index(
+        "ix_tasks_owner_priority_due_date_id", "tasks", ["owner_id", sa.text("priority DESC"), "due_date", "id"]
+    )
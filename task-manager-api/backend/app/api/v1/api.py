@@ -1,10 +1,12 @@
 from fastapi import APIRouter
 
-from .endpoints import tasks, stats
+from .endpoints import auth, tasks, stats, users
 
 
 api_router = APIRouter()
 api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
 api_router.include_router(stats.router, prefix="/stats", tags=["stats"])
+api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
+api_router.include_router(users.router, prefix="/users", tags=["users"])
 
 
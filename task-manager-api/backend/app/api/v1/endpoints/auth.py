@@ -10,7 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ....core.database import AsyncSessionLocal
 from ....core.models import User
 from ....core.schemas import Token
-from ....core.security import create_access_token, verify_password
+from ....core.security import create_access_token, get_password_hasher
 from ....core.config import get_settings
 
 
@@ -31,8 +31,16 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()) -> Token:
 async def _authenticate_user(session: AsyncSession, email: str, password: str) -> User | None:
     result = await session.execute(select(User).where(User.email == email))
     user = result.scalar_one_or_none()
-    if user and verify_password(password, user.hashed_password):
-        return user
-    return None
+    if user is None:
+        return None
+    # bcrypt runs on the hasher's thread pool; the event loop keeps serving other requests.
+    verified, new_hash = await get_password_hasher().verify_and_update(password, user.hashed_password)
+    if not verified:
+        return None
+    if new_hash is not None:
+        # Stored hash used an outdated cost (bcrypt_rounds changed): upgrade it transparently.
+        user.hashed_password = new_hash
+        await session.commit()
+    return user
 
 
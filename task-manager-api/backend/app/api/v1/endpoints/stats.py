@@ -1,20 +1,81 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import func, select
+from datetime import datetime, timedelta
 
-from ....core.dependencies import DbSession
-from ....core.models import Task
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from ....core.config import get_settings
+from ....core.database import profiler
+from ....core.dependencies import AdminUser, CurrentUser, DbSession
+from ....core.schemas import DailyStatsReport, DueCounts, PriorityCount, ProfilingState
+from ....services.analytics_service import get_daily_stats, get_due_counts, get_priority_histogram, get_task_summary
+from ....services.cache_service import cache_key, get_cache, stats_tag
 
 
 router = APIRouter()
 
 
+# Every dashboard is the current user's own; results are cached per owner.
 @router.get("/summary")
-async def stats_summary(db: DbSession) -> dict[str, int]:
-    total = await db.scalar(select(func.count()).select_from(Task))
-    completed = await db.scalar(select(func.count()).select_from(Task).where(Task.is_completed.is_(True)))
-    pending = (total or 0) - (completed or 0)
-    return {"total": int(total or 0), "completed": int(completed or 0), "pending": int(pending)}
+async def stats_summary(db: DbSession, current_user: CurrentUser) -> dict[str, int]:
+    owner_id = current_user.id
+    key = cache_key("stats:summary", owner=owner_id)
+    return await get_cache().get_or_set(key, lambda: get_task_summary(db, owner_id), tags=(stats_tag(owner_id),))
+
+
+@router.get("/daily", response_model=DailyStatsReport)
+async def stats_daily(
+    db: DbSession, current_user: CurrentUser, days: int = Query(30, ge=1, le=366)
+) -> DailyStatsReport:
+    """Created and completed tasks per UTC day, with completion rate and mean time to complete."""
+    owner_id = current_user.id
+    today = datetime.utcnow().date()
+    start = today - timedelta(days=days - 1)
+    key = cache_key("stats:daily", owner=owner_id, start=start, end=today)
+    return await get_cache().get_or_set(
+        key, lambda: get_daily_stats(db, owner_id, start, today), tags=(stats_tag(owner_id),)
+    )
+
+
+@router.get("/priorities", response_model=list[PriorityCount])
+async def stats_priorities(db: DbSession, current_user: CurrentUser) -> list[PriorityCount]:
+    """Open tasks per priority."""
+    owner_id = current_user.id
+    key = cache_key("stats:priorities", owner=owner_id)
+    return await get_cache().get_or_set(key, lambda: get_priority_histogram(db, owner_id), tags=(stats_tag(owner_id),))
+
+
+@router.get("/due", response_model=DueCounts)
+async def stats_due(
+    db: DbSession, current_user: CurrentUser, upcoming_days: int = Query(7, ge=1, le=90)
+) -> DueCounts:
+    """Open tasks overdue, due today and due within ``upcoming_days`` (UTC days)."""
+    owner_id = current_user.id
+    today = datetime.utcnow().date()
+    key = cache_key("stats:due", owner=owner_id, today=today, upcoming_days=upcoming_days)
+    return await get_cache().get_or_set(
+        key, lambda: get_due_counts(db, owner_id, today, upcoming_days), tags=(stats_tag(owner_id),)
+    )
+
+
+@router.get("/profiling", response_model=ProfilingState)
+async def get_profiling(admin: AdminUser) -> ProfilingState:
+    return ProfilingState(enabled=profiler.enabled, slow_query_ms=profiler.slow_query_seconds * 1000)
 
 
+@router.put("/profiling", response_model=ProfilingState)
+async def set_profiling(payload: ProfilingState, admin: AdminUser) -> ProfilingState:
+    """Switch per-request SQL profiling (Server-Timing, slow-query and N+1 logs) on or off, process-wide."""
+    if payload.slow_query_ms is not None:
+        min_ms = get_settings().sql_slow_query_min_ms
+        if payload.slow_query_ms < min_ms:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"slow_query_ms must be at least {min_ms:g}",
+            )
+        profiler.slow_query_seconds = payload.slow_query_ms / 1000
+    if payload.enabled:
+        profiler.enable()
+    else:
+        profiler.disable()
+    return ProfilingState(enabled=profiler.enabled, slow_query_ms=profiler.slow_query_seconds * 1000)
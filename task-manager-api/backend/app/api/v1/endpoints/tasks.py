@@ -1,76 +1,510 @@
 from __future__ import annotations
 
-from typing import Sequence
+import csv
+import io
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, AsyncIterator, Literal, Sequence
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
-from sqlalchemy import Select, func, select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status, Response
+import orjson
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import ColumnElement, Select, delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ....core.dependencies import DbSession
+from ....core.config import get_settings
+from ....core.database import AsyncSessionLocal, routed_session
+from ....core.dependencies import CurrentUser, DbSession, StreamUser
+from ....core.exceptions import PreconditionFailedError
 from ....core.models import Task
-from ....core.schemas import TaskCreate, TaskOut, TaskUpdate
+from ....core.search import apply_search
+from ....core.schemas import (
+    BulkItemResult,
+    BulkResult,
+    TaskBulkDelete,
+    TaskBulkUpdateItem,
+    TaskCreate,
+    TaskOut,
+    TaskUpdate,
+)
+from ....services.cache_service import cache_key, get_cache, raw_bytes, stats_tag, task_list_tag, task_tag
+from ....services.event_service import get_event_hub, sse_stream
+from ....services.write_batcher import InsertBatcher
+from ....utils import etag
+from ....utils.pagination import KeysetPaginator, Page, SortKey
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+_task_adapter = TypeAdapter(TaskOut)
+
+# Fast read path: select only the TaskOut columns as plain tuples (no ORM identity map, no
+# per-row models) and encode them straight to JSON bytes. The column types already guarantee
+# the TaskOut shape, so re-validating every row would only repeat work.
+TASK_OUT_FIELDS = tuple(TaskOut.model_fields)
+TASK_OUT_COLUMNS = tuple(Task.__table__.c[name] for name in TASK_OUT_FIELDS)
+
+
+def _task_dicts(rows: Sequence[Any]) -> list[dict[str, Any]]:
+    return [dict(zip(TASK_OUT_FIELDS, row)) for row in rows]
+
+
+def _json_response(body: bytes, etag_value: str | None = None) -> Response:
+    # Returning a Response skips FastAPI's second response_model validation pass.
+    headers = {"ETag": etag_value} if etag_value else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _not_modified(etag_value: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag_value})
+
+
+def _task_etag(task_id: int, version: int) -> str:
+    # Transparent so If-Match can be turned back into a version condition on the write itself.
+    return f'"{task_id}-v{version}"'
+
+
+def _if_match_condition(task_id: int, if_match: str | None) -> list[ColumnElement[bool]]:
+    tags = etag.if_match_tags(if_match)
+    if tags is None:
+        return []
+    prefix = f'"{task_id}-v'
+    versions = [int(tag[len(prefix):-1]) for tag in tags if tag.startswith(prefix) and tag[len(prefix):-1].isdigit()]
+    return [Task.version.in_(versions)]
+
+
+async def _write_failed(db: AsyncSession, owner_id: int, task_id: int) -> HTTPException:
+    # Only reached when a conditional write matched no row: tell "gone" apart from "changed".
+    # Other users' tasks are reported as missing.
+    if (await db.execute(select(Task.id).where(Task.id == task_id, Task.owner_id == owner_id))).first() is None:
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    return PreconditionFailedError("Task has been modified")
+
+
+def _task_key(owner_id: int, task_id: int) -> str:
+    # Keyed by owner too: a lookup by anyone else caches its own miss, never the task.
+    return f"{task_tag(task_id)}:owner:{owner_id}"
+
+
+async def _cached_task_etag(db: AsyncSession, owner_id: int, task_id: int) -> str | None:
+    # A one-column primary-key lookup, cached alongside (and invalidated with) the task itself.
+    async def load() -> str | None:
+        row = (await db.execute(select(Task.version).where(Task.id == task_id, Task.owner_id == owner_id))).first()
+        return _task_etag(task_id, row[0]) if row is not None else None
+
+    return await get_cache().get_or_set(f"{_task_key(owner_id, task_id)}:etag", load, tags=(task_tag(task_id),))
+
+
+async def _cached_list_etag(
+    db: AsyncSession, owner_id: int, key: str, q: str | None, is_completed: bool | None, min_priority: int | None
+) -> str:
+    """Collection version for a list query: newest ``updated_at`` and row count over its filter.
+
+    Every insert or update moves the newest timestamp and every delete changes the count,
+    so any write that can change a page changes its ETag.
+    """
+
+    async def load() -> str:
+        stmt = select(func.max(Task.updated_at), func.count(Task.id))
+        latest, count = (await db.execute(_apply_filters(stmt, owner_id, q, is_completed, min_priority))).one()
+        return etag.make_etag(latest.isoformat() if latest else "", count)
+
+    version_key = cache_key("tasks:version", owner=owner_id, q=q, is_completed=is_completed, min_priority=min_priority)
+    version = await get_cache().get_or_set(version_key, load, tags=(task_list_tag(owner_id),))
+    return etag.make_etag(key, version)
+
+# Orderings list endpoints accept. Each matches a tasks index after the owner (and status)
+# columns, term for term, so results come out in index order with no sort step; a new one
+# needs its index.
+TaskSort = Literal["priority", "due_date"]
+_due_date_key = SortKey(Task.due_date, expressions=(Task.due_date.is_(None), Task.due_date))
+TASK_SORT_KEYS: dict[str, tuple[SortKey, ...]] = {
+    "priority": (SortKey(Task.priority, descending=True), _due_date_key, SortKey(Task.id)),
+    "due_date": (_due_date_key, SortKey(Task.id)),
+}
+TASK_SORTS: dict[str, tuple[ColumnElement[Any], ...]] = {
+    name: tuple(KeysetPaginator(keys).order_by()) for name, keys in TASK_SORT_KEYS.items()
+}
+
+task_paginator = KeysetPaginator(TASK_SORT_KEYS["priority"])
+
+
+def _apply_filters(
+    stmt: Select[Any],
+    owner_id: int,
+    q: str | None,
+    is_completed: bool | None,
+    min_priority: int | None,
+    rank: bool = False,
+) -> Select[Any]:
+    # The owner condition comes first: it is the leading column of every tasks index.
+    stmt = stmt.where(Task.owner_id == owner_id)
+    if q:
+        stmt = apply_search(stmt, Task, q, rank=rank)
+    if is_completed is not None:
+        stmt = stmt.where(Task.is_completed == is_completed)
+    if min_priority is not None:
+        stmt = stmt.where(Task.priority >= min_priority)
+    return stmt
+
+
+async def _invalidate_tasks(owner_id: int, *task_ids: int) -> None:
+    tags = (*(task_tag(task_id) for task_id in task_ids), task_list_tag(owner_id), stats_tag(owner_id))
+    await get_cache().invalidate_tags(*tags)
+
+
+async def _publish(type: str, owner_id: int, items: Sequence[Any]) -> None:
+    # Published after commit; the change feed is best-effort and never fails the write itself.
+    try:
+        await get_event_hub().publish(type, items, owner_id=owner_id)
+    except Exception:  # noqa: BLE001
+        logger.warning("Failed to publish %s events", type, exc_info=True)
+
+
+def _with_reminder_reset(changes: dict[str, Any]) -> dict[str, Any]:
+    # A rescheduled task is due for a fresh reminder.
+    if "due_date" in changes:
+        changes["reminded_at"] = None
+    return changes
+
+
+@lru_cache
+def get_task_insert_batcher() -> InsertBatcher:
+    settings = get_settings()
+    return InsertBatcher(
+        insert(Task).returning(*TASK_OUT_COLUMNS, sort_by_parameter_order=True),
+        AsyncSessionLocal,
+        max_items=settings.task_write_batch_max_items,
+        max_delay=settings.task_write_batch_max_delay_ms / 1000,
+        max_queue=settings.task_write_batch_queue_size,
+    )
+
+
+def _check_batch_size(size: int) -> None:
+    max_items = get_settings().bulk_max_items
+    if size == 0 or size > max_items:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Bulk requests must contain between 1 and {max_items} items",
+        )
+
+
+async def _insert_task(values: dict[str, Any]) -> Any:
+    if get_settings().task_write_batching_enabled:
+        # Resolves only after the batch holding this row has committed.
+        return await get_task_insert_batcher().submit(values)
+    # Only the direct path needs a session of its own; batched creates share the writer's.
+    async with AsyncSessionLocal() as db:
+        # INSERT ... RETURNING: the generated id and defaults come back without a refresh SELECT.
+        row = (await db.execute(insert(Task).values(**values).returning(*TASK_OUT_COLUMNS))).one()
+        await db.commit()
+    return row
+
 
 @router.post("/", response_model=TaskOut, status_code=status.HTTP_201_CREATED)
-async def create_task(payload: TaskCreate, db: DbSession) -> TaskOut:
-    task = Task(**payload.model_dump())
-    db.add(task)
+async def create_task(payload: TaskCreate, current_user: CurrentUser, response: Response) -> TaskOut:
+    row = await _insert_task({**payload.model_dump(), "owner_id": current_user.id})
+    await _invalidate_tasks(current_user.id)
+    task = TaskOut.model_validate(dict(zip(TASK_OUT_FIELDS, row)))
+    await _publish("task.created", current_user.id, [task.model_dump(mode="json")])
+    response.headers["ETag"] = _task_etag(task.id, task.version)
+    return task
+
+
+# Bulk routes are declared before /{task_id} so "bulk" is never parsed as an id.
+@router.post("/bulk", response_model=BulkResult, status_code=status.HTTP_201_CREATED)
+async def bulk_create_tasks(payload: list[TaskCreate], db: DbSession, current_user: CurrentUser) -> BulkResult:
+    _check_batch_size(len(payload))
+    # One multi-row INSERT ... RETURNING per batch; rows come back in input order.
+    stmt = insert(Task).returning(Task, sort_by_parameter_order=True)
+    rows = [{**item.model_dump(), "owner_id": current_user.id} for item in payload]
+    tasks = (await db.scalars(stmt, rows)).all()
+    await db.commit()
+    await _invalidate_tasks(current_user.id)
+    results = [BulkItemResult(id=t.id, status="created", task=TaskOut.model_validate(t)) for t in tasks]
+    await _publish("task.created", current_user.id, [r.task.model_dump(mode="json") for r in results])
+    return BulkResult(results=results, affected=len(results))
+
+
+@router.patch("/bulk", response_model=BulkResult)
+async def bulk_update_tasks(payload: list[TaskBulkUpdateItem], db: DbSession, current_user: CurrentUser) -> BulkResult:
+    _check_batch_size(len(payload))
+    ids = {item.id for item in payload}
+    owned = select(Task.id).where(Task.owner_id == current_user.id, Task.id.in_(ids))
+    found = set((await db.scalars(owned)).all())
+    changes = [
+        _with_reminder_reset({"id": item.id, **item.model_dump(exclude_unset=True, exclude={"id"})})
+        for item in payload
+        if item.id in found
+    ]
+    if changes:
+        # ORM bulk UPDATE by primary key: executemany, grouped by the set of changed columns.
+        await db.execute(update(Task), changes)
+    tasks = {t.id: t for t in (await db.scalars(select(Task).where(Task.id.in_(found)))).all()}
     await db.commit()
-    await db.refresh(task)
-    return TaskOut.model_validate(task)
+    await _invalidate_tasks(current_user.id, *found)
+    results = [
+        BulkItemResult(id=item.id, status="updated", task=TaskOut.model_validate(tasks[item.id]))
+        if item.id in found
+        else BulkItemResult(id=item.id, status="not_found")
+        for item in payload
+    ]
+    updated = {r.id: r.task for r in results if r.task is not None}
+    await _publish("task.updated", current_user.id, [task.model_dump(mode="json") for task in updated.values()])
+    return BulkResult(results=results, affected=len(found))
+
+
+@router.delete("/bulk", response_model=BulkResult)
+async def bulk_delete_tasks(payload: TaskBulkDelete, db: DbSession, current_user: CurrentUser) -> BulkResult:
+    if (payload.ids is None) == (payload.filter is None):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Provide exactly one of 'ids' or 'filter'"
+        )
+    if payload.ids is not None:
+        _check_batch_size(len(payload.ids))
+        selector = Task.id.in_(payload.ids)
+    else:
+        f = payload.filter
+        selector = Task.id.in_(_apply_filters(select(Task.id), current_user.id, f.q, f.is_completed, f.min_priority))
+    stmt = delete(Task).where(Task.owner_id == current_user.id, selector).returning(Task.id)
+    deleted = set((await db.scalars(stmt)).all())
+    await db.commit()
+    await _invalidate_tasks(current_user.id, *deleted)
+    await _publish("task.deleted", current_user.id, [{"id": task_id} for task_id in sorted(deleted)])
+    if payload.ids is not None:
+        results = [
+            BulkItemResult(id=task_id, status="deleted" if task_id in deleted else "not_found")
+            for task_id in payload.ids
+        ]
+    else:
+        results = [BulkItemResult(id=task_id, status="deleted") for task_id in sorted(deleted)]
+    return BulkResult(results=results, affected=len(deleted))
 
 
 @router.get("/", response_model=list[TaskOut])
 async def list_tasks(
     db: DbSession,
+    current_user: CurrentUser,
     q: str | None = None,
     is_completed: bool | None = None,
     min_priority: int | None = Query(None, ge=0),
+    sort: TaskSort = "priority",
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
-) -> list[TaskOut]:
-    stmt: Select[tuple[Task]] = select(Task)
-    if q:
-        stmt = stmt.where(func.lower(Task.title).contains(q.lower()))
-    if is_completed is not None:
-        stmt = stmt.where(Task.is_completed == is_completed)
-    if min_priority is not None:
-        stmt = stmt.where(Task.priority >= min_priority)
-    stmt = stmt.limit(limit).offset(offset)
-    rows = (await db.execute(stmt)).scalars().all()
-    return [TaskOut.model_validate(t) for t in rows]
+    if_none_match: str | None = Header(None),
+) -> Response:
+    owner_id = current_user.id
+    key = cache_key(
+        "tasks:list",
+        owner=owner_id,
+        q=q,
+        is_completed=is_completed,
+        min_priority=min_priority,
+        sort=sort,
+        limit=limit,
+        offset=offset,
+    )
+    list_etag = await _cached_list_etag(db, owner_id, key, q, is_completed, min_priority)
+    if etag.none_match(if_none_match, list_etag):
+        return _not_modified(list_etag)
+
+    async def load() -> bytes:
+        # Offset paging is kept for older clients; prefer GET /tasks/page for deep pages.
+        stmt = _apply_filters(select(*TASK_OUT_COLUMNS), owner_id, q, is_completed, min_priority, rank=True)
+        stmt = stmt.order_by(*TASK_SORTS[sort]).limit(limit).offset(offset)
+        return orjson.dumps(_task_dicts((await db.execute(stmt)).all()))
+
+    body = await get_cache().get_or_set(key, load, tags=(task_list_tag(owner_id),), adapter=raw_bytes)
+    return _json_response(body, list_etag)
+
+
+@router.get("/page", response_model=Page[TaskOut])
+async def list_tasks_page(
+    db: DbSession,
+    current_user: CurrentUser,
+    q: str | None = None,
+    is_completed: bool | None = None,
+    min_priority: int | None = Query(None, ge=0),
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=100),
+    if_none_match: str | None = Header(None),
+) -> Response:
+    owner_id = current_user.id
+    key = cache_key(
+        "tasks:page", owner=owner_id, q=q, is_completed=is_completed, min_priority=min_priority, cursor=cursor, limit=limit
+    )
+    page_etag = await _cached_list_etag(db, owner_id, key, q, is_completed, min_priority)
+    if etag.none_match(if_none_match, page_etag):
+        return _not_modified(page_etag)
+
+    async def load() -> bytes:
+        stmt = _apply_filters(select(*TASK_OUT_COLUMNS), owner_id, q, is_completed, min_priority)
+        stmt, reverse = task_paginator.apply(stmt, cursor, limit)
+        rows = (await db.execute(stmt)).all()
+        items, next_cursor, prev_cursor = task_paginator.build_page(rows, limit, cursor, reverse)
+        page = {"items": _task_dicts(items), "next_cursor": next_cursor, "prev_cursor": prev_cursor, "limit": limit}
+        return orjson.dumps(page)
+
+    body = await get_cache().get_or_set(key, load, tags=(task_list_tag(owner_id),), adapter=raw_bytes)
+    return _json_response(body, page_etag)
+
+
+@router.get("/next", response_model=list[TaskOut])
+async def next_tasks(
+    db: DbSession,
+    current_user: CurrentUser,
+    k: int = Query(10, ge=1, le=100),
+    if_none_match: str | None = Header(None),
+) -> Response:
+    """The ``k`` open tasks to work on next: highest priority first, then earliest due date."""
+    owner_id = current_user.id
+    key = cache_key("tasks:next", owner=owner_id, k=k)
+    next_etag = await _cached_list_etag(db, owner_id, key, None, False, None)
+    if etag.none_match(if_none_match, next_etag):
+        return _not_modified(next_etag)
+
+    async def load() -> bytes:
+        # The first k entries of ix_tasks_owner_completed_priority_due_date_id; nothing is sorted.
+        stmt = _apply_filters(select(*TASK_OUT_COLUMNS), owner_id, None, False, None)
+        stmt = stmt.order_by(*TASK_SORTS["priority"]).limit(k)
+        return orjson.dumps(_task_dicts((await db.execute(stmt)).all()))
+
+    body = await get_cache().get_or_set(key, load, tags=(task_list_tag(owner_id),), adapter=raw_bytes)
+    return _json_response(body, next_etag)
+
+
+EXPORT_BATCH_SIZE = 1000
+_EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _encode_ndjson(rows: Sequence[Any]) -> bytes:
+    return b"".join(orjson.dumps(row) + b"\n" for row in _task_dicts(rows))
+
+
+def _encode_csv(rows: Sequence[Any], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(TaskOut.model_fields)
+    for row in rows:
+        writer.writerow(value.isoformat() if isinstance(value, datetime) else value for value in row)
+    return buffer.getvalue().encode()
+
+
+async def _stream_export(stmt: Select[Any], format: str) -> AsyncIterator[bytes]:
+    # The request's DbSession is closed before the body is sent, so the stream owns its session.
+    async with routed_session() as session:
+        if format == "csv":
+            yield _encode_csv((), header=True)
+        result = await session.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield _encode_ndjson(rows) if format == "ndjson" else _encode_csv(rows)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_tasks(
+    current_user: CurrentUser,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    q: str | None = None,
+    is_completed: bool | None = None,
+    min_priority: int | None = Query(None, ge=0),
+) -> StreamingResponse:
+    # Plain column rows through a server-side cursor: memory stays at one batch whatever the table size.
+    stmt = _apply_filters(select(*TASK_OUT_COLUMNS), current_user.id, q, is_completed, min_priority).order_by(Task.id)
+    return StreamingResponse(
+        _stream_export(stmt, format),
+        media_type=_EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'},
+    )
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def task_events(
+    current_user: StreamUser,
+    last_event_id: int | None = Header(None),
+    since: int | None = Query(None, ge=0, description="Resume after this event id when Last-Event-ID cannot be set"),
+) -> StreamingResponse:
+    """Server-Sent Events feed of the caller's ``task.created``, ``task.updated`` and ``task.deleted``.
+
+    EventSource cannot send headers, so the token may also be given as ``?access_token=``.
+    On ``reset`` the client should reload the task list: the events it missed are gone.
+    """
+    resume_from = last_event_id if last_event_id is not None else since
+    # StreamingResponse cancels the generator when the client disconnects.
+    return StreamingResponse(
+        sse_stream(get_event_hub(), current_user.id, resume_from, get_settings().events_heartbeat_seconds),
+        media_type="text/event-stream",
+        # Disable proxy buffering (nginx) so events are delivered as they happen.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{task_id}", response_model=TaskOut)
-async def get_task(task_id: int, db: DbSession) -> TaskOut:
-    task = (await db.execute(select(Task).where(Task.id == task_id))).scalar_one_or_none()
-    if task is None:
+async def get_task(
+    task_id: int, db: DbSession, current_user: CurrentUser, response: Response, if_none_match: str | None = Header(None)
+) -> TaskOut | Response:
+    owner_id = current_user.id
+    if if_none_match:
+        # Revalidation: compare versions before reading or serializing the task.
+        current = await _cached_task_etag(db, owner_id, task_id)
+        if current is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+        if etag.none_match(if_none_match, current):
+            return _not_modified(current)
+
+    async def load() -> TaskOut | None:
+        stmt = select(Task).where(Task.id == task_id, Task.owner_id == owner_id)
+        task = (await db.execute(stmt)).scalar_one_or_none()
+        return TaskOut.model_validate(task) if task is not None else None
+
+    key = _task_key(owner_id, task_id)
+    out = await get_cache().get_or_set(key, load, tags=(task_tag(task_id),), adapter=_task_adapter)
+    if out is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-    return TaskOut.model_validate(task)
+    response.headers["ETag"] = _task_etag(out.id, out.version)
+    return out
 
 
 @router.put("/{task_id}", response_model=TaskOut)
-async def update_task(task_id: int, payload: TaskUpdate, db: DbSession) -> TaskOut:
-    task = (await db.execute(select(Task).where(Task.id == task_id))).scalar_one_or_none()
-    if task is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-    for key, value in payload.model_dump(exclude_unset=True).items():
-        setattr(task, key, value)
+async def update_task(
+    task_id: int,
+    payload: TaskUpdate,
+    db: DbSession,
+    current_user: CurrentUser,
+    response: Response,
+    if_match: str | None = Header(None),
+) -> TaskOut:
+    conditions = [Task.id == task_id, Task.owner_id == current_user.id, *_if_match_condition(task_id, if_match)]
+    changes = _with_reminder_reset(payload.model_dump(exclude_unset=True))
+    if changes:
+        # One UPDATE ... RETURNING; the If-Match version check is part of its WHERE clause.
+        stmt = update(Task).where(*conditions).values(**changes).returning(*TASK_OUT_COLUMNS)
+    else:
+        stmt = select(*TASK_OUT_COLUMNS).where(*conditions)
+    row = (await db.execute(stmt)).first()
+    if row is None:
+        raise await _write_failed(db, current_user.id, task_id)
     await db.commit()
-    await db.refresh(task)
-    return TaskOut.model_validate(task)
+    task = TaskOut.model_validate(dict(zip(TASK_OUT_FIELDS, row)))
+    if changes:
+        await _invalidate_tasks(current_user.id, task_id)
+        await _publish("task.updated", current_user.id, [task.model_dump(mode="json")])
+    response.headers["ETag"] = _task_etag(task.id, task.version)
+    return task
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT, response_class=Response)
-async def delete_task(task_id: int, db: DbSession) -> Response:
-    task = (await db.execute(select(Task).where(Task.id == task_id))).scalar_one_or_none()
-    if task is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-    await db.delete(task)
+async def delete_task(
+    task_id: int, db: DbSession, current_user: CurrentUser, if_match: str | None = Header(None)
+) -> Response:
+    conditions = [Task.id == task_id, Task.owner_id == current_user.id, *_if_match_condition(task_id, if_match)]
+    if (await db.execute(delete(Task).where(*conditions).returning(Task.id))).first() is None:
+        raise await _write_failed(db, current_user.id, task_id)
     await db.commit()
+    await _invalidate_tasks(current_user.id, task_id)
+    await _publish("task.deleted", current_user.id, [{"id": task_id}])
     return Response(status_code=status.HTTP_204_NO_CONTENT)
-
-
@@ -1,13 +1,12 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, HTTPException, status
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from ....core.dependencies import DbSession, get_current_user_id
+from ....core.dependencies import CurrentUser, DbSession
 from ....core.models import User
 from ....core.schemas import UserCreate, UserOut
-from ....core.security import get_password_hash
+from ....core.security import get_password_hasher
 
 
 router = APIRouter()
@@ -18,7 +17,8 @@ async def create_user(payload: UserCreate, db: DbSession) -> UserOut:
     existing = await db.execute(select(User).where(User.email == payload.email))
     if existing.scalar_one_or_none() is not None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-    user = User(email=payload.email, full_name=payload.full_name, hashed_password=get_password_hash(payload.password))
+    hashed_password = await get_password_hasher().hash(payload.password)
+    user = User(email=payload.email, full_name=payload.full_name, hashed_password=hashed_password)
     db.add(user)
     await db.commit()
     await db.refresh(user)
@@ -26,11 +26,8 @@ async def create_user(payload: UserCreate, db: DbSession) -> UserOut:
 
 
 @router.get("/me", response_model=UserOut)
-async def get_me(db: DbSession, current_user_id: int = Depends(get_current_user_id)) -> UserOut:
-    result = await db.execute(select(User).where(User.id == current_user_id))
-    user = result.scalar_one_or_none()
-    if user is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    return UserOut.model_validate(user)
+async def get_me(current_user: CurrentUser) -> UserOut:
+    # Token claims and the user row are both cached, so this is normally free of crypto and queries.
+    return current_user
 
 
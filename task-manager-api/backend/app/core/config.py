@@ -1,5 +1,6 @@
 from functools import lru_cache
 from pydantic_settings import BaseSettings
+from sqlalchemy.engine import make_url
 
 
 class Settings(BaseSettings):
@@ -11,9 +12,119 @@ class Settings(BaseSettings):
     secret_key: str = "change-me"
     access_token_expires_minutes: int = 60 * 24
     algorithm: str = "HS256"
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 64
+    token_cache_max_entries: int = 10_000
+    admin_emails: list[str] = []  # users allowed on operator endpoints such as /api/v1/stats/profiling
+    user_cache_max_entries: int = 10_000
+    user_cache_ttl_seconds: float = 30.0
 
     # Database
     database_url: str = "sqlite+aiosqlite:///./task_manager.db"
+    database_echo: bool = False  # log every SQL statement; opt-in, independent of `debug`
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_recycle: int = 1800  # seconds
+    database_pool_pre_ping: bool = True
+    database_statement_cache_size: int = 500
+    # create_all on startup is a development convenience; deployments run Alembic once instead
+    # (python -m app.serve --migrate), since concurrent workers would race on the DDL.
+    database_auto_create: bool = True
+    database_pool_warmup: bool = True  # open pool_size connections before serving traffic
+    # Read replicas: GET/HEAD requests read from one of these (round-robin, health-checked)
+    # unless the client wrote within the read-your-writes window. Empty = primary only.
+    database_replica_urls: list[str] = []
+    database_replica_health_interval_seconds: float = 5.0
+    database_replica_health_timeout_seconds: float = 2.0
+    database_read_your_writes_seconds: float = 5.0  # should exceed the replicas' usual lag
+
+    # SQLite connection pragmas (ignored for other backends)
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size: int = -64_000  # negative values are KiB, i.e. 64 MiB
+
+    @property
+    def database_backend(self) -> str:
+        # e.g. "sqlite" or "postgresql"; selects dialect-specific features such as the search index.
+        return make_url(self.database_url).get_backend_name()
+
+    # Bulk endpoints
+    bulk_max_items: int = 1000
+
+    # Group commit for POST /tasks: creates are queued and written by one writer, one transaction
+    # per batch of up to max_items rows or max_delay_ms. Opt-in: adds up to max_delay_ms latency.
+    task_write_batching_enabled: bool = False
+    task_write_batch_max_items: int = 100
+    task_write_batch_max_delay_ms: float = 2.0
+    task_write_batch_queue_size: int = 10_000  # callers wait once this many creates are queued
+
+    # Cache
+    cache_enabled: bool = True
+    cache_max_entries: int = 10_000
+    cache_local_ttl_seconds: float = 30.0
+    # Per-process tier. Other workers' writes only reach it through Redis, so app.serve turns
+    # it off when running several workers without redis_url.
+    cache_local_enabled: bool = True
+    cache_ttl_seconds: float = 300.0
+    # Concurrent misses for one key wait this long for the in-flight load before running their own.
+    cache_singleflight_timeout_seconds: float = 5.0
+    redis_url: str | None = None
+
+    # Rate limiting: "<count>/<second|minute|hour|day>[;burst=<n>]"
+    rate_limit_enabled: bool = True
+    rate_limit_default: str = "600/minute"
+    rate_limit_key: str = "client"  # "client", "user" or "route"
+    rate_limit_routes: dict[str, str] = {
+        "POST /api/v1/auth/login": "10/minute",
+        "POST /api/v1/users": "20/hour",
+        "GET /api/v1/tasks/export": "10/minute",
+    }
+    rate_limit_backend: str = "memory"  # "memory" or "redis" (uses redis_url)
+    rate_limit_shards: int = 16
+    rate_limit_exempt_paths: list[str] = ["/ping", "/metrics", "/static"]
+
+    # Observability
+    metrics_enabled: bool = True
+    access_log_enabled: bool = True
+    access_log_file: str | None = None  # stderr when unset
+    access_log_queue_size: int = 10_000  # records beyond this are dropped rather than blocking requests
+    sql_profiling_enabled: bool = False  # admins can also toggle it at runtime via PUT /api/v1/stats/profiling
+    sql_slow_query_ms: float = 200.0
+    sql_slow_query_min_ms: float = 50.0  # lowest threshold PUT /api/v1/stats/profiling accepts
+    sql_log_parameters: bool = False  # bound values in slow-query logs; they can hold emails, hashes and task text
+    sql_explain_slow_queries: bool = True
+    sql_repeat_threshold: int = 5  # identical statements per request before an N+1 warning
+
+    # Background jobs (Celery)
+    celery_broker_url: str = "redis://localhost:6379/0"
+    celery_result_backend: str | None = None
+    celery_task_always_eager: bool = False
+    reminder_scan_interval_seconds: float = 60.0
+    reminder_lead_minutes: int = 60  # remind about tasks due within this window
+    reminder_lookback_minutes: int = 24 * 60  # still remind about tasks that fell due while no scan ran
+    reminder_batch_size: int = 500  # tasks claimed per statement and per Celery message
+    reminder_lease_seconds: int = 300  # claims expire after this, so a crashed worker's batch is retried
+    counter_reconcile_interval_seconds: float = 3600.0
+
+    # Change feed (GET /api/v1/tasks/events)
+    events_backend: str = "memory"  # "memory" (one process) or "redis" (fan-out across workers via redis_url)
+    events_subscriber_queue_size: int = 256
+    events_replay_size: int = 1024  # recent events kept for Last-Event-ID resume
+    events_overflow_policy: str = "drop_oldest"  # or "disconnect": slow clients get a reset event and reconnect
+    events_heartbeat_seconds: float = 15.0
+
+    # Production server (python -m app.serve)
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: int = 0  # 0 = one per CPU core
+    server_loop: str = "uvloop"
+    server_http: str = "httptools"
+    server_graceful_shutdown_seconds: int = 30  # drain time for in-flight requests after SIGTERM
+    server_keepalive_seconds: int = 5
+    server_backlog: int = 2048
 
     # CORS
     cors_origins: list[str] = ["*"]
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from sqlalchemy import DDL, MetaData, event
+
+
+# Counters are kept per owner; tasks without an owner (created before ownership existed)
+# are counted under owner 0. A task's owner never changes, so only inserts, deletes and
+# completion changes move the counts.
+UNOWNED = 0
+
+# Seeds the counter rows from the current table contents; a no-op for owners that already have one.
+_SEED = (
+    "INSERT INTO task_counters (owner_id, total, completed) "
+    "SELECT coalesce(owner_id, 0), count(*), coalesce(sum(CASE WHEN is_completed THEN 1 ELSE 0 END), 0) "
+    "FROM tasks GROUP BY coalesce(owner_id, 0) "
+    "ON CONFLICT (owner_id) DO NOTHING"
+)
+
+# SQLite: row-level triggers run inside the writing statement's transaction.
+SQLITE_COUNTER_DDL = (
+    _SEED,
+    "CREATE TRIGGER IF NOT EXISTS task_counters_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO task_counters (owner_id, total, completed) "
+    "VALUES (coalesce(new.owner_id, 0), 1, coalesce(new.is_completed, 0)) "
+    "ON CONFLICT (owner_id) DO UPDATE SET total = total + 1, completed = completed + excluded.completed; END",
+    "CREATE TRIGGER IF NOT EXISTS task_counters_ad AFTER DELETE ON tasks BEGIN "
+    "UPDATE task_counters SET total = total - 1, completed = completed - coalesce(old.is_completed, 0) "
+    "WHERE owner_id = coalesce(old.owner_id, 0); END",
+    "CREATE TRIGGER IF NOT EXISTS task_counters_au AFTER UPDATE OF is_completed ON tasks BEGIN "
+    "UPDATE task_counters SET completed = completed + coalesce(new.is_completed, 0) - coalesce(old.is_completed, 0) "
+    "WHERE owner_id = coalesce(new.owner_id, 0); END",
+)
+
+# PostgreSQL: statement-level triggers with transition tables, so a bulk write touches
+# each owner's counter row once per statement instead of once per task.
+POSTGRES_COUNTER_DDL = (
+    _SEED,
+    """
+    CREATE OR REPLACE FUNCTION task_counters_on_insert() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO task_counters (owner_id, total, completed)
+        SELECT coalesce(owner_id, 0), count(*), count(*) FILTER (WHERE is_completed) FROM inserted GROUP BY 1
+        ON CONFLICT (owner_id) DO UPDATE SET total = task_counters.total + excluded.total,
+            completed = task_counters.completed + excluded.completed;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION task_counters_on_delete() RETURNS trigger AS $$
+    BEGIN
+        UPDATE task_counters SET total = total - d.n, completed = completed - d.c
+        FROM (
+            SELECT coalesce(owner_id, 0) AS owner_id, count(*) AS n, count(*) FILTER (WHERE is_completed) AS c
+            FROM deleted GROUP BY 1
+        ) AS d
+        WHERE task_counters.owner_id = d.owner_id;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION task_counters_on_update() RETURNS trigger AS $$
+    BEGIN
+        UPDATE task_counters SET completed = completed + d.delta
+        FROM (
+            SELECT owner_id, sum(delta) AS delta FROM (
+                SELECT coalesce(owner_id, 0) AS owner_id, -1 AS delta FROM old_rows WHERE is_completed
+                UNION ALL
+                SELECT coalesce(owner_id, 0), 1 FROM new_rows WHERE is_completed
+            ) AS changes GROUP BY owner_id HAVING sum(delta) <> 0
+        ) AS d
+        WHERE task_counters.owner_id = d.owner_id;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS task_counters_ai ON tasks",
+    "CREATE TRIGGER task_counters_ai AFTER INSERT ON tasks REFERENCING NEW TABLE AS inserted "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_counters_on_insert()",
+    "DROP TRIGGER IF EXISTS task_counters_ad ON tasks",
+    "CREATE TRIGGER task_counters_ad AFTER DELETE ON tasks REFERENCING OLD TABLE AS deleted "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_counters_on_delete()",
+    "DROP TRIGGER IF EXISTS task_counters_au ON tasks",
+    "CREATE TRIGGER task_counters_au AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_counters_on_update()",
+)
+
+
+def attach_counter_ddl(metadata: MetaData) -> None:
+    """Install the counter triggers after ``create_all``; every statement is idempotent."""
+    for statement in SQLITE_COUNTER_DDL:
+        event.listen(metadata, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in POSTGRES_COUNTER_DDL:
+        event.listen(metadata, "after_create", DDL(statement).execute_if(dialect="postgresql"))
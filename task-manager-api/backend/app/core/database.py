@@ -1,28 +1,214 @@
-from collections.abc import AsyncGenerator
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncGenerator, Iterable
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from ..services.cache_service import LocalCache
+from .config import Settings, get_settings
+from .profiling import SQLProfiler
 
-from .config import get_settings
+
+logger = logging.getLogger(__name__)
 
 
 class Base(DeclarativeBase):
     pass
 
 
-def _create_engine() -> AsyncEngine:
+def _engine_options(settings: Settings, database_url: str) -> dict[str, Any]:
+    url = make_url(database_url)
+    options: dict[str, Any] = {
+        "echo": settings.database_echo,
+        "future": True,
+        "query_cache_size": settings.database_statement_cache_size,
+    }
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite uses a single static connection; pool sizing does not apply.
+        return options
+    if url.get_backend_name() == "sqlite":
+        # Some SQLAlchemy releases default file-based aiosqlite to NullPool, which reconnects
+        # (and re-runs the pragmas) for every session. Keep connections pooled instead.
+        options["poolclass"] = AsyncAdaptedQueuePool
+    options.update(
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_recycle=settings.database_pool_recycle,
+        pool_pre_ping=settings.database_pool_pre_ping,
+    )
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {"prepared_statement_cache_size": settings.database_statement_cache_size}
+    return options
+
+
+def _install_sqlite_pragmas(engine: AsyncEngine, settings: Settings) -> None:
+    pragmas = (
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+        f"PRAGMA cache_size={int(settings.sqlite_cache_size)}",
+    )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def _create_engine(database_url: str | None = None) -> AsyncEngine:
     settings = get_settings()
-    return create_async_engine(settings.database_url, echo=settings.debug, future=True)
+    database_url = database_url or settings.database_url
+    engine = create_async_engine(database_url, **_engine_options(settings, database_url))
+    if engine.dialect.name == "sqlite":
+        _install_sqlite_pragmas(engine, settings)
+    return engine
+
+
+def _create_profiler(engine: AsyncEngine) -> SQLProfiler:
+    settings = get_settings()
+    profiler = SQLProfiler(
+        engine.sync_engine,
+        slow_query_seconds=settings.sql_slow_query_ms / 1000,
+        repeat_threshold=settings.sql_repeat_threshold,
+        explain=settings.sql_explain_slow_queries,
+        log_parameters=settings.sql_log_parameters,
+    )
+    if settings.sql_profiling_enabled:
+        profiler.enable()
+    return profiler
 
 
 engine: AsyncEngine = _create_engine()
+profiler: SQLProfiler = _create_profiler(engine)
 AsyncSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
 
 
+# Set per request by ReadRoutingMiddleware: True when the request may be served from a replica.
+read_from_replica: ContextVar[bool] = ContextVar("read_from_replica", default=False)
+
+
+class ReplicaPool:
+    """Read replicas handed out round-robin, skipping any that fail their health check.
+
+    Also remembers clients that wrote within the last ``sticky_seconds`` so their reads
+    stay on the primary until the replicas have caught up (read-your-writes).
+    """
+
+    def __init__(
+        self,
+        engines: Iterable[AsyncEngine],
+        health_interval: float = 5.0,
+        health_timeout: float = 2.0,
+        sticky_seconds: float = 5.0,
+        max_sticky_entries: int = 10_000,
+    ) -> None:
+        self.engines = list(engines)
+        self.healthy = [True] * len(self.engines)
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.sticky_seconds = sticky_seconds
+        self._recent_writers = LocalCache(max_entries=max_sticky_entries, ttl=sticky_seconds)
+        self._next = 0
+        self._checker: asyncio.Task[None] | None = None
+
+    def pick(self) -> AsyncEngine | None:
+        """The next healthy replica, or None when there is none (read from the primary)."""
+        for _ in range(len(self.engines)):
+            index = self._next
+            self._next = (index + 1) % len(self.engines)
+            if self.healthy[index]:
+                return self.engines[index]
+        return None
+
+    def mark_write(self, client: str) -> None:
+        self._recent_writers.set(client, True)
+
+    def wrote_recently(self, client: str) -> bool:
+        return self._recent_writers.get(client)[0]
+
+    async def _ping(self, engine: AsyncEngine) -> bool:
+        async def select_one() -> None:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        try:
+            # Connecting is covered too: a host that accepts TCP but never answers, or a
+            # pool checkout that blocks, must fail the check rather than stall it.
+            await asyncio.wait_for(select_one(), self.health_timeout)
+            return True
+        except Exception:  # noqa: BLE001 - any failure takes the replica out of rotation
+            return False
+
+    async def check(self) -> None:
+        results = await asyncio.gather(*(self._ping(engine) for engine in self.engines))
+        for index, (engine, ok) in enumerate(zip(self.engines, results)):
+            if ok != self.healthy[index]:
+                logger.warning("Read replica %s is %s", engine.url.render_as_string(), "back" if ok else "down")
+            self.healthy[index] = ok
+
+    async def _check_forever(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.health_interval)
+
+    async def start(self) -> None:
+        if self.engines and self._checker is None:
+            self._checker = asyncio.create_task(self._check_forever())
+
+    async def stop(self) -> None:
+        if self._checker is not None:
+            self._checker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._checker
+            self._checker = None
+        for engine in self.engines:
+            await engine.dispose()
+
+
+@lru_cache
+def get_replica_pool() -> ReplicaPool:
+    settings = get_settings()
+    return ReplicaPool(
+        (_create_engine(url) for url in settings.database_replica_urls),
+        health_interval=settings.database_replica_health_interval_seconds,
+        health_timeout=settings.database_replica_health_timeout_seconds,
+        sticky_seconds=settings.database_read_your_writes_seconds,
+    )
+
+
+def routed_session() -> AsyncSession:
+    """A session on a replica when the current request may read from one, else on the primary."""
+    replica = get_replica_pool().pick() if read_from_replica.get() else None
+    return AsyncSessionLocal(bind=replica) if replica is not None else AsyncSessionLocal()
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    session: AsyncSession = AsyncSessionLocal()
+    session = routed_session()
     try:
         yield session
     finally:
         await session.close()
 
 
+async def warm_up_pool(engine: AsyncEngine, connections: int) -> int:
+    """Open ``connections`` pooled connections at once so early requests skip connect and setup."""
+    if connections <= 0 or not hasattr(engine.pool, "size"):
+        return 0  # static or null pools keep nothing to warm
+    async with contextlib.AsyncExitStack() as stack:
+        conns = await asyncio.gather(*(stack.enter_async_context(engine.connect()) for _ in range(connections)))
+        for conn in conns:
+            await conn.execute(text("SELECT 1"))
+    return len(conns)
@@ -2,12 +2,62 @@ from __future__ import annotations
 
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, Query
+from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..services.user_service import get_active_user
+from .config import get_settings
 from .database import get_db
+from .exceptions import ForbiddenError, UnauthorizedError
+from .schemas import UserOut
+from .security import verify_token_cached
 
 
 DbSession = Annotated[AsyncSession, Depends(get_db)]
 
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 
+
+def _user_id_from_token(token: str) -> int:
+    claims = verify_token_cached(token)
+    try:
+        return int(claims["sub"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise UnauthorizedError("Invalid token") from exc
+
+
+async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    return _user_id_from_token(token)
+
+
+async def get_current_user(db: DbSession, user_id: int = Depends(get_current_user_id)) -> UserOut:
+    user = await get_active_user(db, user_id)
+    if user is None:
+        raise UnauthorizedError("Inactive or unknown user")
+    return user
+
+
+async def get_admin_user(current_user: UserOut = Depends(get_current_user)) -> UserOut:
+    """get_current_user for process-wide operator endpoints: only users listed in ``admin_emails``."""
+    if current_user.email not in get_settings().admin_emails:
+        raise ForbiddenError("Admin access required")
+    return current_user
+
+
+async def get_stream_user(
+    db: DbSession,
+    token: str | None = Depends(optional_oauth2_scheme),
+    access_token: str | None = Query(None, description="Bearer token, for clients that cannot set headers"),
+) -> UserOut:
+    """get_current_user for EventSource streams, which also accept the token as a query parameter."""
+    token = token or access_token
+    if not token:
+        raise UnauthorizedError("Not authenticated")
+    return await get_current_user(db, _user_id_from_token(token))
+
+
+CurrentUser = Annotated[UserOut, Depends(get_current_user)]
+AdminUser = Annotated[UserOut, Depends(get_admin_user)]
+StreamUser = Annotated[UserOut, Depends(get_stream_user)]
@@ -11,3 +11,11 @@ class UnauthorizedError(HTTPException):
         super().__init__(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
 
 
+class ForbiddenError(HTTPException):
+    def __init__(self, detail: str = "Forbidden") -> None:
+        super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+
+class PreconditionFailedError(HTTPException):
+    def __init__(self, detail: str = "Precondition failed") -> None:
+        super().__init__(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=detail)
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from typing import Callable, Iterable, TypeVar
+
+
+LabelValues = tuple[str, ...]
+# A collector returns (name, type, help, samples) with samples as (labels, value) pairs.
+Collector = Callable[[], Iterable[tuple[str, str, str, Iterable[tuple[dict[str, str], float]]]]]
+
+M = TypeVar("M", bound="_Metric")
+
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+class _Metric:
+    """Base for labelled metrics whose hot path never takes a shared lock.
+
+    Every writer thread owns its own shard of series, so ``+=`` on a shard is never
+    raced; the lock is only taken when a thread creates its shard and when a
+    scrape merges them.
+    """
+
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: list[dict[LabelValues, list[float]]] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> dict[LabelValues, list[float]]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _new_series(self) -> list[float]:
+        return [0.0]
+
+    def _series(self, labels: LabelValues) -> list[float]:
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            series = shard[labels] = self._new_series()
+        return series
+
+    def _merged(self) -> dict[LabelValues, list[float]]:
+        merged: dict[LabelValues, list[float]] = {}
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for labels, series in list(shard.items()):
+                total = merged.setdefault(labels, [0.0] * len(series))
+                for i, value in enumerate(series):
+                    total[i] += value
+        return merged
+
+    def _labels(self, values: LabelValues) -> dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for labels, series in sorted(self._merged().items()):
+            lines.extend(self._render_series(self._labels(labels), series))
+        return lines
+
+    def _render_series(self, labels: dict[str, str], series: list[float]) -> list[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(series[0])}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._series(labels)[0] += amount
+
+
+class Gauge(_Metric):
+    """Gauge built from per-thread deltas; ``inc``/``dec`` only (no absolute ``set``)."""
+
+    type = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._series(labels)[0] += amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self._series(labels)[0] -= amount
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self) -> list[float]:
+        # Non-cumulative bucket counts (last slot is +Inf), then sum and count.
+        return [0.0] * (len(self.buckets) + 3)
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series(labels)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def _render_series(self, labels: dict[str, str], series: list[float]) -> list[str]:
+        lines = []
+        cumulative = 0.0
+        for bound, count in zip((*self.buckets, math.inf), series):
+            cumulative += count
+            bucket_labels = {**labels, "le": _format_value(bound)}
+            lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {_format_value(cumulative)}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(series[-2])}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {_format_value(series[-1])}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Collector] = []
+
+    def register(self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Collector) -> None:
+        """Add a callable producing values at scrape time (e.g. cache or pool statistics)."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, type_, help, samples in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {type_}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(
+    Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+)
+http_requests_in_flight = registry.register(
+    Gauge("http_requests_in_flight", "HTTP requests currently being served.", ("method",))
+)
+http_request_duration_seconds = registry.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"))
+)
+http_response_size_bytes = registry.register(
+    Histogram(
+        "http_response_size_bytes", "HTTP response body size by route.", ("method", "route"), DEFAULT_SIZE_BUCKETS
+    )
+)
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, DateTime, Integer, String, Text
+from sqlalchemy import Boolean, Date, DateTime, Float, ForeignKey, Index, Integer, String, Text, literal_column
 from sqlalchemy.orm import Mapped, mapped_column
 
+from .counters import attach_counter_ddl
 from .database import Base
+from .rollups import attach_rollup_ddl
+from .search import attach_search_ddl
 
 
 class User(Base):
@@ -25,6 +28,9 @@ class Task(Base):
     __tablename__ = "tasks"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    # Set on create and never changed. NULL only for tasks created before ownership existed,
+    # which no user can see.
+    owner_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     is_completed: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -32,6 +38,88 @@ class Task(Base):
     due_date: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped in SQL by every UPDATE (ORM, bulk or RETURNING) for optimistic concurrency via If-Match.
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version") + 1
+    )
+    # Reminder bookkeeping (see app/tasks/task_reminders.py): a claim lease and the send time.
+    reminder_lease_until: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    reminded_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # Stamped by the rollup triggers (app/core/rollups.py) when the task is completed.
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
 
+class TaskCounter(Base):
+    """Per-owner aggregate for /stats/summary, maintained by triggers on ``tasks``."""
 
+    __tablename__ = "task_counters"
+
+    owner_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    completed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class TaskDailyStats(Base):
+    """Tasks created and completed per owner and UTC day; maintained by triggers on ``tasks``."""
+
+    __tablename__ = "task_daily_stats"
+
+    owner_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    created: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    completed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    completion_seconds: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+
+
+class TaskPriorityStats(Base):
+    """Open tasks per owner and priority; maintained by triggers on ``tasks``."""
+
+    __tablename__ = "task_priority_stats"
+
+    owner_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    priority: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    open: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class TaskDueStats(Base):
+    """Open tasks per owner and due day; maintained by triggers on ``tasks``."""
+
+    __tablename__ = "task_due_stats"
+
+    owner_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    open: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+# Every list, search and stats query is scoped to one owner, so the owner leads each index:
+# a user's tasks are one contiguous range however many other users share the table.
+# "due_date IS NULL" ahead of due_date puts undated tasks last on every dialect while the
+# order stays index-backed (SQLite stores NULLs first, so NULLS LAST alone needs a sort).
+# Covers status/priority filters and counts without touching the table rows, and yields the
+# open tasks in "next up" order, so a top-k read stops after k index entries.
+Index(
+    "ix_tasks_owner_completed_priority_due_date_id",
+    Task.owner_id,
+    Task.is_completed,
+    Task.priority.desc(),
+    Task.due_date.is_(None),
+    Task.due_date,
+    Task.id,
+)
+# Backs the priority order used by list endpoints: (priority DESC, due_date, id).
+Index(
+    "ix_tasks_owner_priority_due_date_id",
+    Task.owner_id,
+    Task.priority.desc(),
+    Task.due_date.is_(None),
+    Task.due_date,
+    Task.id,
+)
+# Backs sort=due_date.
+Index("ix_tasks_owner_due_date_id", Task.owner_id, Task.due_date.is_(None), Task.due_date, Task.id)
+# Reminder scans: a range over due_date among open tasks only.
+Index("ix_tasks_is_completed_due_date", Task.is_completed, Task.due_date)
+
+attach_search_ddl(Task.__table__)
+attach_counter_ddl(Base.metadata)
+attach_rollup_ddl(Base.metadata)
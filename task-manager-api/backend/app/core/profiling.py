@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+
+logger = logging.getLogger(__name__)
+
+_EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+
+
+@dataclass
+class QueryProfile:
+    """SQL statistics for one request."""
+
+    count: int = 0
+    seconds: float = 0.0
+    statements: Counter[str] = field(default_factory=Counter)
+    repeated: list[str] = field(default_factory=list)
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"'
+
+
+_current_profile: ContextVar[QueryProfile | None] = ContextVar("sql_query_profile", default=None)
+
+
+def start_profile() -> tuple[QueryProfile, Any]:
+    """Begin collecting for the current context; pass the token to ``end_profile``."""
+    profile = QueryProfile()
+    return profile, _current_profile.set(profile)
+
+
+def end_profile(token: Any) -> None:
+    _current_profile.reset(token)
+
+
+class SQLProfiler:
+    """Cursor-level SQL profiling that can be switched on and off at runtime.
+
+    The listeners are only attached while enabled, so a disabled profiler costs
+    nothing per statement.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        slow_query_seconds: float,
+        repeat_threshold: int,
+        explain: bool = True,
+        log_parameters: bool = False,
+    ) -> None:
+        self.engine = engine
+        self.slow_query_seconds = slow_query_seconds
+        self.repeat_threshold = repeat_threshold
+        self.explain = explain
+        # Bound values can be emails, password hashes or task text; only counted unless asked for.
+        self.log_parameters = log_parameters
+        self.enabled = False
+
+    def enable(self) -> None:
+        if not self.enabled:
+            event.listen(self.engine, "before_cursor_execute", self._before)
+            event.listen(self.engine, "after_cursor_execute", self._after)
+            self.enabled = True
+
+    def disable(self) -> None:
+        if self.enabled:
+            event.remove(self.engine, "before_cursor_execute", self._before)
+            event.remove(self.engine, "after_cursor_execute", self._after)
+            self.enabled = False
+
+    def _before(
+        self, conn: Connection, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after(
+        self, conn: Connection, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        starts = conn.info.get("query_start")
+        if not starts:
+            return  # enabled mid-statement
+        elapsed = time.perf_counter() - starts.pop()
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.count += 1
+            profile.seconds += elapsed
+            profile.statements[statement] += 1
+            if profile.statements[statement] == self.repeat_threshold:
+                profile.repeated.append(statement)
+                logger.warning(
+                    "Possible N+1: statement executed %d times in one request: %s", self.repeat_threshold, statement
+                )
+        if elapsed >= self.slow_query_seconds:
+            plan = self._explain(conn, statement, parameters) if self.explain and not executemany else None
+            logger.warning(
+                "Slow query (%.1f ms): %s\nparameters: %s%s",
+                elapsed * 1000,
+                statement,
+                repr(parameters) if self.log_parameters else f"{len(parameters or ())} (values redacted)",
+                f"\nplan:\n{plan}" if plan else "",
+            )
+
+    def _explain(self, conn: Connection, statement: str, parameters: Any) -> str | None:
+        if not statement.lstrip().lower().startswith(_EXPLAINABLE):
+            return None
+        prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+        # A separate DBAPI cursor so the profiled statement's pending rows are left alone,
+        # and no events fire for the EXPLAIN itself.
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+        except Exception:  # noqa: BLE001 - a plan is best-effort diagnostics
+            logger.debug("EXPLAIN failed for slow query", exc_info=True)
+            return None
+        finally:
+            cursor.close()
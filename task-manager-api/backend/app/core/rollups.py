@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+from sqlalchemy import DDL, MetaData, event
+
+
+# Rollup tables behind the /stats dashboards, kept current by triggers on ``tasks``:
+#   task_daily_stats    tasks created and completed per owner and UTC day, plus total seconds-to-complete
+#   task_priority_stats open tasks per owner and priority
+#   task_due_stats      open tasks per owner and due day (overdue = days before today)
+# Tasks without an owner roll up under owner 0. ``tasks.completed_at`` is maintained
+# alongside so a reopened task can be taken back off the day it was completed. Days are
+# never deleted; history stays in the daily table.
+
+# SQLite: row-level triggers. Each seed statement is a no-op once its rows exist.
+SQLITE_ROLLUP_DDL = (
+    "INSERT INTO task_daily_stats (owner_id, day, created, completed, completion_seconds) "
+    "SELECT coalesce(owner_id, 0), date(created_at), count(*), 0, 0 FROM tasks GROUP BY 1, 2 "
+    "ON CONFLICT (owner_id, day) DO NOTHING",
+    "INSERT INTO task_priority_stats (owner_id, priority, open) "
+    "SELECT coalesce(owner_id, 0), coalesce(priority, 0), count(*) FROM tasks "
+    "WHERE NOT coalesce(is_completed, 0) GROUP BY 1, 2 ON CONFLICT (owner_id, priority) DO NOTHING",
+    "INSERT INTO task_due_stats (owner_id, day, open) "
+    "SELECT coalesce(owner_id, 0), date(due_date), count(*) FROM tasks "
+    "WHERE NOT coalesce(is_completed, 0) AND due_date IS NOT NULL GROUP BY 1, 2 "
+    "ON CONFLICT (owner_id, day) DO NOTHING",
+    "CREATE TRIGGER IF NOT EXISTS task_rollups_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO task_daily_stats (owner_id, day, created, completed, completion_seconds) "
+    "VALUES (coalesce(new.owner_id, 0), date(new.created_at), 1, coalesce(new.is_completed, 0), 0) "
+    "ON CONFLICT (owner_id, day) DO UPDATE SET created = created + 1, completed = completed + excluded.completed; "
+    "UPDATE tasks SET completed_at = new.created_at WHERE id = new.id AND coalesce(new.is_completed, 0); "
+    "INSERT INTO task_priority_stats (owner_id, priority, open) "
+    "SELECT coalesce(new.owner_id, 0), coalesce(new.priority, 0), 1 WHERE NOT coalesce(new.is_completed, 0) "
+    "ON CONFLICT (owner_id, priority) DO UPDATE SET open = open + 1; "
+    "INSERT INTO task_due_stats (owner_id, day, open) SELECT coalesce(new.owner_id, 0), date(new.due_date), 1 "
+    "WHERE NOT coalesce(new.is_completed, 0) AND new.due_date IS NOT NULL "
+    "ON CONFLICT (owner_id, day) DO UPDATE SET open = open + 1; END",
+    "CREATE TRIGGER IF NOT EXISTS task_rollups_ad AFTER DELETE ON tasks BEGIN "
+    "UPDATE task_priority_stats SET open = open - 1 WHERE NOT coalesce(old.is_completed, 0) "
+    "AND owner_id = coalesce(old.owner_id, 0) AND priority = coalesce(old.priority, 0); "
+    "UPDATE task_due_stats SET open = open - 1 WHERE NOT coalesce(old.is_completed, 0) AND old.due_date IS NOT NULL "
+    "AND owner_id = coalesce(old.owner_id, 0) AND day = date(old.due_date); END",
+    "CREATE TRIGGER IF NOT EXISTS task_rollups_au_open AFTER UPDATE OF is_completed, priority, due_date ON tasks BEGIN "
+    "UPDATE task_priority_stats SET open = open - 1 WHERE NOT coalesce(old.is_completed, 0) "
+    "AND owner_id = coalesce(old.owner_id, 0) AND priority = coalesce(old.priority, 0); "
+    "INSERT INTO task_priority_stats (owner_id, priority, open) "
+    "SELECT coalesce(new.owner_id, 0), coalesce(new.priority, 0), 1 WHERE NOT coalesce(new.is_completed, 0) "
+    "ON CONFLICT (owner_id, priority) DO UPDATE SET open = open + 1; "
+    "UPDATE task_due_stats SET open = open - 1 WHERE NOT coalesce(old.is_completed, 0) AND old.due_date IS NOT NULL "
+    "AND owner_id = coalesce(old.owner_id, 0) AND day = date(old.due_date); "
+    "INSERT INTO task_due_stats (owner_id, day, open) SELECT coalesce(new.owner_id, 0), date(new.due_date), 1 "
+    "WHERE NOT coalesce(new.is_completed, 0) AND new.due_date IS NOT NULL "
+    "ON CONFLICT (owner_id, day) DO UPDATE SET open = open + 1; END",
+    "CREATE TRIGGER IF NOT EXISTS task_rollups_au_completed AFTER UPDATE OF is_completed ON tasks "
+    "WHEN coalesce(old.is_completed, 0) != coalesce(new.is_completed, 0) BEGIN "
+    "UPDATE tasks SET completed_at = CASE WHEN new.is_completed THEN strftime('%%Y-%%m-%%d %%H:%%M:%%f', 'now') END "
+    "WHERE id = new.id; "
+    # Seconds are computed from the exact text stored in completed_at so reopening subtracts the same amount.
+    "INSERT INTO task_daily_stats (owner_id, day, created, completed, completion_seconds) "
+    "SELECT coalesce(new.owner_id, 0), date('now'), 0, 1, "
+    "(julianday(strftime('%%Y-%%m-%%d %%H:%%M:%%f', 'now')) - julianday(new.created_at)) * 86400.0 "
+    "WHERE new.is_completed "
+    "ON CONFLICT (owner_id, day) DO UPDATE SET completed = completed + 1, "
+    "completion_seconds = completion_seconds + excluded.completion_seconds; "
+    "UPDATE task_daily_stats SET completed = completed - 1, "
+    "completion_seconds = completion_seconds - (julianday(old.completed_at) - julianday(old.created_at)) * 86400.0 "
+    "WHERE NOT coalesce(new.is_completed, 0) AND old.completed_at IS NOT NULL "
+    "AND owner_id = coalesce(old.owner_id, 0) AND day = date(old.completed_at); END",
+)
+
+# PostgreSQL: a BEFORE row trigger stamps completed_at; statement-level triggers with
+# transition tables then apply one aggregated delta per owner and key per statement.
+POSTGRES_ROLLUP_DDL = (
+    "INSERT INTO task_daily_stats (owner_id, day, created, completed, completion_seconds) "
+    "SELECT coalesce(owner_id, 0), created_at::date, count(*), 0, 0 FROM tasks GROUP BY 1, 2 "
+    "ON CONFLICT (owner_id, day) DO NOTHING",
+    "INSERT INTO task_priority_stats (owner_id, priority, open) "
+    "SELECT coalesce(owner_id, 0), coalesce(priority, 0), count(*) FROM tasks WHERE NOT is_completed GROUP BY 1, 2 "
+    "ON CONFLICT (owner_id, priority) DO NOTHING",
+    "INSERT INTO task_due_stats (owner_id, day, open) "
+    "SELECT coalesce(owner_id, 0), due_date::date, count(*) FROM tasks "
+    "WHERE NOT is_completed AND due_date IS NOT NULL GROUP BY 1, 2 "
+    "ON CONFLICT (owner_id, day) DO NOTHING",
+    """
+    CREATE OR REPLACE FUNCTION task_rollups_stamp_completed_at() RETURNS trigger AS $$
+    BEGIN
+        IF NOT coalesce(NEW.is_completed, false) THEN
+            NEW.completed_at := NULL;
+        ELSIF TG_OP = 'INSERT' THEN
+            NEW.completed_at := NEW.created_at;
+        ELSIF NOT coalesce(OLD.is_completed, false) THEN
+            NEW.completed_at := now() AT TIME ZONE 'utc';
+        END IF;
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION task_rollups_on_insert() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO task_daily_stats (owner_id, day, created, completed, completion_seconds)
+        SELECT coalesce(owner_id, 0), created_at::date, count(*), count(*) FILTER (WHERE is_completed), 0
+        FROM inserted GROUP BY 1, 2
+        ON CONFLICT (owner_id, day) DO UPDATE SET created = task_daily_stats.created + excluded.created,
+            completed = task_daily_stats.completed + excluded.completed;
+        INSERT INTO task_priority_stats (owner_id, priority, open)
+        SELECT coalesce(owner_id, 0), coalesce(priority, 0), count(*) FROM inserted WHERE NOT is_completed GROUP BY 1, 2
+        ON CONFLICT (owner_id, priority) DO UPDATE SET open = task_priority_stats.open + excluded.open;
+        INSERT INTO task_due_stats (owner_id, day, open)
+        SELECT coalesce(owner_id, 0), due_date::date, count(*) FROM inserted
+        WHERE NOT is_completed AND due_date IS NOT NULL GROUP BY 1, 2
+        ON CONFLICT (owner_id, day) DO UPDATE SET open = task_due_stats.open + excluded.open;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION task_rollups_on_delete() RETURNS trigger AS $$
+    BEGIN
+        UPDATE task_priority_stats AS s SET open = s.open - d.n
+        FROM (
+            SELECT coalesce(owner_id, 0) AS owner_id, coalesce(priority, 0) AS priority, count(*) AS n
+            FROM deleted WHERE NOT is_completed GROUP BY 1, 2
+        ) AS d
+        WHERE s.owner_id = d.owner_id AND s.priority = d.priority;
+        UPDATE task_due_stats AS s SET open = s.open - d.n
+        FROM (
+            SELECT coalesce(owner_id, 0) AS owner_id, due_date::date AS day, count(*) AS n FROM deleted
+            WHERE NOT is_completed AND due_date IS NOT NULL GROUP BY 1, 2
+        ) AS d
+        WHERE s.owner_id = d.owner_id AND s.day = d.day;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION task_rollups_on_update() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO task_priority_stats (owner_id, priority, open)
+        SELECT owner_id, priority, sum(delta) FROM (
+            SELECT coalesce(owner_id, 0) AS owner_id, coalesce(priority, 0) AS priority, -1 AS delta
+            FROM old_rows WHERE NOT is_completed
+            UNION ALL
+            SELECT coalesce(owner_id, 0), coalesce(priority, 0), 1 FROM new_rows WHERE NOT is_completed
+        ) AS d GROUP BY owner_id, priority HAVING sum(delta) <> 0
+        ON CONFLICT (owner_id, priority) DO UPDATE SET open = task_priority_stats.open + excluded.open;
+        INSERT INTO task_due_stats (owner_id, day, open)
+        SELECT owner_id, day, sum(delta) FROM (
+            SELECT coalesce(owner_id, 0) AS owner_id, due_date::date AS day, -1 AS delta
+            FROM old_rows WHERE NOT is_completed AND due_date IS NOT NULL
+            UNION ALL
+            SELECT coalesce(owner_id, 0), due_date::date, 1
+            FROM new_rows WHERE NOT is_completed AND due_date IS NOT NULL
+        ) AS d GROUP BY owner_id, day HAVING sum(delta) <> 0
+        ON CONFLICT (owner_id, day) DO UPDATE SET open = task_due_stats.open + excluded.open;
+        INSERT INTO task_daily_stats (owner_id, day, created, completed, completion_seconds)
+        SELECT owner_id, day, 0, sum(n), sum(seconds) FROM (
+            SELECT coalesce(n.owner_id, 0) AS owner_id, n.completed_at::date AS day, 1 AS n,
+                extract(epoch FROM n.completed_at - n.created_at) AS seconds
+            FROM new_rows AS n JOIN old_rows AS o USING (id)
+            WHERE n.is_completed AND NOT o.is_completed
+            UNION ALL
+            SELECT coalesce(o.owner_id, 0), o.completed_at::date, -1, -extract(epoch FROM o.completed_at - o.created_at)
+            FROM new_rows AS n JOIN old_rows AS o USING (id)
+            WHERE o.is_completed AND NOT n.is_completed AND o.completed_at IS NOT NULL
+        ) AS d GROUP BY owner_id, day
+        ON CONFLICT (owner_id, day) DO UPDATE SET completed = task_daily_stats.completed + excluded.completed,
+            completion_seconds = task_daily_stats.completion_seconds + excluded.completion_seconds;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS task_rollups_completed_at ON tasks",
+    "CREATE TRIGGER task_rollups_completed_at BEFORE INSERT OR UPDATE OF is_completed ON tasks "
+    "FOR EACH ROW EXECUTE FUNCTION task_rollups_stamp_completed_at()",
+    "DROP TRIGGER IF EXISTS task_rollups_ai ON tasks",
+    "CREATE TRIGGER task_rollups_ai AFTER INSERT ON tasks REFERENCING NEW TABLE AS inserted "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_rollups_on_insert()",
+    "DROP TRIGGER IF EXISTS task_rollups_ad ON tasks",
+    "CREATE TRIGGER task_rollups_ad AFTER DELETE ON tasks REFERENCING OLD TABLE AS deleted "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_rollups_on_delete()",
+    "DROP TRIGGER IF EXISTS task_rollups_au ON tasks",
+    "CREATE TRIGGER task_rollups_au AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_rollups_on_update()",
+)
+
+
+def attach_rollup_ddl(metadata: MetaData) -> None:
+    """Install the rollup triggers after ``create_all``; every statement is idempotent."""
+    for statement in SQLITE_ROLLUP_DDL:
+        event.listen(metadata, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in POSTGRES_ROLLUP_DDL:
+        event.listen(metadata, "after_create", DDL(statement).execute_if(dialect="postgresql"))
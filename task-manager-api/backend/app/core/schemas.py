@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Literal, Optional
 
 from pydantic import BaseModel
 
@@ -31,8 +31,94 @@ class TaskOut(TaskBase):
     id: int
     created_at: datetime
     updated_at: datetime
+    version: int
 
     class Config:
         from_attributes = True
 
 
+
+
+# Auth / User Schemas
+class Token(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+
+
+class UserCreate(BaseModel):
+    email: str
+    full_name: str
+    password: str
+
+
+class UserOut(BaseModel):
+    id: int
+    email: str
+    full_name: str
+    is_active: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# Bulk Schemas
+class TaskBulkUpdateItem(TaskUpdate):
+    id: int
+
+
+class TaskFilter(BaseModel):
+    q: Optional[str] = None
+    is_completed: Optional[bool] = None
+    min_priority: Optional[int] = None
+
+
+class TaskBulkDelete(BaseModel):
+    # Exactly one selector; an empty filter ({}) deliberately matches every one of the caller's tasks.
+    ids: Optional[list[int]] = None
+    filter: Optional[TaskFilter] = None
+
+
+class BulkItemResult(BaseModel):
+    id: Optional[int] = None
+    status: Literal["created", "updated", "deleted", "not_found"]
+    task: Optional[TaskOut] = None
+
+
+class BulkResult(BaseModel):
+    results: list[BulkItemResult]
+    affected: int
+
+
+# Analytics Schemas
+class DailyStats(BaseModel):
+    day: date
+    created: int
+    completed: int
+    completion_rate: Optional[float] = None
+    mean_completion_seconds: Optional[float] = None
+
+
+class DailyStatsReport(BaseModel):
+    days: list[DailyStats]
+    created: int
+    completed: int
+    completion_rate: Optional[float] = None
+    mean_completion_seconds: Optional[float] = None
+
+
+class PriorityCount(BaseModel):
+    priority: int
+    open: int
+
+
+class DueCounts(BaseModel):
+    overdue: int
+    due_today: int
+    due_upcoming: int
+
+
+# Diagnostics Schemas
+class ProfilingState(BaseModel):
+    enabled: bool
+    slow_query_ms: Optional[float] = None
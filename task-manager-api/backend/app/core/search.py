@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from sqlalchemy import DDL, Select, Table, column, event, func, literal_column, or_, table
+
+from .config import get_settings
+
+
+# SQLite: external-content FTS5 index over tasks(title, description), kept in sync by triggers.
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, content='tasks', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+)
+
+# PostgreSQL: stored tsvector (title weighted above description) with a GIN index.
+POSTGRES_SEARCH_DDL = (
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING GIN (search_vector)",
+)
+
+_fts = table("tasks_fts", column("rowid"))
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def attach_search_ddl(tasks: Table) -> None:
+    """Create the dialect's search index whenever the tasks table is created."""
+    for statement in SQLITE_SEARCH_DDL:
+        event.listen(tasks, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in POSTGRES_SEARCH_DDL:
+        event.listen(tasks, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+
+def _fts5_query(q: str) -> str | None:
+    # Quote every token so user input can never be parsed as FTS5 syntax; match as prefixes.
+    tokens = _TOKEN_RE.findall(q)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def apply_search(stmt: Select[Any], model: Any, q: str, *, rank: bool = False) -> Select[Any]:
+    """Filter ``stmt`` to tasks matching ``q`` using the configured dialect's index.
+
+    When ``rank`` is true the best matches are ordered first; callers append
+    their own tie-breaking order afterwards.
+    """
+    backend = get_settings().database_backend
+    if backend == "sqlite":
+        match = _fts5_query(q)
+        if match is not None:
+            stmt = stmt.join(_fts, _fts.c.rowid == model.id).where(literal_column("tasks_fts").op("MATCH")(match))
+            if rank:
+                # bm25 is lower-is-better; title hits weigh more than description hits.
+                stmt = stmt.order_by(func.bm25(literal_column("tasks_fts"), 10.0, 1.0))
+            return stmt
+    elif backend == "postgresql":
+        query = func.websearch_to_tsquery("english", q)
+        vector = literal_column("tasks.search_vector")
+        stmt = stmt.where(vector.op("@@")(query))
+        if rank:
+            stmt = stmt.order_by(func.ts_rank_cd(vector, query).desc())
+        return stmt
+    # Dialects without a search index (or input with no searchable tokens) fall back to a scan.
+    pattern = f"%{q.lower()}%"
+    return stmt.where(or_(func.lower(model.title).like(pattern), func.lower(model.description).like(pattern)))
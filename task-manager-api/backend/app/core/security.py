@@ -1,14 +1,23 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Callable, Optional, TypeVar
 
 from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from ..services.cache_service import LocalCache
 from .config import get_settings
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+# Hashes made with a different cost are reported by needs_update() and rehashed on login.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=get_settings().bcrypt_rounds)
 
 
 def get_password_hash(password: str) -> str:
@@ -19,6 +28,81 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """Verify a password; the second item is a replacement hash when the stored cost is outdated."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool so it never blocks the event loop.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism. At most
+    ``max_workers`` hashes run at once; beyond ``max_pending`` queued calls new work
+    is rejected with 503 rather than letting a login burst build an unbounded queue.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int) -> None:
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_seconds_total = 0.0
+        self.queue_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is busy, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        def call() -> tuple[T, float]:
+            # Timings are returned rather than recorded here so metrics are only mutated on the loop thread.
+            started = time.perf_counter()
+            return fn(*args), started
+
+        submitted = time.perf_counter()
+        self.pending += 1
+        try:
+            result, started = await asyncio.get_running_loop().run_in_executor(self._executor, call)
+        finally:
+            self.pending -= 1
+        finished = time.perf_counter()
+        self.completed += 1
+        self.queue_seconds_total += started - submitted
+        self.queue_seconds_max = max(self.queue_seconds_max, started - submitted)
+        self.run_seconds_total += finished - started
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update_password, password, hashed_password)
+
+    def stats(self) -> dict[str, float]:
+        completed = self.completed or 1
+        return {
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_seconds_avg": self.queue_seconds_total / completed,
+            "queue_seconds_max": self.queue_seconds_max,
+            "run_seconds_avg": self.run_seconds_total / completed,
+        }
+
+
+@lru_cache
+def get_password_hasher() -> PasswordHasher:
+    settings = get_settings()
+    return PasswordHasher(max_workers=settings.password_hash_workers, max_pending=settings.password_hash_max_pending)
+
+
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
     settings = get_settings()
     expire = datetime.now(tz=timezone.utc) + (
@@ -37,3 +121,17 @@ def decode_token(token: str) -> dict[str, Any]:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
 
 
+# Verified claims keyed by the token's SHA-256 digest; each entry expires with the token's `exp`.
+token_claims_cache = LocalCache(max_entries=get_settings().token_cache_max_entries, ttl=0)
+
+
+def verify_token_cached(token: str) -> dict[str, Any]:
+    key = hashlib.sha256(token.encode()).hexdigest()
+    hit, claims = token_claims_cache.get(key)
+    if hit:
+        return claims
+    claims = decode_token(token)
+    ttl = float(claims.get("exp", 0)) - time.time()
+    if ttl > 0:
+        token_claims_cache.set(key, claims, ttl=ttl)
+    return claims
@@ -2,22 +2,80 @@ from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from starlette.templating import Jinja2Templates
 
 from .api.v1.api import api_router
+from .api.v1.endpoints.tasks import get_task_insert_batcher
 from .core.config import get_settings
 from .web.routes import router as web_router
-from .core.database import engine, Base
+from .core.database import engine, get_replica_pool, profiler, warm_up_pool, Base
+from .core.metrics import registry
+from .core.security import get_password_hasher
+from .middleware.logging import RequestMetricsMiddleware, configure_access_log
+from .middleware.profiling import SQLProfilingMiddleware
+from .middleware.rate_limit import RateLimitMiddleware
+from .middleware.read_routing import ReadRoutingMiddleware
+from .services.cache_service import get_cache
+from .services.event_service import get_event_hub
 
 
 BASE_DIR = Path(__file__).resolve().parent
 
 
+def _collect_runtime_stats():
+    cache = get_cache().stats()
+    yield "cache_entries", "gauge", "Entries in the in-process cache.", [({}, cache.pop("local_entries"))]
+    yield "cache_events_total", "counter", "Cache lookups and invalidations.", [
+        ({"event": event}, value) for event, value in cache.items()
+    ]
+    flights = get_cache().flights
+    yield "cache_loads_in_flight", "gauge", "Cache misses currently being loaded.", [({}, flights.in_flight)]
+    yield "cache_loads_total", "counter", "Cache misses by key family and single-flight outcome.", [
+        ({"key": family, "outcome": outcome}, value)
+        for family, counts in flights.stats().items()
+        for outcome, value in counts.items()
+    ]
+    hasher = get_password_hasher().stats()
+    yield "password_hash_pending", "gauge", "Password hashes queued or running.", [({}, hasher["pending"])]
+    yield "password_hash_total", "counter", "Password hash jobs by outcome.", [
+        ({"outcome": "completed"}, hasher["completed"]),
+        ({"outcome": "rejected"}, hasher["rejected"]),
+    ]
+    batcher = get_task_insert_batcher().stats()
+    yield "task_insert_batches_total", "counter", "Group-commit batches written for task creates.", [
+        ({}, batcher["batches"])
+    ]
+    yield "task_insert_batch_rows_total", "counter", "Task creates written through group commit.", [
+        ({}, batcher["rows"])
+    ]
+    pool = engine.pool
+    if hasattr(pool, "checkedout"):
+        yield "db_pool_connections", "gauge", "Database pool connections by state.", [
+            ({"state": "checked_out"}, pool.checkedout()),
+            ({"state": "idle"}, pool.checkedin()),
+        ]
+    replicas = get_replica_pool()
+    if replicas.engines:
+        yield "db_replica_healthy", "gauge", "Whether each read replica passes its health check.", [
+            ({"replica": str(index)}, int(healthy)) for index, healthy in enumerate(replicas.healthy)
+        ]
+
+
+registry.register_collector(_collect_runtime_stats)
+
+
 def create_app() -> FastAPI:
     settings = get_settings()
     app = FastAPI(title=settings.app_name, debug=settings.debug)
 
+    app.add_middleware(ReadRoutingMiddleware)
+    app.add_middleware(SQLProfilingMiddleware, profiler=profiler)
+    if settings.rate_limit_enabled:
+        # Runs before routing so excess traffic is rejected before any other work.
+        app.add_middleware(RateLimitMiddleware.from_settings, settings=settings)
+    # Outside the rate limiter, so browsers can read its 429 responses.
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.cors_origins,
@@ -25,6 +83,25 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    if settings.metrics_enabled or settings.access_log_enabled:
+        # Outermost, so rate-limited responses are timed and logged too.
+        app.add_middleware(RequestMetricsMiddleware, access_log=settings.access_log_enabled)
+    if settings.access_log_enabled:
+        access_log_listener = configure_access_log(settings)
+        app.add_event_handler("startup", access_log_listener.start)
+        app.add_event_handler("shutdown", access_log_listener.stop)
+
+    cache = get_cache()
+    app.add_event_handler("startup", cache.start)
+    app.add_event_handler("shutdown", cache.stop)
+    event_hub = get_event_hub()
+    app.add_event_handler("startup", event_hub.start)
+    app.add_event_handler("shutdown", event_hub.stop)
+    replicas = get_replica_pool()
+    app.add_event_handler("startup", replicas.start)
+    app.add_event_handler("shutdown", replicas.stop)
+    # Flushes queued creates; their callers are still waiting for the commit.
+    app.add_event_handler("shutdown", get_task_insert_batcher().stop)
 
     app.include_router(api_router, prefix="/api/v1")
     app.include_router(web_router)
@@ -36,6 +113,11 @@ def create_app() -> FastAPI:
     async def ping() -> dict[str, str]:
         return {"status": "ok"}
 
+    if settings.metrics_enabled:
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics() -> PlainTextResponse:
+            return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
     return app
 
 
@@ -44,8 +126,10 @@ app = create_app()
 
 @app.on_event("startup")
 async def on_startup() -> None:
-    # Ensure tables exist (useful for SQLite/dev). In production, prefer Alembic migrations.
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-
+    settings = get_settings()
+    if settings.database_auto_create:
+        # Development convenience; deployments migrate with Alembic before starting workers.
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    if settings.database_pool_warmup:
+        await warm_up_pool(engine, settings.database_pool_size)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.config import Settings
+from ..core.metrics import (
+    Counter,
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    http_requests_total,
+    http_response_size_bytes,
+    registry,
+)
+
+
+access_logger = logging.getLogger("app.access")
+access_log_dropped_total = registry.register(
+    Counter("access_log_dropped_total", "Access log records dropped because the queue was full.")
+)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Enqueue records without ever blocking; when the queue is full the record is dropped."""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            access_log_dropped_total.inc()
+
+
+def configure_access_log(settings: Settings) -> QueueListener:
+    """Route ``app.access`` through a bounded queue; a background thread does the actual I/O.
+
+    The caller starts and stops the returned listener with the application lifespan.
+    """
+    if settings.access_log_file:
+        target: logging.Handler = logging.FileHandler(settings.access_log_file)
+    else:
+        target = logging.StreamHandler(sys.stderr)
+    target.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    handler = DroppingQueueHandler(queue.Queue(maxsize=settings.access_log_queue_size))
+    access_logger.handlers = [handler]
+    access_logger.setLevel(logging.INFO)
+    access_logger.propagate = False
+    return QueueListener(handler.queue, target, respect_handler_level=True)
+
+
+def _route_label(scope: Scope) -> str:
+    # Label by route template (e.g. "/api/v1/tasks/{task_id}") to keep series cardinality bounded.
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    return "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """Record latency, response size, status and in-flight counts per route, and log each request."""
+
+    def __init__(self, app: ASGIApp, access_log: bool = True) -> None:
+        self.app = app
+        self.access_log = access_log
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        http_requests_in_flight.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            http_requests_in_flight.dec(method)
+            route = _route_label(scope)
+            http_requests_total.inc(method, route, str(status))
+            http_request_duration_seconds.observe(duration, method, route)
+            http_response_size_bytes.observe(size, method, route)
+            if self.access_log:
+                client = scope.get("client")
+                access_logger.info(
+                    '%s "%s %s" %d %d %.1fms',
+                    client[0] if client else "-",
+                    method,
+                    scope["path"],
+                    status,
+                    size,
+                    duration * 1000,
+                )
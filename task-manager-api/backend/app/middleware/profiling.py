@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.profiling import SQLProfiler, end_profile, start_profile
+
+
+class SQLProfilingMiddleware:
+    """Collect per-request SQL statistics and report them in a ``Server-Timing`` header.
+
+    Does nothing while the profiler is disabled. Statements issued after the response
+    has started (e.g. by a streaming body) are counted but miss the header.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: SQLProfiler) -> None:
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+        profile, token = start_profile()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"server-timing", profile.server_timing().encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_profile(token)
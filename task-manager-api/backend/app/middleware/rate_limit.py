@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.config import Settings
+from ..core.security import verify_token_cached
+
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    rate: float  # tokens refilled per second
+    burst: int  # bucket capacity
+    limit: int  # requests per period, reported in RateLimit-Limit
+
+    @classmethod
+    def parse(cls, spec: str) -> RateLimit:
+        """Parse ``"<count>/<second|minute|hour|day>"``, optionally ``";burst=<n>"``."""
+        rule, _, extra = spec.partition(";")
+        count, _, period = rule.strip().partition("/")
+        limit = int(count)
+        burst = limit
+        if extra.strip().startswith("burst="):
+            burst = int(extra.strip()[len("burst="):])
+        return cls(rate=limit / _PERIODS[period.strip().rstrip("s")], burst=burst, limit=limit)
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    remaining: int
+    reset_after: float  # seconds until the bucket is full again
+    retry_after: float  # seconds until one token is available (0 when allowed)
+
+
+def _decision(limit: RateLimit, tokens: float, allowed: bool) -> Decision:
+    retry_after = 0.0 if allowed else (1 - tokens) / limit.rate
+    return Decision(allowed, int(tokens), (limit.burst - tokens) / limit.rate, retry_after)
+
+
+class InMemoryTokenBucket:
+    """Token buckets partitioned into independently locked shards.
+
+    Each check is a dict lookup plus a little arithmetic under an uncontended lock,
+    so cost does not depend on the number of clients. Each shard holds at most
+    ``max_keys_per_shard`` buckets; the least recently created one is dropped first.
+    """
+
+    def __init__(self, shards: int = 16, max_keys_per_shard: int = 10_000) -> None:
+        self._shards: list[tuple[threading.Lock, dict[str, list[float]]]] = [
+            (threading.Lock(), {}) for _ in range(shards)
+        ]
+        self.max_keys_per_shard = max_keys_per_shard
+
+    def acquire(self, key: str, limit: RateLimit, now: float | None = None) -> Decision:
+        now = time.monotonic() if now is None else now
+        lock, buckets = self._shards[hash(key) % len(self._shards)]
+        with lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                if len(buckets) >= self.max_keys_per_shard:
+                    del buckets[next(iter(buckets))]
+                bucket = buckets[key] = [float(limit.burst), now]
+            tokens = min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            bucket[0], bucket[1] = tokens, now
+        return _decision(limit, tokens, allowed)
+
+
+# Refill, take and persist in one round trip; Redis' own clock keeps workers consistent.
+_REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisTokenBucket:
+    """Shared token buckets for multiple workers: one atomic Lua call per request."""
+
+    def __init__(self, client: Any, prefix: str = "tm:rl:") -> None:
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_REDIS_TOKEN_BUCKET)
+
+    async def acquire(self, key: str, limit: RateLimit) -> Decision:
+        allowed, tokens = await self._script(keys=[self.prefix + key], args=[limit.rate, limit.burst])
+        return _decision(limit, float(tokens), bool(int(allowed)))
+
+
+class RateLimitMiddleware:
+    """ASGI middleware applying per-route token-bucket limits.
+
+    Buckets are keyed by the matched rule plus an identity: the client address
+    (``key="client"``), the verified token's subject falling back to the address when
+    there is no valid token (``"user"``), or nothing, making the limit global per route
+    (``"route"``).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        default: str,
+        routes: dict[str, str] | None = None,
+        key: str = "client",
+        exempt_paths: tuple[str, ...] = (),
+        backend: InMemoryTokenBucket | RedisTokenBucket | None = None,
+    ) -> None:
+        self.app = app
+        self.default = RateLimit.parse(default)
+        # Rules are "METHOD /path/prefix" or "/path/prefix"; the longest matching prefix wins.
+        rules = []
+        for pattern, spec in (routes or {}).items():
+            method, _, path = pattern.strip().rpartition(" ")
+            rules.append((method.upper() or None, path, pattern, RateLimit.parse(spec)))
+        self.rules = sorted(rules, key=lambda rule: len(rule[1]), reverse=True)
+        self.key = key
+        self.exempt_paths = exempt_paths
+        self.backend = backend or InMemoryTokenBucket()
+        self._is_async = isinstance(self.backend, RedisTokenBucket)
+
+    @classmethod
+    def from_settings(cls, app: ASGIApp, settings: Settings) -> RateLimitMiddleware:
+        backend: InMemoryTokenBucket | RedisTokenBucket
+        if settings.rate_limit_backend == "redis" and settings.redis_url:
+            import redis.asyncio as redis
+
+            backend = RedisTokenBucket(redis.from_url(settings.redis_url))
+        else:
+            backend = InMemoryTokenBucket(shards=settings.rate_limit_shards)
+        return cls(
+            app,
+            default=settings.rate_limit_default,
+            routes=settings.rate_limit_routes,
+            key=settings.rate_limit_key,
+            exempt_paths=tuple(settings.rate_limit_exempt_paths),
+            backend=backend,
+        )
+
+    def _match(self, method: str, path: str) -> tuple[str, RateLimit]:
+        for rule_method, prefix, name, limit in self.rules:
+            if path.startswith(prefix) and (rule_method is None or rule_method == method):
+                return name, limit
+        return "*", self.default
+
+    def _identity(self, scope: Scope) -> str:
+        if self.key == "route":
+            return ""
+        if self.key == "user":
+            for name, value in scope["headers"]:
+                if name == b"authorization" and value[:7].lower() == b"bearer ":
+                    # Keyed by the verified subject: a new made-up token must not mean a new bucket.
+                    try:
+                        return "u:" + str(verify_token_cached(value[7:].decode("latin-1"))["sub"])
+                    except Exception:  # noqa: BLE001 - invalid or expired token: limit by address
+                        break
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+        name, limit = self._match(scope["method"], scope["path"])
+        bucket_key = f"{name}|{self._identity(scope)}"
+        try:
+            if self._is_async:
+                decision = await self.backend.acquire(bucket_key, limit)  # type: ignore[misc]
+            else:
+                decision = self.backend.acquire(bucket_key, limit)  # type: ignore[assignment]
+        except Exception:  # noqa: BLE001 - fail open if the shared backend is unavailable
+            logger.warning("Rate limiter backend unavailable; allowing request", exc_info=True)
+            await self.app(scope, receive, send)
+            return
+
+        headers = [
+            (b"ratelimit-limit", str(limit.limit).encode()),
+            (b"ratelimit-remaining", str(decision.remaining).encode()),
+            (b"ratelimit-reset", str(math.ceil(decision.reset_after)).encode()),
+        ]
+        if not decision.allowed:
+            headers.append((b"retry-after", str(max(1, math.ceil(decision.retry_after))).encode()))
+            body = b'{"detail":"Too Many Requests"}'
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 429,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode()),
+                        *headers,
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.database import get_replica_pool, read_from_replica
+from ..services.cache_service import fill_ttl_cap
+
+
+READ_METHODS = frozenset({"GET", "HEAD"})
+STICKY_COOKIE = b"tm_read_primary_until"
+
+
+class ReadRoutingMiddleware:
+    """Decide per request whether its database reads may go to a replica.
+
+    Only GET and HEAD requests are routed to replicas. A successful write pins the client
+    to the primary for the read-your-writes window: in this process by its bearer token
+    (or address), and across workers by a cookie carrying the window's end. Cache entries
+    filled from a replica expire with the same window, so replica lag cannot outlive it.
+    Does nothing while no replicas are configured.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    @staticmethod
+    def _client(scope: Scope) -> str:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                return "t:" + value.decode("latin-1")
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    @staticmethod
+    def _cookie_pins_primary(scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name != b"cookie":
+                continue
+            for part in value.split(b";"):
+                key, _, until = part.strip().partition(b"=")
+                if key == STICKY_COOKIE:
+                    try:
+                        return float(until) > time.time()
+                    except ValueError:
+                        return False
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        pool = get_replica_pool()
+        if not pool.engines:
+            await self.app(scope, receive, send)
+            return
+
+        client = self._client(scope)
+        if scope["method"] in READ_METHODS:
+            if pool.wrote_recently(client) or self._cookie_pins_primary(scope):
+                await self.app(scope, receive, send)
+                return
+            replica_token = read_from_replica.set(True)
+            cap_token = fill_ttl_cap.set(pool.sticky_seconds)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                fill_ttl_cap.reset(cap_token)
+                read_from_replica.reset(replica_token)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                pool.mark_write(client)
+                window = pool.sticky_seconds
+                cookie = b"%s=%.3f; Max-Age=%d; Path=/; HttpOnly; SameSite=Lax" % (
+                    STICKY_COOKIE,
+                    time.time() + window,
+                    max(1, round(window)),
+                )
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie)]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
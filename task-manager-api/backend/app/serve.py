@@ -0,0 +1,100 @@
+"""Production entry point: multi-worker uvicorn on uvloop and httptools.
+
+Usage (from backend/): python -m app.serve [--migrate] [--workers N] [--host HOST] [--port PORT]
+
+--migrate runs ``alembic upgrade head`` once, in this process, before any worker starts,
+so workers never race on DDL. Workers skip ``create_all`` and open their connection pool
+during startup; uvicorn only accepts traffic once startup has finished. On SIGTERM each
+worker stops accepting connections and lets in-flight requests finish, for at most
+``server_graceful_shutdown_seconds``.
+
+Workers share no memory. With more than one worker and ``redis_url`` set, the event stream
+(``EVENTS_BACKEND``) and the rate limiter (``RATE_LIMIT_BACKEND``) default to Redis, and
+workers publish the cache tags they invalidate so the others drop them from their local
+tier. Without Redis the local cache tier is disabled (``CACHE_LOCAL_ENABLED=false``) and a
+warning is logged: task events only reach streams connected to the worker that handled the
+write, and every rate limit is multiplied by the number of workers.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from pathlib import Path
+
+import uvicorn
+
+from .core.config import get_settings
+
+
+ALEMBIC_INI = Path(__file__).resolve().parents[1] / "alembic" / "alembic.ini"
+
+logger = logging.getLogger(__name__)
+
+
+def run_migrations() -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config(str(ALEMBIC_INI)), "head")
+
+
+def share_state_across_workers() -> None:
+    """Point per-process state at Redis before starting several workers (see module docstring).
+
+    Only fills in settings the environment leaves unset, so an explicit choice still wins
+    but is reported if it keeps state per process.
+    """
+    if get_settings().redis_url:
+        os.environ.setdefault("EVENTS_BACKEND", "redis")
+        os.environ.setdefault("RATE_LIMIT_BACKEND", "redis")
+    else:
+        os.environ.setdefault("CACHE_LOCAL_ENABLED", "false")
+    get_settings.cache_clear()
+    settings = get_settings()
+    per_process = []
+    if settings.events_backend != "redis" or not settings.redis_url:
+        per_process.append("task events only reach streams on the worker that handled the write")
+    if settings.rate_limit_enabled and (settings.rate_limit_backend != "redis" or not settings.redis_url):
+        per_process.append("rate limits apply per worker, multiplying every limit by the worker count")
+    if per_process:
+        logger.warning("Running several workers without shared Redis state: %s. Set REDIS_URL.", "; ".join(per_process))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--migrate", action="store_true", help="upgrade the schema before starting workers")
+    parser.add_argument("--workers", type=int, help="worker processes (default: server_workers, 0 = CPU count)")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    args = parser.parse_args()
+
+    # Inherited by the workers, which read their own settings.
+    os.environ.setdefault("DATABASE_AUTO_CREATE", "false")
+    get_settings.cache_clear()
+    settings = get_settings()
+    if args.migrate:
+        run_migrations()
+
+    workers = args.workers if args.workers is not None else settings.server_workers
+    workers = workers or os.cpu_count() or 1
+    if workers > 1:
+        share_state_across_workers()
+    uvicorn.run(
+        "app.main:app",
+        host=args.host or settings.server_host,
+        port=args.port or settings.server_port,
+        workers=workers,
+        loop=settings.server_loop,
+        http=settings.server_http,
+        backlog=settings.server_backlog,
+        timeout_keep_alive=settings.server_keepalive_seconds,
+        timeout_graceful_shutdown=settings.server_graceful_shutdown_seconds,
+        proxy_headers=True,
+        # Requests are logged by RequestMetricsMiddleware (app.access).
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+from typing import Any
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.counters import UNOWNED
+from ..core.models import Task, TaskCounter, TaskDailyStats, TaskDueStats, TaskPriorityStats
+
+
+logger = logging.getLogger(__name__)
+
+
+def _completed_count() -> Any:
+    return func.coalesce(func.sum(case((Task.is_completed.is_(True), 1), else_=0)), 0)
+
+
+async def _count_tasks(db: AsyncSession, owner_id: int) -> tuple[int, int]:
+    # Answered from ix_tasks_owner_completed_priority_due_date_id alone.
+    row = (await db.execute(select(func.count(), _completed_count()).where(Task.owner_id == owner_id))).one()
+    return int(row[0]), int(row[1])
+
+
+async def get_task_summary(db: AsyncSession, owner_id: int) -> dict[str, int]:
+    """Return the owner's total/completed/pending from their trigger-maintained counter row (a primary-key lookup)."""
+    counter = await db.get(TaskCounter, owner_id)
+    if counter is None:
+        # No row yet (no tasks created since the counters were installed); count the owner's index range.
+        total, completed = await _count_tasks(db, owner_id)
+    else:
+        total, completed = counter.total, counter.completed
+    return {"total": total, "completed": completed, "pending": total - completed}
+
+
+async def reconcile_task_counters(db: AsyncSession) -> dict[int, dict[str, dict[str, int]]]:
+    """Recompute every owner's counters from ``tasks``, repair them and report any drift by owner.
+
+    The counter rows are locked first so concurrent writers' triggers queue behind
+    the recount instead of racing it.
+    """
+    counters = {
+        counter.owner_id: counter for counter in (await db.scalars(select(TaskCounter).with_for_update())).all()
+    }
+    owner = func.coalesce(Task.owner_id, UNOWNED)
+    actual = {
+        owner_id: (int(total), int(completed))
+        for owner_id, total, completed in await db.execute(
+            select(owner, func.count(), _completed_count()).group_by(owner)
+        )
+    }
+    drift: dict[int, dict[str, dict[str, int]]] = {}
+    for owner_id in sorted(counters.keys() | actual.keys()):
+        counter = counters.get(owner_id)
+        if counter is None:
+            counter = TaskCounter(owner_id=owner_id, total=0, completed=0)
+            db.add(counter)
+        total, completed = actual.get(owner_id, (0, 0))
+        for name, value in (("total", total), ("completed", completed)):
+            stored = getattr(counter, name) or 0
+            if stored != value:
+                drift.setdefault(owner_id, {})[name] = {"stored": stored, "actual": value}
+                setattr(counter, name, value)
+    await db.commit()
+    if drift:
+        logger.warning("Task counter drift repaired: %s", drift)
+    return drift
+
+
+# Dashboard reads below touch only the trigger-maintained rollup tables (app/core/rollups.py):
+# their cost depends on the number of days or priorities asked for, not on the number of tasks.
+
+
+def _ratio(numerator: float, denominator: float) -> float | None:
+    return numerator / denominator if denominator else None
+
+
+async def get_daily_stats(db: AsyncSession, owner_id: int, start: date, end: date) -> dict[str, Any]:
+    """Per-day created/completed counts, completion rate and mean time to complete for ``[start, end]``."""
+    stmt = select(TaskDailyStats).where(TaskDailyStats.owner_id == owner_id, TaskDailyStats.day.between(start, end))
+    rows = (await db.execute(stmt)).scalars()
+    by_day = {row.day: row for row in rows}
+    days = []
+    created = completed = 0
+    seconds = 0.0
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        row = by_day.get(day)
+        day_created, day_completed, day_seconds = (
+            (row.created, row.completed, row.completion_seconds) if row is not None else (0, 0, 0.0)
+        )
+        days.append(
+            {
+                "day": day,
+                "created": day_created,
+                "completed": day_completed,
+                "completion_rate": _ratio(day_completed, day_created),
+                "mean_completion_seconds": _ratio(day_seconds, day_completed),
+            }
+        )
+        created += day_created
+        completed += day_completed
+        seconds += day_seconds
+    return {
+        "days": days,
+        "created": created,
+        "completed": completed,
+        "completion_rate": _ratio(completed, created),
+        "mean_completion_seconds": _ratio(seconds, completed),
+    }
+
+
+async def get_priority_histogram(db: AsyncSession, owner_id: int) -> list[dict[str, int]]:
+    rows = await db.execute(
+        select(TaskPriorityStats.priority, TaskPriorityStats.open)
+        .where(TaskPriorityStats.owner_id == owner_id, TaskPriorityStats.open > 0)
+        .order_by(TaskPriorityStats.priority)
+    )
+    return [{"priority": priority, "open": open_} for priority, open_ in rows]
+
+
+async def get_due_counts(db: AsyncSession, owner_id: int, today: date, upcoming_days: int = 7) -> dict[str, int]:
+    """Open tasks that are overdue (due before ``today``), due today, and due in the following days."""
+    day = TaskDueStats.day
+    row = (
+        await db.execute(
+            select(
+                func.coalesce(func.sum(case((day < today, TaskDueStats.open), else_=0)), 0),
+                func.coalesce(func.sum(case((day == today, TaskDueStats.open), else_=0)), 0),
+                func.coalesce(
+                    func.sum(
+                        case(
+                            ((day > today) & (day <= today + timedelta(days=upcoming_days)), TaskDueStats.open),
+                            else_=0,
+                        )
+                    ),
+                    0,
+                ),
+            ).where(TaskDueStats.owner_id == owner_id, TaskDueStats.open > 0)
+        )
+    ).one()
+    return {"overdue": int(row[0]), "due_today": int(row[1]), "due_upcoming": int(row[2])}
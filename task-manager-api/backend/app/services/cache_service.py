@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Iterable, Protocol, TypeVar
+from urllib.parse import urlencode
+
+import orjson
+from pydantic import TypeAdapter
+
+from ..core.config import get_settings
+from ..utils.singleflight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Codec(Protocol):
+    """Serializes values for the Redis tier; pydantic ``TypeAdapter`` instances satisfy it."""
+
+    def dump_json(self, value: Any, /) -> bytes: ...
+
+    def validate_json(self, payload: bytes, /) -> Any: ...
+
+
+class _RawBytes:
+    """Codec for values that are already encoded (e.g. pre-rendered JSON response bodies)."""
+
+    def dump_json(self, value: bytes, /) -> bytes:
+        return value
+
+    def validate_json(self, payload: bytes, /) -> bytes:
+        return payload
+
+
+_json_adapter: TypeAdapter[Any] = TypeAdapter(Any)
+raw_bytes = _RawBytes()
+
+# Upper bound on the TTL of entries filled during the current request. ReadRoutingMiddleware
+# sets it for requests reading from a replica, whose results may lag behind the primary.
+fill_ttl_cap: ContextVar[float | None] = ContextVar("fill_ttl_cap", default=None)
+
+
+# Tags shared by readers and writers. Single tasks are tagged individually, and lists and
+# stats per owner, so a write only evicts its own entry plus the results it can affect.
+def task_tag(task_id: int) -> str:
+    return f"task:{task_id}"
+
+
+def task_list_tag(owner_id: int) -> str:
+    return f"tasks:list:{owner_id}"
+
+
+def stats_tag(owner_id: int) -> str:
+    return f"stats:{owner_id}"
+
+
+def cache_key(namespace: str, **params: Any) -> str:
+    """Build a stable key from a namespace and query parameters (order-independent, ``None`` dropped)."""
+    items = sorted((k, v) for k, v in params.items() if v is not None)
+    return f"{namespace}?{urlencode(items)}" if items else namespace
+
+
+class LocalCache:
+    """In-process LRU cache with a per-entry TTL and tag index.
+
+    Only touched from the event loop thread, so no locking is needed.
+    """
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._key_tags: dict[str, tuple[str, ...]] = {}
+        self._tag_keys: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self.delete(key)
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: str, value: Any, tags: Iterable[str] = (), ttl: float | None = None) -> None:
+        if key in self._entries:
+            self.delete(key)
+        self._entries[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+        tags = tuple(tags)
+        if tags:
+            self._key_tags[key] = tags
+            for tag in tags:
+                self._tag_keys.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self.delete(oldest)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+
+    def invalidate_tag(self, tag: str) -> int:
+        keys = self._tag_keys.pop(tag, set())
+        for key in keys:
+            self.delete(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._key_tags.clear()
+        self._tag_keys.clear()
+
+
+class RedisCache:
+    """Shared second tier. Tags are Redis sets of the keys carrying them.
+
+    Invalidated tags are also published on ``{prefix}invalidations`` so that every worker
+    can drop them from its local tier.
+    """
+
+    def __init__(self, client: Any, ttl: float, prefix: str = "tm:cache:") -> None:
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.channel = f"{prefix}invalidations"
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _tag(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(self._key(key))
+
+    async def set(self, key: str, payload: bytes, tags: Iterable[str] = (), ttl: float | None = None) -> None:
+        ttl_ms = int((ttl if ttl is not None else self.ttl) * 1000)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(key), payload, px=ttl_ms)
+            for tag in tags:
+                pipe.sadd(self._tag(tag), self._key(key))
+                pipe.pexpire(self._tag(tag), ttl_ms)
+            await pipe.execute()
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            keys = await self.client.smembers(self._tag(tag))
+            await self.client.delete(self._tag(tag), *keys)
+
+    async def publish_invalidation(self, origin: str, tags: Iterable[str]) -> None:
+        await self.client.publish(self.channel, orjson.dumps({"origin": origin, "tags": list(tags)}))
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            await self.client.delete(key)
+
+
+class CacheService:
+    """Read-through cache: local LRU first, then Redis (if configured), then the loader.
+
+    Concurrent misses for the same key share one Redis lookup and loader call, so an
+    expired hot entry costs one query rather than one per waiting request. A load that
+    overlaps an invalidation of one of its tags returns its value but does not cache it:
+    it may have read the data from before the write.
+
+    With Redis, invalidations reach the local tier of every worker through pub/sub once
+    ``start()`` has run. Without it each process only sees its own writes, so the local
+    tier must be disabled when several workers serve the same database (see app.serve).
+    """
+
+    def __init__(
+        self,
+        local: LocalCache,
+        remote: RedisCache | None = None,
+        enabled: bool = True,
+        flights: SingleFlight | None = None,
+    ) -> None:
+        self.local = local
+        self.remote = remote
+        self.enabled = enabled
+        self.flights = flights or SingleFlight()
+        self.hits_local = 0
+        self.hits_remote = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.remote_errors = 0
+        self.stale_fills = 0
+        self.peer_invalidations = 0
+        self.origin = uuid.uuid4().hex
+        self._listener: asyncio.Task[None] | None = None
+        # Per tag, only while a load carrying it is in flight: loads running, and invalidations seen.
+        self._tag_loads: Counter[str] = Counter()
+        self._tag_generations: dict[str, int] = {}
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[T]],
+        *,
+        tags: Iterable[str] = (),
+        adapter: Codec = _json_adapter,
+        ttl: float | None = None,
+    ) -> T:
+        """Return the cached value for ``key`` or load, cache and return it.
+
+        ``adapter`` (de)serializes values for the Redis tier. ``None`` results are
+        not cached so lookups of missing rows always reach the loader.
+        """
+        if not self.enabled:
+            return await self.flights.do(key, loader)
+        hit, value = self.local.get(key)
+        if hit:
+            self.hits_local += 1
+            return value
+        tags = tuple(tags)
+        return await self.flights.do(key, lambda: self._load(key, loader, tags, adapter, ttl), tags)
+
+    async def _load(
+        self, key: str, loader: Callable[[], Awaitable[T]], tags: tuple[str, ...], adapter: Codec, ttl: float | None
+    ) -> T:
+        for tag in tags:
+            self._tag_loads[tag] += 1
+        generations = self._generations(tags)
+        try:
+            if self.remote is not None:
+                payload = await self._remote_call(self.remote.get(key))
+                if payload is not None:
+                    self.hits_remote += 1
+                    value = adapter.validate_json(payload)
+                    if self._fill_allowed(tags, generations):
+                        self.local.set(key, value, tags)
+                    return value
+            self.misses += 1
+            value = await loader()
+            if value is not None and self._fill_allowed(tags, generations):
+                cap = fill_ttl_cap.get()
+                if cap is not None:
+                    ttl = min(ttl, cap) if ttl is not None else cap
+                self.local.set(key, value, tags, ttl=min(cap, self.local.ttl) if cap is not None else None)
+                if self.remote is not None:
+                    await self._remote_call(self.remote.set(key, adapter.dump_json(value), tags, ttl))
+            return value
+        finally:
+            for tag in tags:
+                self._tag_loads[tag] -= 1
+                if not self._tag_loads[tag]:
+                    del self._tag_loads[tag]
+                    self._tag_generations.pop(tag, None)
+
+    def _generations(self, tags: tuple[str, ...]) -> tuple[int, ...]:
+        return tuple(self._tag_generations.get(tag, 0) for tag in tags)
+
+    def _fill_allowed(self, tags: tuple[str, ...], generations: tuple[int, ...]) -> bool:
+        if self._generations(tags) == generations:
+            return True
+        self.stale_fills += 1
+        return False
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        self.invalidations += 1
+        self._invalidate_local(tags)
+        if self.remote is not None:
+            await self._remote_call(self.remote.invalidate_tags(tags))
+            await self._remote_call(self.remote.publish_invalidation(self.origin, tags))
+
+    def _invalidate_local(self, tags: Iterable[str]) -> None:
+        tags = tuple(tags)
+        for tag in tags:
+            if tag in self._tag_loads:
+                self._tag_generations[tag] = self._tag_generations.get(tag, 0) + 1
+        self.flights.forget_tags(tags)
+        for tag in tags:
+            self.local.invalidate_tag(tag)
+
+    async def start(self) -> None:
+        """Apply other workers' invalidations to the local tier (needs the Redis tier)."""
+        if self.remote is not None and self.enabled and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.remote.client.pubsub()
+            try:
+                await pubsub.subscribe(self.remote.channel)
+                # Invalidations published while unsubscribed are lost; start from an empty tier.
+                self.local.clear()
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    payload = orjson.loads(message["data"])
+                    if payload["origin"] != self.origin:
+                        self.peer_invalidations += 1
+                        self._invalidate_local(payload["tags"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa: BLE001 - resubscribe; the local tier is cleared on reconnect
+                self.remote_errors += 1
+                logger.warning("Cache invalidation channel unavailable", exc_info=True)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def clear(self) -> None:
+        self.local.clear()
+        if self.remote is not None:
+            await self._remote_call(self.remote.clear())
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits_local": self.hits_local,
+            "hits_remote": self.hits_remote,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "remote_errors": self.remote_errors,
+            "stale_fills": self.stale_fills,
+            "peer_invalidations": self.peer_invalidations,
+            "local_entries": len(self.local),
+        }
+
+    async def _remote_call(self, call: Awaitable[T]) -> T | None:
+        # Redis is an optimisation: on failure fall back to the database instead of erroring.
+        try:
+            return await call
+        except Exception:  # noqa: BLE001 - any transport error degrades to a miss
+            self.remote_errors += 1
+            logger.warning("Redis cache tier unavailable", exc_info=True)
+            return None
+
+
+@lru_cache
+def get_cache() -> CacheService:
+    settings = get_settings()
+    # A local tier of zero entries never holds anything, so every read goes to Redis or the loader.
+    max_local = settings.cache_max_entries if settings.cache_local_enabled else 0
+    local = LocalCache(max_entries=max_local, ttl=settings.cache_local_ttl_seconds)
+    remote = None
+    if settings.redis_url:
+        import redis.asyncio as redis
+
+        remote = RedisCache(redis.from_url(settings.redis_url), ttl=settings.cache_ttl_seconds)
+    flights = SingleFlight(timeout=settings.cache_singleflight_timeout_seconds)
+    return CacheService(local, remote, enabled=settings.cache_enabled, flights=flights)
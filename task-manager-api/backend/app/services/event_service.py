@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, AsyncIterator, Iterable
+
+import orjson
+
+from ..core.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+TASK_EVENTS_CHANNEL = "tm:events:tasks"
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    type: str
+    owner_id: int | None
+    data: Any
+    # The SSE frame is encoded once at publish time and shared by every subscriber.
+    frame: bytes = field(repr=False, default=b"")
+
+    @classmethod
+    def build(cls, id: int, type: str, owner_id: int | None, data: Any) -> Event:
+        frame = b"id: %d\nevent: %s\ndata: %s\n\n" % (id, type.encode(), orjson.dumps(data))
+        return cls(id, type, owner_id, data, frame)
+
+
+class Subscription:
+    """One stream's view of the hub: one owner's events, a bounded queue and a marker for lost events."""
+
+    def __init__(self, max_queue: int, owner_id: int | None) -> None:
+        self.owner_id = owner_id
+        self.queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.overflowed = False
+
+
+class EventHub:
+    """In-process fan-out of change events to SSE subscribers.
+
+    Every event gets an increasing id and is kept in a replay buffer, so a reconnecting
+    client can resume from ``Last-Event-ID``. A subscriber that falls behind never slows
+    down publishers: with ``overflow="drop_oldest"`` its oldest queued event is discarded,
+    with ``"disconnect"`` the stream is told to resynchronise and closed.
+    """
+
+    def __init__(self, max_queue: int = 256, replay_size: int = 1024, overflow: str = "drop_oldest") -> None:
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self._replay: deque[Event] = deque(maxlen=replay_size)
+        self._subscribers: set[Subscription] = set()
+        self._last_id = 0
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    async def publish(self, type: str, items: Iterable[Any], owner_id: int | None = None) -> None:
+        for data in items:
+            self._last_id += 1
+            self.deliver(Event.build(self._last_id, type, owner_id, data))
+
+    def deliver(self, event: Event) -> None:
+        self._last_id = max(self._last_id, event.id)
+        self._replay.append(event)
+        self.published += 1
+        for sub in self._subscribers:
+            if sub.overflowed or sub.owner_id != event.owner_id:
+                continue
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                sub.dropped += 1
+                if self.overflow == "disconnect":
+                    sub.overflowed = True
+                    logger.info("Event subscriber fell %d events behind; closing its stream", self.max_queue)
+                else:
+                    sub.queue.get_nowait()
+                    sub.queue.put_nowait(event)
+
+    def replay_since(self, last_event_id: int, owner_id: int | None = None) -> list[Event] | None:
+        """``owner_id``'s events after ``last_event_id``, or None when they cannot be replayed.
+
+        That is when some may have been evicted, or when the id was never issued by this hub
+        (it restarted, or the client was streaming from another worker).
+        """
+        if last_event_id > self._last_id:
+            return None
+        if last_event_id == self._last_id:
+            return []
+        if not self._replay or self._replay[0].id > last_event_id + 1:
+            return None
+        return [event for event in self._replay if event.id > last_event_id and event.owner_id == owner_id]
+
+    def reset_subscribers(self, last_id: int = 0) -> None:
+        """Send every stream a reset and stop replaying: events up to ``last_id`` may have been missed."""
+        self._last_id = max(self._last_id, last_id)
+        self._replay.clear()
+        for sub in self._subscribers:
+            sub.overflowed = True
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, owner_id: int | None = None) -> AsyncIterator[Subscription]:
+        sub = Subscription(self.max_queue, owner_id)
+        self._subscribers.add(sub)
+        try:
+            yield sub
+        finally:
+            self._subscribers.discard(sub)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class RedisEventHub(EventHub):
+    """Event hub shared by several workers through Redis pub/sub.
+
+    Ids come from one Redis counter so they are comparable across workers; every worker,
+    including the publisher, delivers events as they arrive on the channel, so each
+    worker's replay buffer and subscribers see the same sequence. When the channel drops,
+    the listener resubscribes with a growing delay and resets every stream.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        channel: str = TASK_EVENTS_CHANNEL,
+        ping_seconds: float = 30.0,
+        reconnect_seconds: float = 0.5,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.client = client
+        self.channel = channel
+        self.ping_seconds = ping_seconds
+        self.reconnect_seconds = reconnect_seconds
+        self.reconnects = 0
+        self._listener: asyncio.Task[None] | None = None
+
+    async def publish(self, type: str, items: Iterable[Any], owner_id: int | None = None) -> None:
+        items = list(items)
+        if not items:
+            return
+        last = await self.client.incrby(f"{self.channel}:seq", len(items))
+        first = last - len(items) + 1
+        async with self.client.pipeline(transaction=False) as pipe:
+            for offset, data in enumerate(items):
+                payload = {"id": first + offset, "type": type, "owner_id": owner_id, "data": data}
+                pipe.publish(self.channel, orjson.dumps(payload))
+            await pipe.execute()
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen(await self._subscribe()))
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+
+    async def _subscribe(self) -> Any:
+        pubsub = self.client.pubsub()
+        try:
+            await pubsub.subscribe(self.channel)
+            last_id = int(await self.client.get(f"{self.channel}:seq") or 0)
+        except BaseException:
+            await pubsub.aclose()
+            raise
+        # Events published while unsubscribed never arrive here: resynchronise every stream.
+        self.reset_subscribers(last_id)
+        return pubsub
+
+    async def _listen(self, pubsub: Any) -> None:
+        delay = self.reconnect_seconds
+        while True:
+            try:
+                while True:
+                    message = await pubsub.get_message(timeout=self.ping_seconds)
+                    if message is None:
+                        # A dropped connection can leave the read waiting forever; a ping fails instead.
+                        await pubsub.ping()
+                        continue
+                    if message["type"] != "message":
+                        continue
+                    delay = self.reconnect_seconds
+                    payload = orjson.loads(message["data"])
+                    self.deliver(Event.build(payload["id"], payload["type"], payload.get("owner_id"), payload["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa: BLE001 - resubscribe; streams are reset once the channel is back
+                logger.warning("Event channel unavailable", exc_info=True)
+            finally:
+                with contextlib.suppress(Exception):
+                    await pubsub.aclose()
+            while True:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                try:
+                    pubsub = await self._subscribe()
+                    break
+                except Exception as exc:  # noqa: BLE001 - keep retrying with a longer delay
+                    logger.warning("Event channel still unavailable (%s); retrying in %.1fs", exc, delay)
+            self.reconnects += 1
+
+
+async def sse_stream(
+    hub: EventHub, owner_id: int | None, last_event_id: int | None, heartbeat_seconds: float, retry_ms: int = 3000
+) -> AsyncIterator[bytes]:
+    """Yield ``owner_id``'s SSE frames: replayed events after ``last_event_id``, then live ones.
+
+    A ``reset`` event asks the client to reload its state, either because the events it
+    missed are no longer buffered or because it fell too far behind.
+    """
+    async with hub.subscribe(owner_id) as sub:
+        yield b"retry: %d\n\n" % retry_ms
+        if last_event_id is not None:
+            backlog = hub.replay_since(last_event_id, owner_id)
+            if backlog is None:
+                yield b"event: reset\ndata: {}\n\n"
+                last_event_id = None  # not an id of ours: every live event is new to the client
+            else:
+                for event in backlog:
+                    yield event.frame
+                    last_event_id = event.id
+        while not sub.overflowed:
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), timeout=heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if last_event_id is not None and event.id <= last_event_id:
+                continue  # already sent from the replay buffer
+            yield event.frame
+        yield b"event: reset\ndata: {}\n\n"
+
+
+@lru_cache
+def get_event_hub() -> EventHub:
+    settings = get_settings()
+    options = {
+        "max_queue": settings.events_subscriber_queue_size,
+        "replay_size": settings.events_replay_size,
+        "overflow": settings.events_overflow_policy,
+    }
+    if settings.events_backend == "redis" and settings.redis_url:
+        import redis.asyncio as redis
+
+        return RedisEventHub(redis.from_url(settings.redis_url), **options)
+    return EventHub(**options)
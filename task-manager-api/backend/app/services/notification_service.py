@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Iterable
+
+from ..core.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+# Called once per owner and batch with that owner's reminders; returns whether it delivered
+# them. Unless some hook did (and none raised), the batch is not marked reminded and is
+# claimed again once its lease lapses.
+ReminderHook = Callable[[int, list[dict[str, Any]]], Awaitable[bool]]
+
+
+async def publish_to_event_stream(owner_id: int, reminders: list[dict[str, Any]]) -> bool:
+    """Send reminders to the owner's open task streams as ``task.reminder`` events.
+
+    Reminders are sent from Celery workers, which only reach the web workers' streams
+    through Redis (``events_backend="redis"``). With the in-process event hub there is no
+    such path: the reminders are logged and reported undelivered, to be retried once a
+    channel is configured.
+    """
+    settings = get_settings()
+    if settings.events_backend != "redis" or not settings.redis_url:
+        for reminder in reminders:
+            logger.info(
+                "Reminder for owner %s: task %s %r is due at %s (not delivered: no event stream configured)",
+                owner_id,
+                reminder["id"],
+                reminder["title"],
+                reminder["due_date"],
+            )
+        return False
+
+    import redis.asyncio as redis
+
+    from .event_service import RedisEventHub
+
+    # A client per batch: each Celery task runs on its own short-lived event loop.
+    client = redis.from_url(settings.redis_url)
+    try:
+        await RedisEventHub(client).publish("task.reminder", reminders, owner_id=owner_id)
+    finally:
+        await client.aclose()
+    return True
+
+
+reminder_hooks: list[ReminderHook] = [publish_to_event_stream]
+
+
+async def send_task_reminders(reminders: Iterable[dict[str, Any]]) -> list[int]:
+    """Deliver one batch of due-date reminders to their owners; returns the ids delivered."""
+    by_owner: defaultdict[int | None, list[dict[str, Any]]] = defaultdict(list)
+    for reminder in reminders:
+        by_owner[reminder["owner_id"]].append(reminder)
+
+    delivered = []
+    for owner_id, items in by_owner.items():
+        if owner_id is None:
+            # Tasks from before ownership existed have nobody to remind; do not retry them.
+            delivered.extend(r["id"] for r in items)
+            continue
+        try:
+            results = [await hook(owner_id, items) for hook in reminder_hooks]
+        except Exception:  # noqa: BLE001 - retried with the next claim of these tasks
+            logger.warning("Could not deliver %d reminders to owner %s", len(items), owner_id, exc_info=True)
+            continue
+        if any(results):
+            delivered.extend(r["id"] for r in items)
+    return delivered
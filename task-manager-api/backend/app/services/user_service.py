@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import get_settings
+from ..core.models import User
+from ..core.schemas import UserOut
+from .cache_service import LocalCache
+
+
+_settings = get_settings()
+# Short TTL bounds staleness for changes made outside the ORM (or by other workers).
+active_user_cache = LocalCache(max_entries=_settings.user_cache_max_entries, ttl=_settings.user_cache_ttl_seconds)
+
+
+async def get_active_user(db: AsyncSession, user_id: int) -> UserOut | None:
+    """Return the user if it exists and is active, served from the cache when possible."""
+    hit, user = active_user_cache.get(str(user_id))
+    if not hit:
+        row = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+        user = UserOut.model_validate(row) if row is not None else None
+        if user is not None:
+            active_user_cache.set(str(user_id), user)
+    if user is None or not user.is_active:
+        return None
+    return user
+
+
+def invalidate_user(user_id: int) -> None:
+    active_user_cache.delete(str(user_id))
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper, connection, target: User) -> None:
+    invalidate_user(target.id)
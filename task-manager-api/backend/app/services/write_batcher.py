@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable
+
+from sqlalchemy import Insert, Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+logger = logging.getLogger(__name__)
+
+_Item = tuple[dict[str, Any], "asyncio.Future[Row[Any]]"]
+
+
+class InsertBatcher:
+    """Group commit: concurrent single-row inserts written together, one transaction per batch.
+
+    ``submit`` queues a row and waits; one writer task collects up to ``max_items`` rows, or
+    whatever arrived within ``max_delay`` seconds of the first, inserts them with one
+    multi-row ``INSERT ... RETURNING`` and commits. Each caller gets its own returned row
+    only after that commit. If a batch fails, its rows are retried one by one so a bad row
+    fails only its own caller. Rows from callers that gave up before the flush are skipped.
+    """
+
+    def __init__(
+        self,
+        statement: Insert,
+        session_factory: Callable[[], AsyncSession],
+        max_items: int = 100,
+        max_delay: float = 0.002,
+        max_queue: int = 10_000,
+    ) -> None:
+        # Must return rows in parameter order (returning(..., sort_by_parameter_order=True)).
+        self.statement = statement
+        self.session_factory = session_factory
+        self.max_items = max_items
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        self._queue: asyncio.Queue[_Item | None] | None = None
+        self._writer: asyncio.Task[None] | None = None
+        self.batches = 0
+        self.rows = 0
+        self.retried_batches = 0
+
+    async def submit(self, values: dict[str, Any]) -> Row[Any]:
+        if self._writer is None or self._queue is None or self._writer.done():
+            # First use, or the previous writer died (e.g. cancelled with its event loop).
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._writer = asyncio.create_task(self._run(self._queue))
+        writer = self._writer
+        future: asyncio.Future[Row[Any]] = asyncio.get_running_loop().create_future()
+        # A full queue makes callers wait here: backpressure instead of unbounded memory.
+        await self._queue.put((values, future))
+        if writer.done():
+            # It ended while this caller waited for room; nothing will read the queue again.
+            self._resolve(future, exc=RuntimeError("Insert batch writer stopped"))
+        return await future
+
+    async def stop(self) -> None:
+        """Flush everything queued so far, then stop the writer."""
+        if self._writer is None or self._queue is None:
+            return
+        if not self._writer.done():
+            await self._queue.put(None)
+        # A writer that failed has already failed its callers and logged why.
+        await asyncio.wait([self._writer])
+        self._writer = self._queue = None
+
+    async def _run(self, queue: asyncio.Queue[_Item | None]) -> None:
+        loop = asyncio.get_running_loop()
+        batch: list[_Item] = []
+        try:
+            while True:
+                first = await queue.get()
+                if first is None:
+                    return
+                batch = [first]
+                deadline = loop.time() + self.max_delay
+                stopping = False
+                while len(batch) < self.max_items:
+                    try:
+                        item = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            item = await asyncio.wait_for(queue.get(), timeout)
+                        except asyncio.TimeoutError:
+                            break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                await self._flush(batch)
+                batch = []
+                if stopping:
+                    return
+        except BaseException as exc:
+            # Fail every caller this writer still owes a row, or they would wait forever.
+            if not isinstance(exc, asyncio.CancelledError):
+                logger.error("Insert batch writer failed", exc_info=True)
+            while not queue.empty():
+                item = queue.get_nowait()
+                if item is not None:
+                    batch.append(item)
+            for _, future in batch:
+                self._resolve(future, exc=RuntimeError("Insert batch writer stopped"))
+            raise
+
+    async def _insert(self, rows: list[dict[str, Any]]) -> list[Row[Any]]:
+        async with self.session_factory() as session:
+            result = (await session.execute(self.statement, rows)).all()
+            await session.commit()
+        return list(result)
+
+    async def _flush(self, batch: list[_Item]) -> None:
+        batch = [(values, future) for values, future in batch if not future.done()]
+        if not batch:
+            return
+        self.batches += 1
+        self.rows += len(batch)
+        try:
+            results = await self._insert([values for values, _ in batch])
+        except Exception as exc:
+            if len(batch) == 1:
+                self._resolve(batch[0][1], exc=exc)
+                return
+            self.retried_batches += 1
+            logger.warning("Insert batch of %d rows failed; retrying rows one by one", len(batch), exc_info=True)
+            for values, future in batch:
+                try:
+                    (row,) = await self._insert([values])
+                except Exception as row_exc:
+                    self._resolve(future, exc=row_exc)
+                else:
+                    self._resolve(future, row)
+            return
+        for (_, future), row in zip(batch, results):
+            self._resolve(future, row)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future[Row[Any]], row: Row[Any] | None = None, exc: Exception | None = None) -> None:
+        # The caller may have been cancelled meanwhile; its row is committed all the same.
+        if future.done():
+            return
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(row)
+
+    def stats(self) -> dict[str, int]:
+        return {"batches": self.batches, "rows": self.rows, "retried_batches": self.retried_batches}
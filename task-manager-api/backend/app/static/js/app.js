@@ -1,5 +1,6 @@
 // API Base URL
 const API_BASE = '/api/v1/tasks';
+const TOKEN_KEY = 'access_token';
 
 // DOM Elements
 const tasksContainer = document.getElementById('tasks-list');
@@ -10,23 +11,35 @@ const modalTitle = document.getElementById('modal-title');
 const addTaskBtn = document.getElementById('add-task-btn');
 const cancelBtn = document.getElementById('cancel-btn');
 const closeBtn = document.querySelector('.close');
+const loginModal = document.getElementById('login-modal');
+const loginForm = document.getElementById('login-form');
+const loginError = document.getElementById('login-error');
+const registerBtn = document.getElementById('register-btn');
 
 // State
 let currentTaskId = null;
 let tasks = [];
+let eventSource = null;
 
 // Initialize
 document.addEventListener('DOMContentLoaded', () => {
-  loadTasks();
   setupEventListeners();
+  if (localStorage.getItem(TOKEN_KEY)) start(); else showLogin();
 });
 
+function start() {
+  loadTasks();
+  subscribeToTaskEvents();
+}
+
 // Event Listeners
 function setupEventListeners() {
   addTaskBtn.addEventListener('click', () => openModal());
   cancelBtn.addEventListener('click', () => closeModal());
   closeBtn.addEventListener('click', () => closeModal());
   taskForm.addEventListener('submit', handleFormSubmit);
+  loginForm.addEventListener('submit', handleLogin);
+  registerBtn.addEventListener('click', handleRegister);
   
   // Close modal when clicking outside
   window.addEventListener('click', (e) => {
@@ -34,11 +47,66 @@ function setupEventListeners() {
   });
 }
 
+// Auth: tasks belong to the signed-in user. The bearer token is kept in localStorage;
+// any 401 drops it and shows the sign-in form again.
+async function authFetch(url, options = {}) {
+  const headers = { ...(options.headers || {}), Authorization: `Bearer ${localStorage.getItem(TOKEN_KEY)}` };
+  const response = await fetch(url, { ...options, headers });
+  if (response.status === 401) {
+    localStorage.removeItem(TOKEN_KEY);
+    showLogin();
+    throw new Error('Please sign in');
+  }
+  return response;
+}
+
+function showLogin() {
+  if (eventSource) eventSource.close();
+  eventSource = null;
+  loginModal.style.display = 'block';
+}
+
+async function login(email, password) {
+  const response = await fetch('/api/v1/auth/login', {
+    method: 'POST',
+    body: new URLSearchParams({ username: email, password })
+  });
+  if (!response.ok) throw new Error('Invalid email or password');
+  localStorage.setItem(TOKEN_KEY, (await response.json()).access_token);
+  loginModal.style.display = 'none';
+  loginError.textContent = '';
+  start();
+}
+
+async function handleLogin(e) {
+  e.preventDefault();
+  try {
+    await login(loginForm.email.value, loginForm.password.value);
+  } catch (error) {
+    loginError.textContent = error.message;
+  }
+}
+
+async function handleRegister() {
+  if (!loginForm.reportValidity()) return;
+  const email = loginForm.email.value;
+  const response = await fetch('/api/v1/users/', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ email, full_name: email, password: loginForm.password.value })
+  });
+  if (!response.ok) {
+    loginError.textContent = 'Could not create the account';
+    return;
+  }
+  await handleLogin(new Event('submit'));
+}
+
 // API Functions
 async function loadTasks() {
   try {
     loadingDiv.style.display = 'block';
-    const response = await fetch(API_BASE);
+    const response = await authFetch(API_BASE);
     if (!response.ok) throw new Error('Failed to load tasks');
     
     tasks = await response.json();
@@ -51,7 +119,7 @@ async function loadTasks() {
 }
 
 async function createTask(taskData) {
-  const response = await fetch(API_BASE, {
+  const response = await authFetch(API_BASE, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify(taskData)
@@ -61,7 +129,7 @@ async function createTask(taskData) {
 }
 
 async function updateTask(id, taskData) {
-  const response = await fetch(`${API_BASE}/${id}`, {
+  const response = await authFetch(`${API_BASE}/${id}`, {
     method: 'PUT',
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify(taskData)
@@ -71,12 +139,36 @@ async function updateTask(id, taskData) {
 }
 
 async function deleteTask(id) {
-  const response = await fetch(`${API_BASE}/${id}`, {
+  const response = await authFetch(`${API_BASE}/${id}`, {
     method: 'DELETE'
   });
   if (!response.ok) throw new Error('Failed to delete task');
 }
 
+// Live updates: apply change events to the loaded list instead of refetching it.
+// EventSource reconnects on its own and resumes with Last-Event-ID. It cannot send an
+// Authorization header, so the token goes in the query string.
+function subscribeToTaskEvents() {
+  if (!window.EventSource || eventSource) return;
+  const token = encodeURIComponent(localStorage.getItem(TOKEN_KEY));
+  const source = eventSource = new EventSource(`${API_BASE}/events?access_token=${token}`);
+  const upsert = (e) => {
+    const task = JSON.parse(e.data);
+    const index = tasks.findIndex(t => t.id === task.id);
+    if (index === -1) tasks.push(task); else tasks[index] = task;
+    renderTasks();
+  };
+  source.addEventListener('task.created', upsert);
+  source.addEventListener('task.updated', upsert);
+  source.addEventListener('task.deleted', (e) => {
+    const { id } = JSON.parse(e.data);
+    tasks = tasks.filter(t => t.id !== id);
+    renderTasks();
+  });
+  // Events were missed (buffer overrun or the client fell behind): start from a fresh list.
+  source.addEventListener('reset', () => loadTasks());
+}
+
 // UI Functions
 function renderTasks() {
   if (tasks.length === 0) {
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Coroutine, TypeVar
+
+from celery import Celery
+
+from ..core.config import get_settings
+from ..core.database import engine
+
+
+T = TypeVar("T")
+
+
+def create_celery() -> Celery:
+    settings = get_settings()
+    app = Celery(
+        "task_manager",
+        broker=settings.celery_broker_url,
+        backend=settings.celery_result_backend,
+        include=["app.tasks.scheduled_tasks", "app.tasks.task_reminders"],
+    )
+    app.conf.update(
+        task_serializer="json",
+        accept_content=["json"],
+        task_always_eager=settings.celery_task_always_eager,
+        task_eager_propagates=True,
+        # Periodic jobs are fire-and-forget; a missed run is simply picked up by the next one.
+        task_ignore_result=settings.celery_result_backend is None,
+        beat_schedule={
+            "scan-due-reminders": {
+                "task": "reminders.scan",
+                "schedule": settings.reminder_scan_interval_seconds,
+            },
+            "reconcile-task-counters": {
+                "task": "stats.reconcile_counters",
+                "schedule": settings.counter_reconcile_interval_seconds,
+            },
+        },
+    )
+    return app
+
+
+celery_app = create_celery()
+
+
+def run_async(coro: Coroutine[object, object, T]) -> T:
+    """Run async service code from a (synchronous) Celery task.
+
+    Each call gets a fresh event loop, so pooled connections created on it are
+    released before it closes rather than leaking into the next task's loop.
+    """
+
+    async def runner() -> T:
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(runner())
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from ..core.config import get_settings
+from ..core.database import AsyncSessionLocal
+from ..services.analytics_service import reconcile_task_counters
+from .celery_app import celery_app, run_async
+from .task_reminders import claim_due_reminders, due_window, send_reminder_batch
+
+
+async def _claim_batches() -> list[list[dict[str, Any]]]:
+    settings = get_settings()
+    now = datetime.utcnow()
+    window = due_window(
+        now, timedelta(minutes=settings.reminder_lead_minutes), timedelta(minutes=settings.reminder_lookback_minutes)
+    )
+    lease = timedelta(seconds=settings.reminder_lease_seconds)
+    batches = []
+    async with AsyncSessionLocal() as session:
+        while True:
+            batch = await claim_due_reminders(session, now, window, settings.reminder_batch_size, lease)
+            if batch:
+                batches.append(batch)
+            if len(batch) < settings.reminder_batch_size:
+                return batches
+
+
+@celery_app.task(name="reminders.scan")
+def scan_due_reminders() -> int:
+    """Claim every task due in the current window and queue one message per batch."""
+    # Claim first, dispatch after the event loop has closed (eager mode runs tasks inline).
+    batches = run_async(_claim_batches())
+    for batch in batches:
+        send_reminder_batch.delay(batch)
+    return sum(len(batch) for batch in batches)
+
+
+async def _reconcile() -> dict[str, dict[str, int]]:
+    async with AsyncSessionLocal() as session:
+        return await reconcile_task_counters(session)
+
+
+@celery_app.task(name="stats.reconcile_counters")
+def reconcile_counters() -> dict[str, dict[str, int]]:
+    return run_async(_reconcile())
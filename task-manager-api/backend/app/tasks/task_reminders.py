@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import Select, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.database import AsyncSessionLocal
+from ..core.models import Task
+from ..services.notification_service import send_task_reminders
+from .celery_app import celery_app, run_async
+
+# Bookkeeping writes must not look like edits: keep updated_at and version (and so ETags) as they are.
+_UNCHANGED = {"updated_at": Task.updated_at, "version": Task.version}
+
+
+def due_window(now: datetime, lead: timedelta, lookback: timedelta) -> tuple[datetime, datetime]:
+    return now - lookback, now + lead
+
+
+def due_candidates(now: datetime, window: tuple[datetime, datetime], batch_size: int) -> Select[Any]:
+    """Unreminded, unleased open tasks due in ``window``, earliest first.
+
+    A range scan on ``ix_tasks_is_completed_due_date``: its cost follows the number of
+    tasks due in the window rather than the table size.
+    """
+    start, end = window
+    return (
+        select(Task.id)
+        .where(
+            Task.is_completed == False,  # noqa: E712 - an equality keeps the index usable
+            Task.due_date >= start,
+            Task.due_date < end,
+            Task.reminded_at.is_(None),
+            or_(Task.reminder_lease_until.is_(None), Task.reminder_lease_until < now),
+        )
+        .order_by(Task.due_date)
+        .limit(batch_size)
+    )
+
+
+async def claim_due_reminders(
+    db: AsyncSession, now: datetime, window: tuple[datetime, datetime], batch_size: int, lease: timedelta
+) -> list[dict[str, Any]]:
+    """Lease up to ``batch_size`` due tasks in one ``UPDATE ... RETURNING`` and return them.
+
+    On PostgreSQL rows locked by another worker's claim are skipped (``SKIP LOCKED``);
+    on SQLite the single writer serializes claims. Either way the lease keeps a claimed
+    task out of later scans until it is marked sent or the lease expires.
+    """
+    candidates = due_candidates(now, window, batch_size).with_for_update(skip_locked=True)
+    stmt = (
+        update(Task)
+        .where(Task.id.in_(candidates))
+        .values(reminder_lease_until=now + lease, **_UNCHANGED)
+        .returning(Task.id, Task.owner_id, Task.title, Task.due_date)
+        .execution_options(synchronize_session=False)
+    )
+    rows = (await db.execute(stmt)).all()
+    await db.commit()
+    return [
+        {"id": id, "owner_id": owner_id, "title": title, "due_date": due_date.isoformat()}
+        for id, owner_id, title, due_date in rows
+    ]
+
+
+async def mark_reminded(db: AsyncSession, task_ids: list[int], now: datetime) -> int:
+    stmt = (
+        update(Task)
+        .where(Task.id.in_(task_ids), Task.reminded_at.is_(None))
+        .values(reminded_at=now, reminder_lease_until=None, **_UNCHANGED)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    await db.commit()
+    return result.rowcount
+
+
+async def _deliver(reminders: list[dict[str, Any]]) -> int:
+    sent = await send_task_reminders(reminders)
+    # Undelivered reminders stay leased and are claimed again once the lease lapses.
+    if sent:
+        async with AsyncSessionLocal() as session:
+            await mark_reminded(session, sent, datetime.utcnow())
+    return len(sent)
+
+
+@celery_app.task(name="reminders.send_batch", acks_late=True)
+def send_reminder_batch(reminders: list[dict[str, Any]]) -> int:
+    """Send one claimed batch. If this never completes, the lease lapses and the batch is claimed again."""
+    return run_async(_deliver(reminders))
@@ -0,0 +1,60 @@
+import os
+import contextlib
+import pytest
+from fastapi.testclient import TestClient
+
+
+@contextlib.contextmanager
+def _patched_settings(tmp_path):
+	from app.core.config import get_settings
+	# Point to a unique temp sqlite database file per test session
+	db_path = tmp_path / "test_tasks.db"
+	os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+	# The suite shares one client address; rate limiting is covered in test_integration.py
+	os.environ["RATE_LIMIT_ENABLED"] = "false"
+	# Clear the settings cache so the test DB URL is picked up
+	get_settings.cache_clear()  # type: ignore[attr-defined]
+	try:
+		yield
+	finally:
+		# Cleanup: clear cache to avoid leaking config to other tests
+		get_settings.cache_clear()  # type: ignore[attr-defined]
+
+
+# The engine (and so the database) lives for the whole session: create the default owner once
+_owner_headers: dict[str, str] = {}
+
+
+def _auth_headers(client: TestClient, email: str) -> dict[str, str]:
+	"""Insert a user directly (no bcrypt round trip) and return a bearer header for it."""
+	from app.core.database import AsyncSessionLocal
+	from app.core.models import User
+	from app.core.security import create_access_token
+
+	async def insert():
+		async with AsyncSessionLocal() as session:
+			user = User(email=email, full_name="Test User", hashed_password="!")
+			session.add(user)
+			await session.commit()
+			return user.id
+
+	return {"Authorization": f"Bearer {create_access_token(str(client.portal.call(insert)))}"}
+
+
+@pytest.fixture()
+def client(tmp_path):
+	with _patched_settings(tmp_path):
+		# Import after settings are patched so engine/app use the test DB
+		from app.main import app
+		with TestClient(app) as c:
+			if not _owner_headers:
+				_owner_headers.update(_auth_headers(c, "owner@example.com"))
+			# Task and stats endpoints are per user: requests act as the default owner unless overridden
+			c.headers.update(_owner_headers)
+			yield c
+
+
+@pytest.fixture()
+def make_user(client):
+	"""Factory for additional users; returns their Authorization header."""
+	return lambda email: _auth_headers(client, email)
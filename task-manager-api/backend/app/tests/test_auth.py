@@ -0,0 +1,130 @@
+import asyncio
+import statistics
+import time
+
+from fastapi.testclient import TestClient
+
+
+def _create_user(client: TestClient, email: str, password: str, rounds: int | None = None) -> None:
+	from app.core.database import AsyncSessionLocal
+	from app.core.models import User
+	from app.core.security import pwd_context
+
+	handler = pwd_context.handler("bcrypt").using(rounds=rounds) if rounds else pwd_context
+	hashed = handler.hash(password)
+
+	async def insert():
+		async with AsyncSessionLocal() as session:
+			session.add(User(email=email, full_name="Test User", hashed_password=hashed))
+			await session.commit()
+
+	client.portal.call(insert)
+
+
+def _stored_hash(client: TestClient, email: str) -> str:
+	from sqlalchemy import select
+
+	from app.core.database import AsyncSessionLocal
+	from app.core.models import User
+
+	async def load():
+		async with AsyncSessionLocal() as session:
+			return await session.scalar(select(User.hashed_password).where(User.email == email))
+
+	return client.portal.call(load)
+
+
+def test_login_rehashes_outdated_cost(client: TestClient):
+	from app.core.security import pwd_context
+
+	_create_user(client, "rehash@example.com", "s3cret", rounds=4)
+	assert pwd_context.needs_update(_stored_hash(client, "rehash@example.com"))
+	resp = client.post("/api/v1/auth/login", data={"username": "rehash@example.com", "password": "s3cret"})
+	assert resp.status_code == 200
+	assert resp.json()["access_token"]
+	assert not pwd_context.needs_update(_stored_hash(client, "rehash@example.com"))
+	bad = client.post("/api/v1/auth/login", data={"username": "rehash@example.com", "password": "wrong"})
+	assert bad.status_code == 400
+
+
+def test_task_reads_stay_fast_during_login_burst(client: TestClient):
+	"""Load test: task reads keep their latency while bcrypt logins run concurrently."""
+	import httpx
+
+	from app.core.security import get_password_hasher
+	from app.main import app
+
+	_create_user(client, "burst@example.com", "s3cret")
+	task_id = client.post("/api/v1/tasks/", json={"title": "read me"}).json()["id"]
+
+	async def scenario():
+		transport = httpx.ASGITransport(app=app)
+		async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=client.headers) as ac:
+
+			async def timed_read() -> float:
+				start = time.perf_counter()
+				# Yield to the loop like a real client would; a blocked loop shows up as latency here.
+				await asyncio.sleep(0.002)
+				resp = await ac.get(f"/api/v1/tasks/{task_id}")
+				assert resp.status_code == 200
+				return time.perf_counter() - start
+
+			baseline = [await timed_read() for _ in range(20)]
+			logins = [
+				asyncio.create_task(
+					ac.post("/api/v1/auth/login", data={"username": "burst@example.com", "password": "s3cret"})
+				)
+				for _ in range(8)
+			]
+			during = []
+			while not all(t.done() for t in logins):
+				during.append(await timed_read())
+			assert all(t.result().status_code == 200 for t in logins)
+			return baseline, during
+
+	baseline, during = client.portal.call(scenario)
+	hash_seconds = get_password_hasher().stats()["run_seconds_avg"]
+	# Blocking bcrypt would stall each read for at least one full hash.
+	assert len(during) > 5
+	assert statistics.median(during) < hash_seconds / 4
+	assert max(during) < hash_seconds
+	assert statistics.median(during) < max(10 * statistics.median(baseline), 0.02)
+
+
+def test_me_uses_cached_claims_and_user(client: TestClient, monkeypatch):
+	from sqlalchemy import select
+
+	from app.core import security
+	from app.core.database import AsyncSessionLocal
+	from app.core.models import User
+
+	resp = client.post("/api/v1/users/", json={"email": "me@example.com", "full_name": "Me", "password": "pw"})
+	assert resp.status_code == 201
+	token = client.post("/api/v1/auth/login", data={"username": "me@example.com", "password": "pw"}).json()["access_token"]
+	headers = {"Authorization": f"Bearer {token}"}
+
+	decodes = 0
+	real_decode = security.decode_token
+
+	def counting_decode(t):
+		nonlocal decodes
+		decodes += 1
+		return real_decode(t)
+
+	monkeypatch.setattr(security, "decode_token", counting_decode)
+	for _ in range(3):
+		resp = client.get("/api/v1/users/me", headers=headers)
+		assert resp.status_code == 200
+		assert resp.json()["email"] == "me@example.com"
+	assert decodes == 1
+	assert client.get("/api/v1/users/me", headers={"Authorization": "Bearer junk"}).status_code == 401
+
+	async def deactivate():
+		async with AsyncSessionLocal() as session:
+			user = await session.scalar(select(User).where(User.email == "me@example.com"))
+			user.is_active = False
+			await session.commit()
+
+	# Changing the user evicts the cached lookup immediately
+	client.portal.call(deactivate)
+	assert client.get("/api/v1/users/me", headers=headers).status_code == 401
@@ -0,0 +1,753 @@
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware.rate_limit import InMemoryTokenBucket, RateLimit, RateLimitMiddleware
+
+
+def _limited_app(**kwargs):
+	app = FastAPI()
+
+	@app.get("/ping")
+	async def ping():
+		return {"status": "ok"}
+
+	@app.get("/items")
+	async def items():
+		return []
+
+	@app.post("/items")
+	async def create_item():
+		return {}
+
+	app.add_middleware(RateLimitMiddleware, exempt_paths=("/ping",), **kwargs)
+	return app
+
+
+def test_token_bucket_refills_over_time():
+	bucket = InMemoryTokenBucket(shards=4)
+	limit = RateLimit.parse("2/second")
+	assert bucket.acquire("k", limit, now=0.0).allowed
+	assert bucket.acquire("k", limit, now=0.0).allowed
+	denied = bucket.acquire("k", limit, now=0.0)
+	assert not denied.allowed
+	assert denied.retry_after == 0.5
+	assert bucket.acquire("k", limit, now=0.5).allowed
+	assert RateLimit.parse("60/minute;burst=5") == RateLimit(rate=1.0, burst=5, limit=60)
+
+
+def test_rate_limit_middleware_headers_and_429():
+	app = _limited_app(default="100/minute", routes={"POST /items": "2/minute"})
+	with TestClient(app) as client:
+		r = client.get("/items")
+		assert r.headers["RateLimit-Limit"] == "100"
+		assert r.headers["RateLimit-Remaining"] == "99"
+		assert client.post("/items").status_code == 200
+		assert client.post("/items").status_code == 200
+		r = client.post("/items")
+		assert r.status_code == 429
+		assert r.json() == {"detail": "Too Many Requests"}
+		assert r.headers["RateLimit-Remaining"] == "0"
+		assert int(r.headers["Retry-After"]) >= 1
+		# Other routes keep their own bucket, exempt paths are untouched
+		assert client.get("/items").status_code == 200
+		assert "RateLimit-Limit" not in client.get("/ping").headers
+
+
+def test_rate_limit_keyed_by_user_token():
+	from datetime import timedelta
+
+	from app.core.security import create_access_token
+
+	app = _limited_app(default="1/minute", key="user")
+	bearer = lambda token: {"Authorization": f"Bearer {token}"}
+	with TestClient(app) as client:
+		assert client.get("/items", headers=bearer(create_access_token("1"))).status_code == 200
+		# Another token for the same user shares the bucket; another user has their own
+		same_user = create_access_token("1", expires_delta=timedelta(minutes=5))
+		assert client.get("/items", headers=bearer(same_user)).status_code == 429
+		assert client.get("/items", headers=bearer(create_access_token("2"))).status_code == 200
+		# Tokens that do not verify are limited by address, however many are made up
+		assert client.get("/items", headers=bearer("junk-a")).status_code == 200
+		assert client.get("/items", headers=bearer("junk-b")).status_code == 429
+
+
+def test_cors_wraps_the_rate_limiter(monkeypatch):
+	from fastapi.middleware.cors import CORSMiddleware
+
+	from app.core.config import get_settings
+	from app.main import create_app
+
+	monkeypatch.setenv("RATE_LIMIT_ENABLED", "true")
+	get_settings.cache_clear()
+	try:
+		app = create_app()
+	finally:
+		monkeypatch.undo()
+		get_settings.cache_clear()
+	# Outermost first: CORS must see (and decorate) the limiter's 429 responses
+	order = [getattr(m.cls, "__self__", m.cls) for m in app.user_middleware]
+	assert order.index(CORSMiddleware) < order.index(RateLimitMiddleware)
+
+	limited = _limited_app(default="1/minute")
+	limited.add_middleware(CORSMiddleware, allow_origins=["*"])
+	with TestClient(limited) as client:
+		client.get("/items")
+		r = client.get("/items", headers={"Origin": "https://app.example.com"})
+	assert r.status_code == 429
+	assert r.headers["access-control-allow-origin"] == "*"
+
+
+def test_histogram_renders_cumulative_buckets():
+	from app.core.metrics import Histogram
+
+	histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+	histogram.observe(0.05, "/a")
+	histogram.observe(0.5, "/a")
+	histogram.observe(5.0, "/a")
+	lines = histogram.render()
+	assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+	assert 'latency_seconds_bucket{route="/a",le="1"} 2' in lines
+	assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+	assert 'latency_seconds_count{route="/a"} 3' in lines
+
+
+def test_metrics_endpoint_reports_route_templates(client):
+	created = client.post("/api/v1/tasks/", json={"title": "Metrics"}).json()
+	assert client.get(f"/api/v1/tasks/{created['id']}").status_code == 200
+	r = client.get("/metrics")
+	assert r.status_code == 200
+	assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+	body = r.text
+	assert 'http_requests_total{method="GET",route="/api/v1/tasks/{task_id}",status="200"}' in body
+	assert 'http_request_duration_seconds_count{method="POST",route="/api/v1/tasks/"}' in body
+	assert 'http_requests_in_flight{method="GET"} 1' in body
+	assert "# TYPE cache_events_total counter" in body
+
+
+def test_sql_profiling_toggle_server_timing_and_slow_log(client, caplog, monkeypatch):
+	from app.core.config import get_settings
+
+	client.post("/api/v1/users/", json={"email": "profiler@example.com", "full_name": "P", "password": "pw"})
+	token = client.post(
+		"/api/v1/auth/login", data={"username": "profiler@example.com", "password": "pw"}
+	).json()["access_token"]
+	headers = {"Authorization": f"Bearer {token}"}
+	task = client.post("/api/v1/tasks/", json={"title": "Profiled"}).json()
+	assert "server-timing" not in client.put(f"/api/v1/tasks/{task['id']}", json={"priority": 1}).headers
+
+	# Profiling is process-wide: ordinary users may neither read nor switch it
+	assert client.get("/api/v1/stats/profiling", headers=headers).status_code == 403
+	assert client.put("/api/v1/stats/profiling", json={"enabled": True}, headers=headers).status_code == 403
+	monkeypatch.setenv("ADMIN_EMAILS", '["profiler@example.com"]')
+	get_settings.cache_clear()
+	try:
+		too_low = client.put("/api/v1/stats/profiling", json={"enabled": True, "slow_query_ms": 0}, headers=headers)
+		assert too_low.status_code == 422
+		monkeypatch.setenv("SQL_SLOW_QUERY_MIN_MS", "0")
+		get_settings.cache_clear()
+		state = client.put("/api/v1/stats/profiling", json={"enabled": True, "slow_query_ms": 0}, headers=headers)
+		assert state.json() == {"enabled": True, "slow_query_ms": 0.0}
+		with caplog.at_level("WARNING", logger="app.core.profiling"):
+			r = client.put(f"/api/v1/tasks/{task['id']}", json={"title": "Private title"})
+		timing = r.headers["server-timing"]
+		assert timing.startswith("db;dur=")
+		# A single UPDATE ... RETURNING
+		assert timing.endswith('desc="1 queries"')
+		assert any("Slow query" in m and "plan:" in m and "(values redacted)" in m for m in caplog.messages)
+		assert not any("Private title" in m for m in caplog.messages)
+	finally:
+		client.put("/api/v1/stats/profiling", json={"enabled": False, "slow_query_ms": 200}, headers=headers)
+		monkeypatch.undo()
+		get_settings.cache_clear()
+	assert "server-timing" not in client.get(f"/api/v1/tasks/{task['id']}").headers
+
+
+def test_sql_profiler_flags_repeated_statements(caplog):
+	from sqlalchemy import create_engine, text
+
+	from app.core.profiling import SQLProfiler, end_profile, start_profile
+
+	engine = create_engine("sqlite://")
+	profiler = SQLProfiler(engine, slow_query_seconds=60, repeat_threshold=3)
+	profiler.enable()
+	profile, token = start_profile()
+	try:
+		with engine.connect() as conn:
+			for i in range(4):
+				conn.execute(text("SELECT :i"), {"i": i})
+	finally:
+		end_profile(token)
+	assert profile.count == 4
+	assert profile.repeated == ["SELECT ?"]
+	assert any("Possible N+1" in m for m in caplog.messages)
+	profiler.disable()
+	with engine.connect() as conn:
+		conn.execute(text("SELECT 1"))
+	assert profile.count == 4
+
+
+def test_reminder_scan_uses_due_date_index():
+	from datetime import datetime, timedelta
+
+	from sqlalchemy import create_engine
+
+	from app.core.database import Base
+	from app.tasks.task_reminders import due_candidates
+
+	engine = create_engine("sqlite://")
+	Base.metadata.create_all(engine)
+	now = datetime(2030, 1, 1)
+	stmt = due_candidates(now, (now - timedelta(days=1), now + timedelta(hours=1)), 100)
+	compiled = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+	with engine.connect() as conn:
+		plan = " ".join(str(row) for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}"))
+	assert "SEARCH tasks USING INDEX ix_tasks_is_completed_due_date (is_completed=? AND due_date>? AND due_date<?)" in plan
+
+
+def test_task_queries_range_scan_owner_leading_indexes():
+	from datetime import datetime
+	from types import SimpleNamespace
+
+	from sqlalchemy import create_engine, func, select
+
+	from app.api.v1.endpoints.tasks import TASK_OUT_COLUMNS, TASK_SORTS, _apply_filters, task_paginator
+	from app.core.database import Base
+	from app.core.models import Task
+
+	engine = create_engine("sqlite://")
+	Base.metadata.create_all(engine)
+
+	def plan(stmt):
+		compiled = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+		with engine.connect() as conn:
+			return " ".join(str(row) for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}"))
+
+	count = _apply_filters(select(func.count(Task.id)), 1, None, False, 2)
+	assert (
+		"SEARCH tasks USING COVERING INDEX ix_tasks_owner_completed_priority_due_date_id "
+		"(owner_id=? AND is_completed=? AND priority>?)"
+	) in plan(count)
+	page, _ = task_paginator.apply(_apply_filters(select(*TASK_OUT_COLUMNS), 1, None, None, None), None, 50)
+	assert "SEARCH tasks USING INDEX ix_tasks_owner_priority_due_date_id (owner_id=?)" in plan(page)
+	assert "TEMP B-TREE" not in plan(page)
+	# Later pages start the index scan at the cursor's priority and still need no sort step
+	indexes = {None: "ix_tasks_owner_priority_due_date_id", False: "ix_tasks_owner_completed_priority_due_date_id"}
+	for due_date in (datetime(2030, 1, 1), None):
+		row = SimpleNamespace(priority=2, due_date=due_date, id=10)
+		for direction, bound in (("next", "priority<?"), ("prev", "priority>?")):
+			cursor = task_paginator.encode_cursor(row, direction)
+			for is_completed, index in indexes.items():
+				stmt = _apply_filters(select(*TASK_OUT_COLUMNS), 1, None, is_completed, None)
+				page, _ = task_paginator.apply(stmt, cursor, 50)
+				assert f"SEARCH tasks USING INDEX {index} (owner_id=? AND " in plan(page)
+				assert bound in plan(page) and "TEMP B-TREE" not in plan(page)
+
+	# Top-k "next up": a range over the owner's open tasks, read in index order and cut off at k
+	top_k = _apply_filters(select(*TASK_OUT_COLUMNS), 1, None, False, None).order_by(*TASK_SORTS["priority"]).limit(10)
+	assert (
+		"SEARCH tasks USING INDEX ix_tasks_owner_completed_priority_due_date_id (owner_id=? AND is_completed=?)"
+	) in plan(top_k)
+	assert "TEMP B-TREE" not in plan(top_k)
+	# Every sort list_tasks accepts is served by an index without a sort step
+	for order in TASK_SORTS.values():
+		for is_completed in (None, True):
+			listing = _apply_filters(select(*TASK_OUT_COLUMNS), 1, None, is_completed, None).order_by(*order)
+			assert "USING INDEX" in plan(listing) and "TEMP B-TREE" not in plan(listing)
+
+
+def test_reminder_claims_lease_and_complete(client):
+	from datetime import datetime, timedelta
+
+	from app.core.database import AsyncSessionLocal
+	from app.tasks.task_reminders import claim_due_reminders, mark_reminded
+
+	now = datetime(2100, 1, 1, 12)
+	due = lambda minutes: (now + timedelta(minutes=minutes)).isoformat()
+	first = client.post("/api/v1/tasks/", json={"title": "Due soon", "due_date": due(5)}).json()
+	second = client.post("/api/v1/tasks/", json={"title": "Due later", "due_date": due(30)}).json()
+	client.post("/api/v1/tasks/", json={"title": "Far off", "due_date": due(60 * 24 * 3)})
+	client.post("/api/v1/tasks/", json={"title": "Done", "due_date": due(1), "is_completed": True})
+	window = (now - timedelta(hours=1), now + timedelta(hours=1))
+	lease = timedelta(minutes=5)
+
+	async def claim(at):
+		async with AsyncSessionLocal() as session:
+			return [r["id"] for r in await claim_due_reminders(session, at, window, 1, lease)]
+
+	async def complete(ids):
+		async with AsyncSessionLocal() as session:
+			return await mark_reminded(session, ids, now)
+
+	assert client.portal.call(claim, now) == [first["id"]]
+	assert client.portal.call(claim, now) == [second["id"]]
+	assert client.portal.call(claim, now) == []
+	# An expired lease makes the task claimable again
+	assert client.portal.call(claim, now + lease + timedelta(seconds=1)) == [first["id"]]
+	assert client.portal.call(complete, [first["id"], second["id"]]) == 2
+	assert client.portal.call(claim, now + 2 * lease) == []
+	# Bookkeeping leaves the task's version (and ETag) alone; rescheduling re-arms the reminder
+	assert client.get(f"/api/v1/tasks/{first['id']}").json()["version"] == 1
+	client.put(f"/api/v1/tasks/{first['id']}", json={"due_date": due(10)})
+	assert client.portal.call(claim, now + 2 * lease) == [first["id"]]
+
+
+def test_scheduled_scan_dispatches_batches_eagerly(client, monkeypatch, caplog):
+	from datetime import datetime, timedelta
+
+	from app.tasks.celery_app import celery_app
+	from app.tasks.scheduled_tasks import scan_due_reminders
+
+	from app.core.config import get_settings
+	from app.services import notification_service
+
+	monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+	received = []
+
+	async def capture(owner_id, reminders):
+		received.extend((owner_id, r["id"]) for r in reminders)
+		return True
+
+	async def unreachable(owner_id, reminders):
+		raise ConnectionError("push service down")
+
+	owner_id = client.get("/api/v1/users/me").json()["id"]
+	due = (datetime.utcnow() + timedelta(minutes=10)).isoformat()
+	task = client.post("/api/v1/tasks/", json={"title": "Eager reminder", "due_date": due}).json()
+	monkeypatch.setenv("REMINDER_LEASE_SECONDS", "0")
+	get_settings.cache_clear()
+	try:
+		# An undelivered reminder is not marked reminded; it is claimed again once its lease lapses
+		monkeypatch.setattr(notification_service, "reminder_hooks", [unreachable])
+		assert scan_due_reminders.apply().get() >= 1
+		# Without an event stream the default hook only logs, which does not count as delivered
+		monkeypatch.setattr(notification_service, "reminder_hooks", [notification_service.publish_to_event_stream])
+		with caplog.at_level("INFO", logger="app.services.notification_service"):
+			assert scan_due_reminders.apply().get() >= 1
+		assert any(f"owner {owner_id}: task {task['id']} 'Eager reminder'" in m for m in caplog.messages)
+		hooks = [capture, notification_service.publish_to_event_stream]
+		monkeypatch.setattr(notification_service, "reminder_hooks", hooks)
+		assert scan_due_reminders.apply().get() >= 1
+		assert (owner_id, task["id"]) in received
+		assert scan_due_reminders.apply().get() == 0
+	finally:
+		get_settings.cache_clear()
+
+
+def test_reminders_are_published_to_the_owners_event_stream(monkeypatch):
+	import asyncio
+
+	import pytest
+
+	fakeredis = pytest.importorskip("fakeredis")
+	import redis.asyncio
+
+	from app.core.config import get_settings
+	from app.services.event_service import RedisEventHub
+	from app.services.notification_service import send_task_reminders
+
+	server = fakeredis.FakeServer()
+	monkeypatch.setattr(redis.asyncio, "from_url", lambda url: fakeredis.FakeAsyncRedis(server=server))
+	monkeypatch.setenv("EVENTS_BACKEND", "redis")
+	monkeypatch.setenv("REDIS_URL", "redis://cache")
+	get_settings.cache_clear()
+
+	async def scenario():
+		hub = RedisEventHub(fakeredis.FakeAsyncRedis(server=server))
+		await hub.start()
+		try:
+			async with hub.subscribe(7) as owner, hub.subscribe(8) as other:
+				reminder = {"id": 1, "owner_id": 7, "title": "Call back", "due_date": "2100-01-01T12:00:00"}
+				assert await send_task_reminders([reminder]) == [1]
+				event = await asyncio.wait_for(owner.queue.get(), 1)
+				assert b"event: task.reminder" in event.frame and b'"title":"Call back"' in event.frame
+				assert other.queue.empty()
+		finally:
+			await hub.stop()
+
+	try:
+		asyncio.run(scenario())
+	finally:
+		get_settings.cache_clear()
+
+
+def test_event_hub_fan_out_overflow_and_resume():
+	import asyncio
+
+	from app.services.event_service import EventHub, sse_stream
+
+	async def scenario():
+		hub = EventHub(max_queue=2, replay_size=3)
+		async with hub.subscribe() as fast, hub.subscribe() as slow:
+			await hub.publish("task.created", [{"id": 1}])
+			assert (await fast.queue.get()).frame == b'id: 1\nevent: task.created\ndata: {"id":1}\n\n'
+			await hub.publish("task.updated", [{"id": 1}, {"id": 1, "n": 2}])
+			# The slow subscriber's oldest event was dropped to make room
+			assert [e.id for e in (slow.queue.get_nowait(), slow.queue.get_nowait())] == [2, 3]
+			assert slow.dropped == 1
+		assert hub.subscribers == 0
+		await hub.publish("task.deleted", [{"id": 1}])
+		assert [e.id for e in hub.replay_since(2)] == [3, 4]
+		assert hub.replay_since(4) == []
+		assert hub.replay_since(0) is None  # event 1 has been evicted
+
+		# Subscribers and replays only see their owner's events
+		async with hub.subscribe(7) as mine:
+			await hub.publish("task.created", [{"id": 9}], owner_id=7)
+			await hub.publish("task.created", [{"id": 10}], owner_id=8)
+			assert mine.queue.qsize() == 1 and mine.queue.get_nowait().data == {"id": 9}
+		assert [e.data for e in hub.replay_since(4, 7)] == [{"id": 9}]
+		assert hub.replay_since(4) == []
+
+		hub = EventHub(max_queue=2, replay_size=3)
+		await hub.publish("task.created", [{"id": 1}, {"id": 2}, {"id": 3}, {"id": 4}])
+		stream = sse_stream(hub, None, 2, heartbeat_seconds=0.01)
+		frames = [await anext(stream) for _ in range(4)]
+		await stream.aclose()
+		assert frames[0].startswith(b"retry:")
+		assert [f.split(b"\n")[0] for f in frames[1:3]] == [b"id: 3", b"id: 4"]
+		assert frames[3] == b": keepalive\n\n"
+
+		stream = sse_stream(hub, None, 0, heartbeat_seconds=1)
+		assert [await anext(stream) for _ in range(2)][1].startswith(b"event: reset")
+		await stream.aclose()
+
+		strict = EventHub(max_queue=1, overflow="disconnect")
+		stream = sse_stream(strict, None, None, heartbeat_seconds=1)
+		await anext(stream)
+		await strict.publish("task.created", [{"id": 1}, {"id": 2}])
+		assert (await anext(stream)).startswith(b"event: reset")
+		await stream.aclose()
+
+	asyncio.run(scenario())
+
+
+def test_resume_from_an_id_the_hub_never_issued_resets():
+	import asyncio
+
+	from app.services.event_service import EventHub, sse_stream
+
+	async def scenario():
+		# A restarted hub (or another worker's) has not reached the client's Last-Event-ID
+		hub = EventHub()
+		assert hub.replay_since(500) is None
+		stream = sse_stream(hub, None, 500, heartbeat_seconds=1)
+		assert (await anext(stream)).startswith(b"retry:")
+		assert (await anext(stream)).startswith(b"event: reset")
+		# Live events are delivered although their ids are below the stale one
+		await hub.publish("task.created", [{"id": 1}])
+		assert (await anext(stream)).startswith(b"id: 1\n")
+		await stream.aclose()
+
+	asyncio.run(scenario())
+
+
+def test_redis_event_hub_resubscribes_and_resets_streams_after_a_drop():
+	import asyncio
+
+	import pytest
+
+	fakeredis = pytest.importorskip("fakeredis")
+	from app.services.event_service import RedisEventHub, sse_stream
+
+	async def scenario():
+		server = fakeredis.FakeServer()
+		hub = RedisEventHub(fakeredis.FakeAsyncRedis(server=server), ping_seconds=0.02, reconnect_seconds=0.01)
+		await hub.start()
+		try:
+			stream = sse_stream(hub, None, None, heartbeat_seconds=0.05)
+			assert (await anext(stream)).startswith(b"retry:")
+			await hub.publish("task.created", [{"id": 1}])
+			assert (await anext(stream)).startswith(b"id: 1\n")
+
+			server.connected = False
+			await asyncio.sleep(0.1)
+			assert not hub._listener.done()
+			server.connected = True
+			while not hub.reconnects:
+				await asyncio.sleep(0.01)
+			# Events may have been published while the channel was down: the stream is told to reload
+			frames = [frame async for frame in stream]
+			assert frames[-1].startswith(b"event: reset")
+			assert hub.replay_since(1) == []
+
+			async with hub.subscribe() as sub:
+				await hub.publish("task.created", [{"id": 2}])
+				assert (await asyncio.wait_for(sub.queue.get(), 1)).id == 2
+		finally:
+			await hub.stop()
+
+	asyncio.run(scenario())
+
+
+def test_task_writes_publish_change_events(client):
+	from app.services.event_service import get_event_hub
+
+	hub = get_event_hub()
+	before = hub.last_id
+	owner_id = client.get("/api/v1/users/me").json()["id"]
+	task = client.post("/api/v1/tasks/", json={"title": "Live"}).json()
+	client.put(f"/api/v1/tasks/{task['id']}", json={"priority": 3})
+	client.delete(f"/api/v1/tasks/{task['id']}")
+	events = hub.replay_since(before, owner_id)
+	assert [(e.type, e.data["id"]) for e in events] == [
+		("task.created", task["id"]),
+		("task.updated", task["id"]),
+		("task.deleted", task["id"]),
+	]
+	assert events[1].data["priority"] == 3
+
+
+def test_alembic_migrations_match_models(tmp_path, monkeypatch):
+	from alembic import command
+	from alembic.autogenerate import compare_metadata
+	from alembic.config import Config
+	from alembic.migration import MigrationContext
+	from sqlalchemy import create_engine
+
+	from app.core.config import get_settings
+	from app.core.database import Base
+
+	alembic_ini = Path(__file__).resolve().parents[2] / "alembic" / "alembic.ini"
+	db_path = tmp_path / "migrated.db"
+	monkeypatch.setenv("DATABASE_URL", f"sqlite+aiosqlite:///{db_path}")
+	get_settings.cache_clear()
+	try:
+		command.upgrade(Config(str(alembic_ini)), "head")
+	finally:
+		monkeypatch.undo()
+		get_settings.cache_clear()
+	engine = create_engine(f"sqlite:///{db_path}")
+	with engine.connect() as conn:
+		diff = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+		triggers = {row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+	# Only the FTS5 shadow tables, which the models do not declare
+	assert [d for d in diff if not (d[0] == "remove_table" and d[1].name.startswith("tasks_fts"))] == []
+	assert {"tasks_fts_ai", "task_counters_ai", "task_rollups_ai"} <= triggers
+
+	# Autogenerate cannot reflect expression indexes on SQLite, so compare their DDL directly
+	def task_indexes(engine):
+		with engine.connect() as conn:
+			rows = conn.exec_driver_sql("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tasks'")
+			return {name: sql for name, sql in rows}
+
+	created = create_engine("sqlite://")
+	Base.metadata.create_all(created)
+	assert task_indexes(engine) == task_indexes(created)
+
+
+def test_replica_pool_round_robin_and_health_checks(tmp_path):
+	import asyncio
+
+	from sqlalchemy.ext.asyncio import create_async_engine
+	from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+	from app.core.database import ReplicaPool
+
+	async def scenario():
+		up = [create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/r{i}.db") for i in range(2)]
+		down = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/r.db")
+		pool = ReplicaPool([*up, down], sticky_seconds=60)
+		assert [pool.pick() for _ in range(3)] == [*up, down]
+		await pool.check()
+		assert pool.healthy == [True, True, False]
+		assert [pool.pick() for _ in range(4)] == [*up, *up]
+		pool.healthy = [False, False, False]
+		assert pool.pick() is None
+		pool.mark_write("t:someone")
+		assert pool.wrote_recently("t:someone") and not pool.wrote_recently("t:other")
+		await pool.stop()
+
+		# A replica whose connection checkout never completes is marked down within the timeout
+		stuck = create_async_engine(
+			f"sqlite+aiosqlite:///{tmp_path}/r0.db", poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0
+		)
+		async with stuck.connect():
+			pool = ReplicaPool([stuck], health_timeout=0.1)
+			await asyncio.wait_for(pool.check(), 1)
+			assert pool.healthy == [False]
+		await pool.stop()
+
+	asyncio.run(scenario())
+
+
+def test_reads_use_the_replica_except_right_after_a_write(client, tmp_path, monkeypatch):
+	import sqlite3
+
+	from app.core import database
+	from app.core.config import get_settings
+
+	# A point-in-time copy of the primary: a replica lagging behind every later write
+	replica_path = tmp_path / "replica.db"
+	with sqlite3.connect(database.engine.url.database) as primary, sqlite3.connect(replica_path) as replica:
+		primary.backup(replica)
+	monkeypatch.setenv("DATABASE_REPLICA_URLS", f'["sqlite+aiosqlite:///{replica_path}"]')
+
+	def fresh_pool():
+		get_settings.cache_clear()
+		database.get_replica_pool.cache_clear()
+		return database.get_replica_pool()
+
+	pools = [fresh_pool()]
+	try:
+		task = client.post("/api/v1/tasks/", json={"title": "Only on the primary"}).json()
+		assert "tm_read_primary_until" in client.cookies
+		# Read-your-writes: the writer is pinned to the primary for a while
+		assert task["id"] in [t["id"] for t in client.get("/api/v1/tasks/").json()]
+
+		# Once the window has passed (new pool, no cookie) reads go to the lagging replica
+		client.cookies.clear()
+		pools.append(fresh_pool())
+		assert client.get(f"/api/v1/tasks/{task['id']}").status_code == 404
+		# An unhealthy replica is skipped
+		pools[-1].healthy = [False]
+		assert task["id"] in [t["id"] for t in client.get("/api/v1/tasks/page").json()["items"]]
+	finally:
+		monkeypatch.undo()
+		fresh_pool()
+		for pool in pools:
+			client.portal.call(pool.stop)
+
+
+def test_group_commit_batches_concurrent_creates(client, monkeypatch):
+	import asyncio
+
+	import httpx
+	from sqlalchemy import insert
+
+	from app.api.v1.endpoints import tasks
+	from app.core.config import get_settings
+	from app.core.database import AsyncSessionLocal
+	from app.core.models import Task
+	from app.main import app
+	from app.services.write_batcher import InsertBatcher
+
+	monkeypatch.setenv("TASK_WRITE_BATCHING_ENABLED", "true")
+	monkeypatch.setenv("TASK_WRITE_BATCH_MAX_DELAY_MS", "50")
+	get_settings.cache_clear()
+	tasks.get_task_insert_batcher.cache_clear()
+	batcher = tasks.get_task_insert_batcher()
+
+	async def burst():
+		transport = httpx.ASGITransport(app=app)
+		async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=client.headers) as ac:
+			return await asyncio.gather(*(ac.post("/api/v1/tasks/", json={"title": f"burst {i}"}) for i in range(20)))
+
+	try:
+		responses = client.portal.call(burst)
+		assert [r.status_code for r in responses] == [201] * 20
+		# Every caller gets its own row back
+		assert [r.json()["title"] for r in responses] == [f"burst {i}" for i in range(20)]
+		assert len({r.json()["id"] for r in responses}) == 20
+		assert batcher.rows == 20 and batcher.batches < 5
+		created = responses[0].json()["id"]
+		assert client.get(f"/api/v1/tasks/{created}").json()["title"] == "burst 0"
+	finally:
+		client.portal.call(batcher.stop)
+		monkeypatch.undo()
+		get_settings.cache_clear()
+		tasks.get_task_insert_batcher.cache_clear()
+
+	# A bad row fails only its own caller; the rest of its batch still commits
+	isolated = InsertBatcher(insert(Task).returning(Task.title, sort_by_parameter_order=True), AsyncSessionLocal, max_delay=0.05)
+
+	async def mixed():
+		return await asyncio.gather(
+			isolated.submit({"title": "good 1"}),
+			isolated.submit({"title": None}),
+			isolated.submit({"title": "good 2"}),
+			return_exceptions=True,
+		)
+
+	try:
+		good_1, bad, good_2 = client.portal.call(mixed)
+	finally:
+		client.portal.call(isolated.stop)
+	assert (good_1.title, good_2.title) == ("good 1", "good 2")
+	assert isinstance(bad, Exception)
+	assert isolated.stats() == {"batches": 1, "rows": 3, "retried_batches": 1}
+
+
+def test_insert_batcher_replaces_a_writer_that_died():
+	import asyncio
+
+	import pytest
+	from sqlalchemy import insert
+
+	from app.core.models import Task
+	from app.services.write_batcher import InsertBatcher
+
+	batcher = InsertBatcher(insert(Task), session_factory=None, max_delay=0.001)
+
+	async def insert_rows(rows):
+		return [row["title"] for row in rows]
+
+	batcher._insert = insert_rows
+	# The first writer is cancelled along with the event loop that started it
+	assert asyncio.run(batcher.submit({"title": "a"})) == "a"
+	assert asyncio.run(batcher.submit({"title": "b"})) == "b"
+
+	flush = batcher._flush
+
+	async def broken_flush(batch):
+		raise KeyError("bug outside the insert")
+
+	async def scenario():
+		batcher._flush = broken_flush
+		with pytest.raises(RuntimeError, match="writer stopped"):
+			await asyncio.wait_for(batcher.submit({"title": "c"}), 1)
+		batcher._flush = flush
+		assert await asyncio.wait_for(batcher.submit({"title": "d"}), 1) == "d"
+		await batcher.stop()
+
+	asyncio.run(scenario())
+
+
+def test_pool_warm_up_opens_pool_size_connections(tmp_path):
+	import asyncio
+
+	from sqlalchemy.ext.asyncio import create_async_engine
+	from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+	from app.core.database import warm_up_pool
+
+	async def warm():
+		url = f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"
+		engine = create_async_engine(url, poolclass=AsyncAdaptedQueuePool, pool_size=3)
+		try:
+			opened = await warm_up_pool(engine, 3)
+			return opened, engine.pool.checkedin()
+		finally:
+			await engine.dispose()
+
+	assert asyncio.run(warm()) == (3, 3)
+
+
+def test_serve_shares_state_across_workers_through_redis(monkeypatch, caplog):
+	import pytest
+
+	pytest.importorskip("uvicorn")
+	from app.core.config import get_settings
+	from app.serve import share_state_across_workers
+
+	for name in ("EVENTS_BACKEND", "RATE_LIMIT_BACKEND", "CACHE_LOCAL_ENABLED", "REDIS_URL"):
+		monkeypatch.delenv(name, raising=False)
+	monkeypatch.setenv("RATE_LIMIT_ENABLED", "true")
+	try:
+		get_settings.cache_clear()
+		with caplog.at_level("WARNING", logger="app.serve"):
+			share_state_across_workers()
+		assert not get_settings().cache_local_enabled
+		assert "rate limits apply per worker" in caplog.text and "task events only reach" in caplog.text
+
+		monkeypatch.delenv("CACHE_LOCAL_ENABLED")
+		monkeypatch.setenv("REDIS_URL", "redis://cache")
+		caplog.clear()
+		get_settings.cache_clear()
+		share_state_across_workers()
+		settings = get_settings()
+		assert settings.events_backend == "redis" and settings.rate_limit_backend == "redis"
+		assert settings.cache_local_enabled and not caplog.records
+	finally:
+		get_settings.cache_clear()
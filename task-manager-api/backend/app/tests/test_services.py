@@ -0,0 +1,213 @@
+import time
+
+import pytest
+
+from app.services.cache_service import CacheService, LocalCache, RedisCache, cache_key
+
+
+def test_cache_key_is_order_independent():
+	assert cache_key("tasks:list", limit=10, q="a") == cache_key("tasks:list", q="a", limit=10)
+	assert cache_key("tasks:list", q=None) == "tasks:list"
+
+
+def test_local_cache_lru_ttl_and_tags(monkeypatch):
+	cache = LocalCache(max_entries=2, ttl=10)
+	cache.set("a", 1, tags=("t",))
+	cache.set("b", 2)
+	cache.get("a")
+	cache.set("c", 3, tags=("t",))
+	# "b" was least recently used
+	assert cache.get("b") == (False, None)
+	assert cache.invalidate_tag("t") == 2
+	assert len(cache) == 0
+	cache.set("d", 4, ttl=1)
+	now = time.monotonic()
+	monkeypatch.setattr(time, "monotonic", lambda: now + 2)
+	assert cache.get("d") == (False, None)
+
+
+async def test_cache_service_read_through_and_invalidation():
+	cache = CacheService(LocalCache(max_entries=100, ttl=60))
+	calls = 0
+
+	async def load():
+		nonlocal calls
+		calls += 1
+		return {"value": calls}
+
+	assert await cache.get_or_set("k", load, tags=("t",)) == {"value": 1}
+	assert await cache.get_or_set("k", load, tags=("t",)) == {"value": 1}
+	await cache.invalidate_tags("t")
+	assert await cache.get_or_set("k", load, tags=("t",)) == {"value": 2}
+	assert cache.stats()["hits_local"] == 1
+	assert cache.stats()["misses"] == 2
+
+
+async def test_cache_service_coalesces_concurrent_misses():
+	import asyncio
+
+	cache = CacheService(LocalCache(max_entries=100, ttl=60))
+	calls = 0
+	release = asyncio.Event()
+
+	async def load():
+		nonlocal calls
+		calls += 1
+		value = {"value": calls}
+		await release.wait()
+		return value
+
+	herd = [asyncio.create_task(cache.get_or_set("task:7", load, tags=("t",))) for _ in range(5)]
+	await asyncio.sleep(0)
+	# A reader arriving after an invalidation does not join the earlier load
+	await cache.invalidate_tags("t")
+	late = asyncio.create_task(cache.get_or_set("task:7", load, tags=("t",)))
+	await asyncio.sleep(0)
+	release.set()
+	assert [await t for t in herd] == [{"value": 1}] * 5
+	assert await late == {"value": 2}
+	assert cache.flights.stats() == {"task:*": {"leader": 2, "shared": 4}}
+	assert cache.flights.in_flight == 0
+
+
+async def test_load_overlapping_an_invalidation_is_not_cached():
+	import asyncio
+
+	fakeredis = pytest.importorskip("fakeredis")
+	client = fakeredis.FakeAsyncRedis()
+	cache = CacheService(LocalCache(max_entries=100, ttl=60), RedisCache(client, ttl=60))
+	row = {"title": "old"}
+	started, release = asyncio.Event(), asyncio.Event()
+
+	async def load():
+		value = dict(row)  # read before the write below
+		started.set()
+		await release.wait()
+		return value
+
+	read = asyncio.create_task(cache.get_or_set("task:1", load, tags=("task:1",)))
+	await started.wait()
+	row["title"] = "new"
+	await cache.invalidate_tags("task:1")
+	release.set()
+	assert await read == {"title": "old"}
+	# Neither tier kept the pre-write value
+	assert cache.local.get("task:1") == (False, None)
+	assert await client.get("tm:cache:task:1") is None
+	assert cache.stats()["stale_fills"] == 1
+
+	async def reload():
+		return dict(row)
+
+	assert await cache.get_or_set("task:1", reload, tags=("task:1",)) == {"title": "new"}
+	assert cache.local.get("task:1") == (True, {"title": "new"})
+	# Generations are only tracked while loads are in flight
+	assert not cache._tag_loads and not cache._tag_generations
+
+
+async def test_single_flight_errors_timeouts_and_cancelled_leaders():
+	import asyncio
+
+	from app.utils.singleflight import SingleFlight
+
+	flights = SingleFlight(timeout=0.05)
+
+	async def fail():
+		await asyncio.sleep(0.01)
+		raise ValueError("boom")
+
+	results = await asyncio.gather(*(flights.do("k", fail) for _ in range(3)), return_exceptions=True)
+	assert [type(r) for r in results] == [ValueError] * 3
+
+	async def slow():
+		await asyncio.sleep(0.2)
+		return "slow"
+
+	async def fast():
+		return "fast"
+
+	leader = asyncio.create_task(flights.do("s", slow))
+	await asyncio.sleep(0)
+	# Waits out the timeout, then runs its own call
+	assert await flights.do("s", fast) == "fast"
+	follower = asyncio.create_task(flights.do("s", fast))
+	await asyncio.sleep(0)
+	leader.cancel()
+	assert await follower == "fast"
+	assert flights.stats() == {
+		"k": {"leader": 1, "shared": 2, "error": 1},
+		"s": {"leader": 1, "shared": 2, "timeout": 1, "abandoned": 1},
+	}
+	assert flights.in_flight == 0
+
+
+async def test_cache_fill_ttl_cap_shortens_entries(monkeypatch):
+	from app.services.cache_service import fill_ttl_cap
+
+	cache = CacheService(LocalCache(max_entries=100, ttl=60))
+
+	async def load():
+		return "from a replica"
+
+	token = fill_ttl_cap.set(5)
+	try:
+		await cache.get_or_set("k", load)
+	finally:
+		fill_ttl_cap.reset(token)
+	now = time.monotonic()
+	monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+	assert cache.local.get("k") == (False, None)
+
+
+async def test_cache_service_redis_tier_is_shared():
+	fakeredis = pytest.importorskip("fakeredis")
+	client = fakeredis.FakeAsyncRedis()
+	remote = RedisCache(client, ttl=60)
+	worker_a = CacheService(LocalCache(max_entries=100, ttl=60), remote)
+	worker_b = CacheService(LocalCache(max_entries=100, ttl=60), remote)
+
+	async def load():
+		return [1, 2, 3]
+
+	await worker_a.get_or_set("k", load, tags=("t",))
+	assert await worker_b.get_or_set("k", load, tags=("t",)) == [1, 2, 3]
+	assert worker_b.stats()["hits_remote"] == 1
+	await worker_a.invalidate_tags("t")
+	assert await client.get("tm:cache:k") is None
+
+
+async def test_invalidations_reach_other_workers_local_tier():
+	import asyncio
+
+	fakeredis = pytest.importorskip("fakeredis")
+	server = fakeredis.FakeServer()
+
+	def worker():
+		return CacheService(LocalCache(max_entries=100, ttl=60), RedisCache(fakeredis.FakeAsyncRedis(server=server), ttl=60))
+
+	worker_a, worker_b = worker(), worker()
+	row = {"title": "old"}
+
+	async def load():
+		return dict(row)
+
+	await worker_b.start()
+	try:
+		while not (await worker_a.remote.client.pubsub_numsub(worker_a.remote.channel))[0][1]:
+			await asyncio.sleep(0.01)
+		assert await worker_b.get_or_set("k", load, tags=("t",)) == {"title": "old"}
+		row["title"] = "new"
+		await worker_a.invalidate_tags("t")
+		for _ in range(100):
+			if worker_b.stats()["peer_invalidations"]:
+				break
+			await asyncio.sleep(0.01)
+		assert worker_b.local.get("k") == (False, None)
+		assert await worker_b.get_or_set("k", load, tags=("t",)) == {"title": "new"}
+		# A worker skips the invalidations it published itself
+		await worker_b.invalidate_tags("t")
+		await asyncio.sleep(0.05)
+		assert worker_b.stats()["peer_invalidations"] == 1
+	finally:
+		await worker_b.stop()
+	assert worker_b._listener is None
@@ -1,33 +1,6 @@
-import os
-import contextlib
-import pytest
 from fastapi.testclient import TestClient
 
 
-@contextlib.contextmanager
-def _patched_settings(tmp_path):
-	from app.core.config import get_settings
-	# Point to a unique temp sqlite database file per test session
-	db_path = tmp_path / "test_tasks.db"
-	os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
-	# Clear the settings cache so the test DB URL is picked up
-	get_settings.cache_clear()  # type: ignore[attr-defined]
-	try:
-		yield
-	finally:
-		# Cleanup: clear cache to avoid leaking config to other tests
-		get_settings.cache_clear()  # type: ignore[attr-defined]
-
-
-@pytest.fixture()
-def client(tmp_path):
-	with _patched_settings(tmp_path):
-		# Import after settings are patched so engine/app use the test DB
-		from app.main import app
-		with TestClient(app) as c:
-			yield c
-
-
 def test_create_task(client: TestClient):
 	payload = {"title": "Write unit tests"}
 	resp = client.post("/api/v1/tasks/", json=payload)
@@ -90,3 +63,275 @@ def test_delete_task(client: TestClient):
 	# Confirm 404 afterwards
 	not_found = client.get(f"/api/v1/tasks/{task_id}")
 	assert not_found.status_code == 404
+
+
+def test_cursor_pagination(client: TestClient):
+	created = [
+		client.post("/api/v1/tasks/", json={
+			"title": f"paged-{i}",
+			"priority": i % 3,
+			"due_date": f"2030-01-0{i + 1}T00:00:00" if i % 2 else None,
+		}).json()["id"]
+		for i in range(7)
+	]
+	seen: list[int] = []
+	cursor = None
+	pages = []
+	while True:
+		params = {"q": "paged-", "limit": 3}
+		if cursor:
+			params["cursor"] = cursor
+		page = client.get("/api/v1/tasks/page", params=params).json()
+		pages.append(page)
+		seen.extend(t["id"] for t in page["items"])
+		cursor = page["next_cursor"]
+		if cursor is None:
+			break
+	items = [t for page in pages for t in page["items"]]
+	assert sorted(seen) == sorted(created)
+	assert len(seen) == len(set(seen))
+	# The index order: priority descending, then due date with undated tasks last, then id
+	assert items == sorted(items, key=lambda t: (-t["priority"], t["due_date"] is None, t["due_date"] or "", t["id"]))
+	# Walking back from the last page returns the previous page unchanged
+	back = client.get("/api/v1/tasks/page", params={"q": "paged-", "limit": 3, "cursor": pages[-1]["prev_cursor"]}).json()
+	assert back["items"] == pages[-2]["items"]
+	assert client.get("/api/v1/tasks/page", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_sort_key_requires_index_expressions():
+	import pytest
+
+	from app.core.models import Task
+	from app.utils.pagination import SortKey
+
+	with pytest.raises(ValueError):
+		SortKey(Task.due_date)
+	with pytest.raises(ValueError):
+		SortKey(Task.due_date, expressions=(Task.due_date.desc(),))
+	key = SortKey(Task.due_date, expressions=(Task.due_date.is_(None), Task.due_date))
+	assert [str(c) for c in key.order_by(reverse=False)] == ["tasks.due_date IS NULL ASC", "tasks.due_date ASC"]
+
+
+def test_search_title_and_description(client: TestClient):
+	in_title = client.post("/api/v1/tasks/", json={"title": "Renew zeppelin license"}).json()["id"]
+	in_desc = client.post("/api/v1/tasks/", json={"title": "Paperwork", "description": "zeppelin hangar lease"}).json()["id"]
+	resp = client.get("/api/v1/tasks/", params={"q": "Zeppelin"})
+	assert resp.status_code == 200
+	# Title matches rank above description-only matches
+	assert [t["id"] for t in resp.json()] == [in_title, in_desc]
+	# Updates and deletes keep the index in sync
+	client.put(f"/api/v1/tasks/{in_title}", json={"title": "Renew airship license"})
+	client.delete(f"/api/v1/tasks/{in_desc}")
+	assert client.get("/api/v1/tasks/", params={"q": "zeppelin"}).json() == []
+	assert client.get("/api/v1/tasks/", params={"q": "airsh"}).json()[0]["id"] == in_title
+
+
+def test_stats_summary_tracks_writes_and_reconciles(client: TestClient):
+	from sqlalchemy import update
+
+	from app.core.database import AsyncSessionLocal
+	from app.core.models import TaskCounter
+	from app.services.analytics_service import reconcile_task_counters
+
+	owner_id = client.get("/api/v1/users/me").json()["id"]
+	before = client.get("/api/v1/stats/summary").json()
+	a = client.post("/api/v1/tasks/", json={"title": "count a"}).json()["id"]
+	b = client.post("/api/v1/tasks/", json={"title": "count b", "is_completed": True}).json()["id"]
+	client.put(f"/api/v1/tasks/{a}", json={"is_completed": True})
+	client.delete(f"/api/v1/tasks/{b}")
+	after = client.get("/api/v1/stats/summary").json()
+	assert after["total"] == before["total"] + 1
+	assert after["completed"] == before["completed"] + 1
+	assert after["pending"] == after["total"] - after["completed"]
+
+	async def tamper_and_reconcile():
+		async with AsyncSessionLocal() as session:
+			stmt = update(TaskCounter).where(TaskCounter.owner_id == owner_id).values(total=TaskCounter.total + 5)
+			await session.execute(stmt)
+			await session.commit()
+			drift = await reconcile_task_counters(session)
+			assert drift == {owner_id: {"total": {"stored": after["total"] + 5, "actual": after["total"]}}}
+			assert await reconcile_task_counters(session) == {}
+
+	client.portal.call(tamper_and_reconcile)
+
+
+def test_bulk_create_update_delete(client: TestClient):
+	resp = client.post("/api/v1/tasks/bulk", json=[{"title": f"bulk-{i}", "priority": i} for i in range(5)])
+	assert resp.status_code == 201
+	created = resp.json()["results"]
+	assert [r["task"]["title"] for r in created] == [f"bulk-{i}" for i in range(5)]
+	ids = [r["id"] for r in created]
+
+	resp = client.patch(
+		"/api/v1/tasks/bulk",
+		json=[{"id": ids[0], "is_completed": True}, {"id": ids[1], "title": "bulk-renamed"}, {"id": 10**9}],
+	)
+	assert resp.status_code == 200
+	body = resp.json()
+	assert body["affected"] == 2
+	assert [r["status"] for r in body["results"]] == ["updated", "updated", "not_found"]
+	assert body["results"][0]["task"]["is_completed"] is True
+	assert body["results"][1]["task"]["title"] == "bulk-renamed"
+	assert client.get(f"/api/v1/tasks/{ids[1]}").json()["title"] == "bulk-renamed"
+
+	resp = client.request("DELETE", "/api/v1/tasks/bulk", json={"ids": [ids[0], 10**9]})
+	assert [r["status"] for r in resp.json()["results"]] == ["deleted", "not_found"]
+	resp = client.request("DELETE", "/api/v1/tasks/bulk", json={"filter": {"q": "bulk", "min_priority": 2}})
+	assert sorted(r["id"] for r in resp.json()["results"]) == ids[2:]
+	assert client.get(f"/api/v1/tasks/{ids[2]}").status_code == 404
+	assert client.request("DELETE", "/api/v1/tasks/bulk", json={}).status_code == 422
+
+
+def test_export_streams_ndjson_and_csv(client: TestClient):
+	import csv
+	import io
+	import json
+
+	client.post("/api/v1/tasks/bulk", json=[{"title": f"export-{i}", "description": "a, \"quoted\" line"} for i in range(3)])
+	resp = client.get("/api/v1/tasks/export", params={"q": "export"})
+	assert resp.status_code == 200
+	assert resp.headers["content-type"].startswith("application/x-ndjson")
+	lines = [json.loads(line) for line in resp.text.splitlines()]
+	assert [t["title"] for t in lines] == [f"export-{i}" for i in range(3)]
+
+	resp = client.get("/api/v1/tasks/export", params={"q": "export", "format": "csv"})
+	rows = list(csv.DictReader(io.StringIO(resp.text)))
+	assert [r["title"] for r in rows] == [f"export-{i}" for i in range(3)]
+	assert rows[0]["description"] == "a, \"quoted\" line"
+	assert client.get("/api/v1/tasks/export", params={"format": "xml"}).status_code == 422
+
+
+def test_list_fast_path_matches_single_task_shape(client: TestClient):
+	created = client.post(
+		"/api/v1/tasks/", json={"title": "shape-check", "description": "x", "due_date": "2031-05-06T07:08:09"}
+	).json()
+	listed = client.get("/api/v1/tasks/", params={"q": "shape-check"})
+	assert listed.headers["content-type"] == "application/json"
+	assert listed.json() == [client.get(f"/api/v1/tasks/{created['id']}").json()]
+	page = client.get("/api/v1/tasks/page", params={"q": "shape-check"}).json()
+	assert page["items"] == listed.json()
+
+
+def test_conditional_requests_with_etags(client):
+	task = client.post("/api/v1/tasks/", json={"title": "Conditional"}).json()
+	url = f"/api/v1/tasks/{task['id']}"
+	r = client.get(url)
+	tag = r.headers["ETag"]
+	assert client.get(url, headers={"If-None-Match": tag}).status_code == 304
+
+	listing = client.get("/api/v1/tasks/", params={"q": "Conditional"})
+	list_tag = listing.headers["ETag"]
+	not_modified = client.get("/api/v1/tasks/", params={"q": "Conditional"}, headers={"If-None-Match": list_tag})
+	assert not_modified.status_code == 304
+	assert not_modified.content == b""
+
+	assert client.put(url, json={"priority": 3}, headers={"If-Match": '"stale"'}).status_code == 412
+	updated = client.put(url, json={"priority": 3}, headers={"If-Match": tag})
+	assert updated.status_code == 200
+	new_tag = updated.headers["ETag"]
+	assert new_tag != tag
+	assert client.get(url, headers={"If-None-Match": tag}).status_code == 200
+	assert client.get("/api/v1/tasks/", params={"q": "Conditional"}, headers={"If-None-Match": list_tag}).status_code == 200
+
+	assert client.delete(url, headers={"If-Match": tag}).status_code == 412
+	assert client.delete(url, headers={"If-Match": new_tag}).status_code == 204
+
+
+def test_writes_bump_version(client):
+	task = client.post("/api/v1/tasks/", json={"title": "Versioned"}).json()
+	assert task["version"] == 1
+	url = f"/api/v1/tasks/{task['id']}"
+	updated = client.put(url, json={"priority": 1}, headers={"If-Match": f'"{task["id"]}-v1"'}).json()
+	assert updated["version"] == 2
+	bulk = client.patch("/api/v1/tasks/bulk", json=[{"id": task["id"], "priority": 2}]).json()
+	assert bulk["results"][0]["task"]["version"] == 3
+	assert client.put(url, json={"priority": 4}, headers={"If-Match": f'"{task["id"]}-v2"'}).status_code == 412
+	assert client.delete(url).status_code == 204
+	assert client.put(url, json={"priority": 4}, headers={"If-Match": "*"}).status_code == 404
+	assert client.delete(url).status_code == 404
+
+
+def test_rollup_stats_endpoints(client):
+	from datetime import datetime, timedelta
+
+	before = {
+		"daily": client.get("/api/v1/stats/daily", params={"days": 1}).json(),
+		"priorities": {p["priority"]: p["open"] for p in client.get("/api/v1/stats/priorities").json()},
+		"due": client.get("/api/v1/stats/due").json(),
+	}
+	yesterday = (datetime.utcnow() - timedelta(days=1)).isoformat()
+	today = datetime.utcnow().isoformat()
+	overdue = client.post("/api/v1/tasks/", json={"title": "Overdue", "priority": 42, "due_date": yesterday}).json()
+	done = client.post("/api/v1/tasks/", json={"title": "Finish me", "priority": 42, "due_date": today}).json()
+	client.put(f"/api/v1/tasks/{done['id']}", json={"is_completed": True})
+
+	daily = client.get("/api/v1/stats/daily", params={"days": 1}).json()
+	assert len(daily["days"]) == 1
+	assert daily["created"] == before["daily"]["created"] + 2
+	assert daily["completed"] == before["daily"]["completed"] + 1
+	assert daily["mean_completion_seconds"] is not None
+	priorities = {p["priority"]: p["open"] for p in client.get("/api/v1/stats/priorities").json()}
+	assert priorities[42] == before["priorities"].get(42, 0) + 1
+	due = client.get("/api/v1/stats/due").json()
+	assert due["overdue"] == before["due"]["overdue"] + 1
+	assert due["due_today"] == before["due"]["due_today"]
+
+	# Reopening and deleting take their contributions back off the rollups
+	client.put(f"/api/v1/tasks/{done['id']}", json={"is_completed": False})
+	client.delete(f"/api/v1/tasks/{overdue['id']}")
+	assert client.get("/api/v1/stats/daily", params={"days": 1}).json()["completed"] == before["daily"]["completed"]
+	assert client.get("/api/v1/stats/due").json()["due_today"] == before["due"]["due_today"] + 1
+	assert client.get("/api/v1/stats/due").json()["overdue"] == before["due"]["overdue"]
+
+
+def test_tasks_and_stats_are_scoped_to_their_owner(client, make_user):
+	other = make_user("other@example.com")
+	mine = client.post("/api/v1/tasks/", json={"title": "Mine only"}).json()
+	summary = client.get("/api/v1/stats/summary").json()
+
+	assert mine["id"] not in [t["id"] for t in client.get("/api/v1/tasks/", headers=other).json()]
+	assert client.get(f"/api/v1/tasks/{mine['id']}", headers=other).status_code == 404
+	assert client.put(f"/api/v1/tasks/{mine['id']}", json={"priority": 5}, headers=other).status_code == 404
+	assert client.delete(f"/api/v1/tasks/{mine['id']}", headers=other).status_code == 404
+	bulk = client.patch("/api/v1/tasks/bulk", json=[{"id": mine["id"], "priority": 5}], headers=other).json()
+	assert bulk["results"][0]["status"] == "not_found"
+	# An empty filter matches every task, but only the caller's
+	client.request("DELETE", "/api/v1/tasks/bulk", json={"filter": {}}, headers=other)
+
+	theirs = client.post("/api/v1/tasks/", json={"title": "Theirs"}, headers=other).json()
+	assert [t["id"] for t in client.get("/api/v1/tasks/", headers=other).json()] == [theirs["id"]]
+	assert client.get("/api/v1/stats/summary", headers=other).json()["total"] == 1
+	assert client.get("/api/v1/stats/summary").json() == summary
+	assert client.get(f"/api/v1/tasks/{mine['id']}").json()["priority"] == mine["priority"]
+	assert client.get("/api/v1/tasks/", headers={"Authorization": ""}).status_code == 401
+
+
+def test_next_up_and_index_backed_sorts(client, make_user):
+	user = make_user("next-up@example.com")
+
+	def create(title, priority, due_date=None, is_completed=False):
+		payload = {"title": title, "priority": priority, "due_date": due_date, "is_completed": is_completed}
+		return client.post("/api/v1/tasks/", json=payload, headers=user).json()["id"]
+
+	undated = create("Urgent, undated", 5)
+	soon = create("Urgent, due soon", 5, "2100-01-01T09:00:00")
+	create("Urgent but done", 5, "2099-01-01T09:00:00", is_completed=True)
+	later = create("Low, due first", 1, "2099-06-01T09:00:00")
+
+	def titles(path):
+		return [t["title"] for t in client.get(path, headers=user).json()]
+
+	# Highest priority first, then earliest due date; undated tasks after dated ones
+	assert titles("/api/v1/tasks/next?k=2") == ["Urgent, due soon", "Urgent, undated"]
+	assert [t["id"] for t in client.get("/api/v1/tasks/next", headers=user).json()] == [soon, undated, later]
+	assert titles("/api/v1/tasks/?sort=due_date&is_completed=false") == [
+		"Low, due first",
+		"Urgent, due soon",
+		"Urgent, undated",
+	]
+	assert client.get("/api/v1/tasks/?sort=title", headers=user).status_code == 422
+	assert client.get("/api/v1/tasks/next?k=0", headers=user).status_code == 422
+
+	create("Most urgent", 9, "2100-06-01T09:00:00")
+	assert titles("/api/v1/tasks/next?k=1") == ["Most urgent"]
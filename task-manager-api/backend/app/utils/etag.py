@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag derived from version components (e.g. id and ``updated_at``)."""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def _tags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def none_match(header: str | None, etag: str) -> bool:
+    """True when ``If-None-Match`` lists ``etag`` (weak comparison, so ``W/`` prefixes are ignored)."""
+    if not header:
+        return False
+    return any(tag == "*" or tag.removeprefix("W/") == etag for tag in _tags(header))
+
+
+def if_match_tags(header: str | None) -> list[str] | None:
+    """ETags an ``If-Match`` header accepts, or None when any current representation will do."""
+    if header is None:
+        return None
+    tags = _tags(header)
+    return None if "*" in tags else tags
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, Sequence, TypeVar
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import ColumnElement, Select, and_, false, or_
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+    limit: int
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """One column of a keyset ordering.
+
+    ``expressions`` are the terms rows are ordered by, spelled as in the index that serves
+    the ordering; by default the column alone. A nullable column has to list
+    ``column.is_(None)`` ahead of the column, e.g. ``(Task.due_date.is_(None), Task.due_date)``
+    to put NULLs after every value when ascending.
+    """
+
+    column: InstrumentedAttribute[Any]
+    descending: bool = False
+    expressions: tuple[ColumnElement[Any], ...] = ()
+
+    def __post_init__(self) -> None:
+        if not self.expressions:
+            object.__setattr__(self, "expressions", (self.column,))
+        for expr in self.expressions:
+            if not (expr is self.column or self._is_null_test(expr)):
+                raise ValueError(f"Unsupported sort expression for {self.column.key}: {expr}")
+        if self.column.expression.nullable and not any(self._is_null_test(e) for e in self.expressions):
+            raise ValueError(f"Nullable sort column {self.column.key} needs an IS NULL term")
+
+    def _is_null_test(self, expr: ColumnElement[Any]) -> bool:
+        return expr is not self.column and expr.compare(self.column.is_(None))
+
+    def order_by(self, reverse: bool) -> list[ColumnElement[Any]]:
+        descending = self.descending != reverse
+        return [expr.desc() if descending else expr.asc() for expr in self.expressions]
+
+    def after(self, value: Any, reverse: bool) -> ColumnElement[bool]:
+        # Rows strictly after ``value`` in the (possibly reversed) sort order, term by term.
+        descending = self.descending != reverse
+        clauses, prefix = [], []
+        for expr in self.expressions:
+            if self._is_null_test(expr):
+                # The term is true for NULL, so NULL sorts after every value when ascending.
+                is_null = value is None
+                if is_null == descending:
+                    clauses.append(and_(*prefix, self.column.is_not(None) if descending else self.column.is_(None)))
+                prefix.append(self.column.is_(None) if is_null else self.column.is_not(None))
+            elif value is not None:
+                clauses.append(and_(*prefix, self.column < value if descending else self.column > value))
+                prefix.append(self.column == value)
+        return or_(*clauses) if clauses else false()
+
+    def equals(self, value: Any) -> ColumnElement[bool]:
+        return self.column.is_(None) if value is None else self.column == value
+
+    def at_or_after(self, value: Any, reverse: bool) -> ColumnElement[bool] | None:
+        """Inclusive bound on the column implied by ``after() OR equals()``, if it has a plain one."""
+        if value is None or self.expressions[0] is not self.column:
+            return None
+        return self.column <= value if self.descending != reverse else self.column >= value
+
+
+class KeysetPaginator:
+    """Cursor pagination over a stable, unique sort key.
+
+    The last key of ``keys`` must be unique (normally the primary key) so every
+    row has exactly one position in the ordering. Cursors are opaque tokens that
+    encode the boundary row's key values and the paging direction.
+    """
+
+    def __init__(self, keys: Sequence[SortKey]) -> None:
+        self.keys = tuple(keys)
+
+    def encode_cursor(self, row: Any, direction: str) -> str:
+        values = [_encode_value(getattr(row, key.column.key)) for key in self.keys]
+        raw = json.dumps({"d": direction, "v": values}, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+    def decode_cursor(self, cursor: str) -> tuple[str, list[Any]]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded))
+            direction, values = data["d"], data["v"]
+            if direction not in ("next", "prev") or len(values) != len(self.keys):
+                raise ValueError("malformed cursor")
+            return direction, [_decode_value(key, value) for key, value in zip(self.keys, values)]
+        except (binascii.Error, ValueError, KeyError, TypeError) as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+    def order_by(self, reverse: bool = False) -> list[ColumnElement[Any]]:
+        return [clause for key in self.keys for clause in key.order_by(reverse)]
+
+    def seek(self, values: Sequence[Any], reverse: bool) -> ColumnElement[bool]:
+        # (k1, k2, ...) > (v1, v2, ...) expanded per column so mixed directions and NULLs work.
+        clauses = []
+        for i, key in enumerate(self.keys):
+            prefix = [self.keys[j].equals(values[j]) for j in range(i)]
+            clauses.append(and_(*prefix, key.after(values[i], reverse)))
+        # Redundant, but unlike the OR it gives the planner a range to start the index scan at.
+        bound = self.keys[0].at_or_after(values[0], reverse)
+        return or_(*clauses) if bound is None else and_(bound, or_(*clauses))
+
+    def apply(self, stmt: Select[Any], cursor: str | None, limit: int) -> tuple[Select[Any], bool]:
+        """Return the statement for one page (fetching ``limit + 1`` rows) and whether it runs backwards."""
+        reverse = False
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+            reverse = direction == "prev"
+            stmt = stmt.where(self.seek(values, reverse))
+        return stmt.order_by(*self.order_by(reverse)).limit(limit + 1), reverse
+
+    def build_page(self, rows: Sequence[Any], limit: int, cursor: str | None, reverse: bool) -> tuple[list[Any], str | None, str | None]:
+        """Trim the over-fetched row and compute the neighbouring cursors."""
+        has_more = len(rows) > limit
+        items = list(rows[:limit])
+        if reverse:
+            items.reverse()
+        if not items:
+            return items, None, None
+        has_next = has_more if not reverse else cursor is not None
+        has_prev = cursor is not None if not reverse else has_more
+        next_cursor = self.encode_cursor(items[-1], "next") if has_next else None
+        prev_cursor = self.encode_cursor(items[0], "prev") if has_prev else None
+        return items, next_cursor, prev_cursor
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(key: SortKey, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = key.column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is bool:
+        return bool(value)
+    return python_type(value)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import re
+from collections import Counter, defaultdict
+from typing import Any, Awaitable, Callable, Iterable, TypeVar
+
+
+T = TypeVar("T")
+
+_DIGITS = re.compile(r"\d+")
+
+
+def key_family(key: str) -> str:
+    """Metrics label for a key: ids and query strings dropped (``task:42:owner:7`` -> ``task:*:owner:*``)."""
+    return _DIGITS.sub("*", key.partition("?")[0])
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one.
+
+    The first caller for a key (the leader) runs the call; callers arriving while it is in
+    flight (followers) await its result, or its exception, instead of repeating it. A
+    follower waits at most ``timeout`` seconds, or until the leader is cancelled, and then
+    runs the call itself. Only event-loop code touches this, so no locking is needed.
+    """
+
+    def __init__(self, timeout: float = 5.0) -> None:
+        self.timeout = timeout
+        self._calls: dict[str, asyncio.Future[Any]] = {}
+        self._call_tags: dict[str, tuple[str, ...]] = {}
+        self._tag_keys: dict[str, set[str]] = {}
+        # Per key family: leader, shared, timeout, abandoned (leader cancelled), error
+        self.counts: defaultdict[str, Counter[str]] = defaultdict(Counter)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]], tags: Iterable[str] = ()) -> T:
+        counts = self.counts[key_family(key)]
+        call = self._calls.get(key)
+        if call is not None:
+            counts["shared"] += 1
+            done, _ = await asyncio.wait({call}, timeout=self.timeout)
+            if done and not call.cancelled():
+                return call.result()
+            counts["abandoned" if done else "timeout"] += 1
+            return await fn()
+
+        counts["leader"] += 1
+        call = asyncio.get_running_loop().create_future()
+        self._register(key, call, tuple(tags))
+        try:
+            result = await fn()
+        except Exception as exc:
+            counts["error"] += 1
+            call.set_exception(exc)
+            call.exception()  # retrieved: without followers nobody else reads it
+            raise
+        except BaseException:
+            call.cancel()
+            raise
+        finally:
+            self._unregister(key, call)
+        call.set_result(result)
+        return result
+
+    def forget_tags(self, tags: Iterable[str]) -> None:
+        """Stop sharing in-flight calls for ``tags``: later callers start a fresh call.
+
+        Used on invalidation, so a read that starts after a write never joins one that
+        started before it.
+        """
+        for tag in tags:
+            for key in list(self._tag_keys.get(tag, ())):
+                self._drop(key)
+
+    def _register(self, key: str, call: asyncio.Future[Any], tags: tuple[str, ...]) -> None:
+        self._calls[key] = call
+        if tags:
+            self._call_tags[key] = tags
+            for tag in tags:
+                self._tag_keys.setdefault(tag, set()).add(key)
+
+    def _unregister(self, key: str, call: asyncio.Future[Any]) -> None:
+        # A forgotten call may already have been replaced by a newer one for the same key.
+        if self._calls.get(key) is call:
+            self._drop(key)
+
+    def _drop(self, key: str) -> None:
+        del self._calls[key]
+        for tag in self._call_tags.pop(key, ()):
+            keys = self._tag_keys[tag]
+            keys.discard(key)
+            if not keys:
+                del self._tag_keys[tag]
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {family: dict(counts) for family, counts in self.counts.items()}
@@ -0,0 +1,5 @@
+import os
+
+# Benchmarks never touch a database, but importing the app creates the engine and settings.
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("ACCESS_LOG_ENABLED", "false")
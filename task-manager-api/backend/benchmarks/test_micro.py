@@ -0,0 +1,92 @@
+"""Micro-benchmarks for per-request hot paths.
+
+Run (from backend/):
+	pytest benchmarks --benchmark-autosave                # saves .benchmarks/<machine>/NNNN_*.json
+	pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:10%
+	pytest benchmarks --benchmark-json=bench.json
+"""
+from datetime import datetime, timedelta
+
+import orjson
+import pytest
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+ROWS = 100
+
+
+@pytest.fixture(scope="module")
+def task_rows():
+	from app.api.v1.endpoints.tasks import TASK_OUT_FIELDS
+
+	now = datetime(2030, 1, 1)
+	values = {
+		"id": 0,
+		"title": "Benchmark task",
+		"description": "Benchmark row " * 4,
+		"is_completed": False,
+		"priority": 3,
+		"due_date": now,
+		"created_at": now,
+		"updated_at": now,
+		"version": 1,
+	}
+	rows = []
+	for i in range(ROWS):
+		values.update(id=i, priority=i % 5, due_date=now + timedelta(days=i % 30))
+		rows.append(tuple(values[name] for name in TASK_OUT_FIELDS))
+	return rows
+
+
+@pytest.mark.parametrize("dialect", [sqlite.dialect(), postgresql.dialect()], ids=["sqlite", "postgresql"])
+def test_build_filtered_list_query(benchmark, dialect):
+	from sqlalchemy import select
+
+	from app.api.v1.endpoints.tasks import TASK_OUT_COLUMNS, _apply_filters, task_paginator
+
+	def build():
+		stmt = _apply_filters(select(*TASK_OUT_COLUMNS), 1, None, False, 2)
+		return str(stmt.order_by(*task_paginator.order_by()).limit(50).offset(100).compile(dialect=dialect))
+
+	assert "ORDER BY" in benchmark(build)
+
+
+def test_build_keyset_page_query(benchmark, task_rows):
+	from sqlalchemy import select
+
+	from app.api.v1.endpoints.tasks import TASK_OUT_COLUMNS, TASK_OUT_FIELDS, task_paginator
+	from app.core.schemas import TaskOut
+
+	cursor = task_paginator.encode_cursor(TaskOut(**dict(zip(TASK_OUT_FIELDS, task_rows[10]))), "next")
+
+	def build():
+		stmt, _ = task_paginator.apply(select(*TASK_OUT_COLUMNS), cursor, 50)
+		return str(stmt.compile(dialect=sqlite.dialect()))
+
+	assert "LIMIT" in benchmark(build)
+
+
+def test_serialize_task_rows_fast_path(benchmark, task_rows):
+	from app.api.v1.endpoints.tasks import _task_dicts
+
+	body = benchmark(lambda: orjson.dumps(_task_dicts(task_rows)))
+	assert len(orjson.loads(body)) == ROWS
+
+
+def test_validate_and_dump_task_out(benchmark, task_rows):
+	from app.api.v1.endpoints.tasks import TASK_OUT_FIELDS
+	from app.core.schemas import TaskOut
+
+	dicts = [dict(zip(TASK_OUT_FIELDS, row)) for row in task_rows]
+
+	def serialize():
+		return [TaskOut.model_validate(item).model_dump(mode="json") for item in dicts]
+
+	assert len(benchmark(serialize)) == ROWS
+
+
+def test_decode_token(benchmark):
+	from app.core.security import create_access_token, decode_token
+
+	token = create_access_token("bench@example.com")
+	assert benchmark(decode_token, token)["sub"] == "bench@example.com"
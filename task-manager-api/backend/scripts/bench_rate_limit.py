@@ -0,0 +1,71 @@
+"""Measure the per-request overhead of RateLimitMiddleware.
+
+Drives a bare ASGI app directly (no HTTP server, no TestClient) with and without
+the middleware and reports the difference in microseconds per request.
+
+Usage (from backend/): python scripts/bench_rate_limit.py [requests] [clients]
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.middleware.rate_limit import InMemoryTokenBucket, RateLimitMiddleware  # noqa: E402
+
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def _send(message):
+    pass
+
+
+def _scopes(clients: int) -> list[dict]:
+    return [
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/v1/tasks/",
+            "headers": [],
+            "client": (f"10.0.{i // 256}.{i % 256}", 1234),
+        }
+        for i in range(clients)
+    ]
+
+
+async def run(app, scopes: list[dict], requests: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(scopes[i % len(scopes)], _receive, _send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def main() -> None:
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    scopes = _scopes(clients)
+    limited = RateLimitMiddleware(
+        endpoint,
+        default="1000000/second",
+        routes={"POST /api/v1/auth/login": "10/minute"},
+        backend=InMemoryTokenBucket(shards=16),
+    )
+    await run(limited, scopes, clients)  # warm up: create every bucket
+    baseline = await run(endpoint, scopes, requests)
+    with_limit = await run(limited, scopes, requests)
+    print(f"{requests} requests across {clients} clients")
+    print(f"baseline:     {baseline:8.2f} us/request")
+    print(f"rate limited: {with_limit:8.2f} us/request")
+    print(f"overhead:     {with_limit - baseline:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""Micro-benchmark: task list serialization, ORM/model path vs column-tuple fast path.
+
+Usage (from backend/): python scripts/bench_serialization.py [--repeat N]
+
+The "orm" path reproduces the previous list_tasks behaviour: ORM entities, one
+TaskOut.model_validate per row, then FastAPI's response_model validation and JSON
+encoding. The "fast" path is what list_tasks does now.
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.api.v1.endpoints.tasks import TASK_OUT_COLUMNS, _task_dicts  # noqa: E402
+from app.core.database import Base  # noqa: E402
+from app.core.models import Task  # noqa: E402
+from app.core.schemas import TaskOut  # noqa: E402
+
+import orjson  # noqa: E402
+
+
+_response_adapter = TypeAdapter(list[TaskOut])
+
+
+def orm_path(session: Session, limit: int) -> bytes:
+    tasks = session.scalars(select(Task).limit(limit)).all()
+    models = [TaskOut.model_validate(t) for t in tasks]
+    validated = _response_adapter.validate_python(models, from_attributes=True)
+    return JSONResponse(jsonable_encoder(_response_adapter.dump_python(validated))).body
+
+
+def fast_path(session: Session, limit: int) -> bytes:
+    rows = session.execute(select(*TASK_OUT_COLUMNS).limit(limit)).all()
+    return orjson.dumps(_task_dicts(rows))
+
+
+def bench(fn, session: Session, rows: int, repeat: int) -> float:
+    fn(session, rows)  # warm caches
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(session, rows)
+    return rows * repeat / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        session.execute(
+            insert(Task),
+            [
+                {
+                    "title": f"Task {i}",
+                    "description": "Benchmark row " * 4,
+                    "priority": i % 5,
+                    "due_date": now + timedelta(days=i % 30),
+                    "is_completed": i % 3 == 0,
+                }
+                for i in range(10_000)
+            ],
+        )
+        session.commit()
+        print(f"{'rows':>6} {'orm rows/s':>14} {'fast rows/s':>14} {'speedup':>8}")
+        for rows in (100, 10_000):
+            repeat = args.repeat if rows <= 100 else max(1, args.repeat // 10)
+            slow = bench(orm_path, session, rows, repeat * 10)
+            fast = bench(fast_path, session, rows, repeat * 10)
+            print(f"{rows:>6} {slow:>14,.0f} {fast:>14,.0f} {fast / slow:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
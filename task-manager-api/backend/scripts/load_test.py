@@ -0,0 +1,248 @@
+"""Asyncio load generator: a weighted mix of task CRUD and stats traffic.
+
+By default the app runs in-process over ASGI against a throwaway SQLite database,
+so no server is needed; pass --url to load a running deployment instead.
+Reports throughput and p50/p95/p99 latency per operation. --json saves the
+results, and --baseline compares against an earlier run (exit status 1 on regression).
+All traffic runs as one user (--email/--password), registered on first use.
+
+Usage (from backend/):
+    python scripts/load_test.py [--concurrency 20] [--duration 10]
+    python scripts/load_test.py --url http://localhost:8002 --mix list=6,get=4,create=1
+    python scripts/load_test.py --json after.json --baseline before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+DEFAULT_MIX = "create=2,list=4,page=2,next=2,get=6,update=3,delete=1,stats=1"
+API = "/api/v1"
+
+
+class Workload:
+    """The operations and the shared pool of task ids they read and write."""
+
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random) -> None:
+        self.client = client
+        self.rng = rng
+        self.ids: list[int] = []
+
+    def _task_payload(self) -> dict:
+        due = datetime.now(timezone.utc) + timedelta(hours=self.rng.randint(-48, 24 * 14))
+        return {
+            "title": f"Load task {self.rng.randrange(1_000_000)}",
+            "description": "Generated by scripts/load_test.py",
+            "priority": self.rng.randint(0, 5),
+            "due_date": due.isoformat(),
+        }
+
+    async def seed(self, count: int) -> None:
+        for start in range(0, count, 500):
+            batch = [self._task_payload() for _ in range(min(500, count - start))]
+            r = await self.client.post(f"{API}/tasks/bulk", json=batch)
+            r.raise_for_status()
+            self.ids.extend(item["id"] for item in r.json()["results"])
+
+    def _pick(self) -> int | None:
+        return self.rng.choice(self.ids) if self.ids else None
+
+    async def create(self) -> httpx.Response:
+        r = await self.client.post(f"{API}/tasks/", json=self._task_payload())
+        if r.status_code == 201:
+            self.ids.append(r.json()["id"])
+        return r
+
+    async def list(self) -> httpx.Response:
+        params = self.rng.choice([{}, {"is_completed": "false"}, {"min_priority": 3}, {"sort": "due_date"}])
+        return await self.client.get(f"{API}/tasks/", params=params)
+
+    async def page(self) -> httpx.Response:
+        return await self.client.get(f"{API}/tasks/page", params={"limit": 50})
+
+    async def next(self) -> httpx.Response:
+        return await self.client.get(f"{API}/tasks/next", params={"k": 10})
+
+    async def get(self) -> httpx.Response:
+        task_id = self._pick()
+        if task_id is None:
+            return await self.create()
+        return await self.client.get(f"{API}/tasks/{task_id}")
+
+    async def update(self) -> httpx.Response:
+        task_id = self._pick()
+        if task_id is None:
+            return await self.create()
+        changes = self.rng.choice([{"priority": self.rng.randint(0, 5)}, {"is_completed": self.rng.random() < 0.5}])
+        return await self.client.put(f"{API}/tasks/{task_id}", json=changes)
+
+    async def delete(self) -> httpx.Response:
+        if not self.ids:
+            return await self.create()
+        task_id = self.ids.pop(self.rng.randrange(len(self.ids)))
+        return await self.client.delete(f"{API}/tasks/{task_id}")
+
+    async def stats(self) -> httpx.Response:
+        path = self.rng.choice(["summary", "daily", "priorities", "due"])
+        return await self.client.get(f"{API}/stats/{path}")
+
+
+async def authenticate(client: httpx.AsyncClient, email: str, password: str) -> None:
+    # Registration fails harmlessly (400) when the user already exists.
+    await client.post(f"{API}/users/", json={"email": email, "full_name": "Load Test", "password": password})
+    r = await client.post(f"{API}/auth/login", data={"username": email, "password": password})
+    r.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {r.json()['access_token']}"
+
+
+def parse_mix(spec: str) -> dict[str, int]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if not hasattr(Workload, name.strip()) or name.strip() == "seed":
+            raise SystemExit(f"Unknown operation in --mix: {name!r}")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+async def worker(workload: Workload, mix: dict[str, int], deadline: float, samples: dict, errors: dict) -> None:
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        name = workload.rng.choices(names, weights)[0]
+        start = time.perf_counter()
+        try:
+            r = await getattr(workload, name)()
+            failed = r.status_code >= 400 and r.status_code != 404  # 404s are races with concurrent deletes
+        except httpx.HTTPError:
+            failed = True
+        samples[name].append(time.perf_counter() - start)
+        if failed:
+            errors[name] += 1
+
+
+def summarize(latencies: list[float]) -> dict[str, float]:
+    if len(latencies) < 2:
+        ms = latencies[0] * 1000 if latencies else 0.0
+        return {"p50_ms": ms, "p95_ms": ms, "p99_ms": ms}
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {"p50_ms": cuts[49] * 1000, "p95_ms": cuts[94] * 1000, "p99_ms": cuts[98] * 1000}
+
+
+async def run(args: argparse.Namespace, client: httpx.AsyncClient) -> dict:
+    rng = random.Random(args.seed)
+    await authenticate(client, args.email, args.password)
+    workload = Workload(client, rng)
+    await workload.seed(args.seed_tasks)
+    mix = parse_mix(args.mix)
+    samples: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(worker(workload, mix, deadline, samples, errors) for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    everything = [s for values in samples.values() for s in values]
+    operations = {
+        name: {"requests": len(samples[name]), "errors": errors[name], **summarize(samples[name])}
+        for name in mix
+        if samples[name]
+    }
+    return {
+        "target": args.url or "asgi",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "concurrency": args.concurrency,
+        "duration_s": elapsed,
+        "mix": mix,
+        "requests": len(everything),
+        "errors": sum(errors.values()),
+        "throughput_rps": len(everything) / elapsed,
+        **summarize(everything),
+        "operations": operations,
+    }
+
+
+async def run_in_process(args: argparse.Namespace) -> dict:
+    # Configure before importing the app: the engine and settings are created at import time.
+    db_dir = tempfile.mkdtemp(prefix="task-manager-load-")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_dir}/load.db"
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("ACCESS_LOG_ENABLED", "false")
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            return await run(args, client)
+
+
+async def run_remote(args: argparse.Namespace) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+        return await run(args, client)
+
+
+def print_report(result: dict) -> None:
+    print(
+        f"{result['requests']} requests in {result['duration_s']:.1f}s against {result['target']} "
+        f"({result['concurrency']} concurrent): {result['throughput_rps']:,.0f} req/s, {result['errors']} errors"
+    )
+    print(f"{'operation':<10} {'requests':>9} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    rows = list(result["operations"].items()) + [("all", result)]
+    for name, op in rows:
+        print(
+            f"{name:<10} {op['requests']:>9} {op['errors']:>7} "
+            f"{op['p50_ms']:>8.2f} {op['p95_ms']:>8.2f} {op['p99_ms']:>8.2f}"
+        )
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> bool:
+    """Print the change against ``baseline``; False if throughput or p95 regressed beyond ``tolerance``."""
+    ok = True
+    checks = [("throughput_rps", -1), ("p95_ms", 1), ("p99_ms", 1)]  # sign: which direction is worse
+    for field, worse in checks:
+        before, after = baseline[field], result[field]
+        change = (after - before) / before if before else 0.0
+        regressed = change * worse > tolerance
+        ok = ok and not regressed
+        print(f"{field:<15} {before:>10.2f} -> {after:>10.2f} ({change:+.1%}){'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server; in-process ASGI when omitted")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted operations (default: {DEFAULT_MIX})")
+    parser.add_argument("--seed-tasks", type=int, default=1000, help="tasks created before the run")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--email", default="loadtest@example.com", help="user the traffic runs as")
+    parser.add_argument("--password", default="load-test-password")
+    parser.add_argument("--json", type=Path, help="write the results here")
+    parser.add_argument("--baseline", type=Path, help="results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_remote(args) if args.url else run_in_process(args))
+    print_report(result)
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2))
+    if args.baseline and not compare(result, json.loads(args.baseline.read_text()), args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Recompute every owner's /stats/summary counters and report drift.
+
+Usage (from backend/): python scripts/reconcile_counters.py
+Exits with status 1 when drift was found (and repaired).
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.services.analytics_service import reconcile_task_counters  # noqa: E402
+
+
+async def main() -> int:
+    async with AsyncSessionLocal() as session:
+        drift = await reconcile_task_counters(session)
+    await engine.dispose()
+    if drift:
+        for owner_id, fields in drift.items():
+            for name, values in fields.items():
+                print(f"owner {owner_id} {name}: stored={values['stored']} actual={values['actual']} (repaired)")
+        return 1
+    print("Counters are in sync.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,18 +1,29 @@
+import os
+
 import requests
 
+# Smoke test against a running server; see scripts/load_test.py for load and latency measurements.
+BASE_URL = os.environ.get("API_URL", "http://localhost:8002")
+EMAIL = os.environ.get("API_EMAIL", "crud@example.com")
+PASSWORD = os.environ.get("API_PASSWORD", "crud-password")
+
+# Tasks belong to a user: register (a 400 means it already exists) and log in.
+requests.post(f"{BASE_URL}/api/v1/users/", json={"email": EMAIL, "full_name": "CRUD Test", "password": PASSWORD})
+response = requests.post(f"{BASE_URL}/api/v1/auth/login", data={"username": EMAIL, "password": PASSWORD})
+response.raise_for_status()
+requests = requests.Session()
+requests.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
 # Delete all existing tasks at the beginning
 print("Deleting all existing tasks...")
-response = requests.get("http://localhost:8002/api/v1/tasks/")
-existing_tasks = response.json()
-for task in existing_tasks:
-    task_id = task["id"]
-    delete_response = requests.delete(f"http://localhost:8002/api/v1/tasks/{task_id}")
-    #print(f"Deleted task {task_id}: {delete_response.status_code}")
+# An empty filter matches every one of this user's tasks; the whole delete is one request and one transaction.
+response = requests.delete(f"{BASE_URL}/api/v1/tasks/bulk", json={"filter": {}})
+#print(f"Deleted {response.json()['affected']} tasks")
 
 print("All existing tasks deleted.")
 print('--------------------------------')
 
-response = requests.post("http://localhost:8002/api/v1/tasks/", json={
+response = requests.post(f"{BASE_URL}/api/v1/tasks/", json={
     "title": "Buy groceries",
     "description": "Milk, bread, eggs",
     "priority": 1
@@ -20,21 +31,21 @@ response = requests.post("http://localhost:8002/api/v1/tasks/", json={
 task_id = response.json()["id"]
 #print(response.json())
 
-response = requests.get("http://localhost:8002/api/v1/tasks/")
+response = requests.get(f"{BASE_URL}/api/v1/tasks/")
 print(response.json())
 print('--------------------------------')
 
-response = requests.put(f"http://localhost:8002/api/v1/tasks/{task_id}", json={
+response = requests.put(f"{BASE_URL}/api/v1/tasks/{task_id}", json={
     "title": "Buy groceries and fruits",
     "description": "Milk, bread, eggs and fruits",
     "priority": 1
 })
 #print(response.json())
 
-response = requests.get("http://localhost:8002/api/v1/tasks/")
+response = requests.get(f"{BASE_URL}/api/v1/tasks/")
 print(response.json())
 print('--------------------------------')
 
-response = requests.delete(f"http://localhost:8002/api/v1/tasks/{task_id}")
+response = requests.delete(f"{BASE_URL}/api/v1/tasks/{task_id}")
 print("Delete response status:", response.status_code)
 #print(response.json())
\ No newline at end of file